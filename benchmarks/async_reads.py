@@ -0,0 +1,277 @@
+"""
+Compare the sync WSGI and the async ASGI read path under concurrency.
+
+    python -m benchmarks.async_reads --requests 2000 --concurrency 32
+
+The same mix of list and detail reads (performances, plays, reservations)
+is sent to the WSGI application from ``--concurrency`` threads and to the
+ASGI application, with ASYNC_READ_VIEWS on, from as many tasks on one
+event loop. Each mode runs in its own process because the view flavour is
+picked when the URLconf is loaded.
+
+Throttling, DEBUG and the debug toolbar are turned off for the run. The
+toolbar middleware is sync-only: under ASGI it pushes every request back
+through a thread and, with several requests in flight, can deadlock the
+event loop, so it has no place in an ASGI deployment anyway.
+"""
+import argparse
+import asyncio
+import io
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from benchmarks.utils import percentiles, setup
+
+API = "/api/theatre"
+
+
+def request_paths(performance_ids, play_ids):
+    paths = [
+        ("/performances/", ""),
+        ("/performances/", "pagination=cursor"),
+        ("/plays/", ""),
+        ("/reservations/", ""),
+    ]
+    paths += [(f"/performances/{pk}/", "") for pk in performance_ids[:4]]
+    paths += [(f"/plays/{pk}/", "") for pk in play_ids[:4]]
+    return [(API + path, query) for path, query in paths]
+
+
+def summary(mode, latencies, elapsed, errors):
+    stats = percentiles(latencies)
+    print(
+        f"{mode:<5} {len(latencies) / elapsed:8.1f} req/s  "
+        + "  ".join(
+            f"{key} {stats[key] * 1000:7.2f}ms"
+            for key in ("p50", "p95", "p99")
+        )
+        + f"  errors {errors}"
+    )
+
+
+def run_wsgi(paths, token, requests, concurrency):
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def call(index):
+        path, query = paths[index % len(paths)]
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "HTTP_HOST": "localhost",
+            "HTTP_AUTHORIZATION": f"Bearer {token}",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": sys.stderr,
+        }
+        statuses = []
+        started = time.perf_counter()
+        body = application(
+            environ, lambda status, headers: statuses.append(status)
+        )
+        b"".join(body)
+        body.close()
+        latency = time.perf_counter() - started
+        with lock:
+            latencies.append(latency)
+            if not statuses[0].startswith("200"):
+                errors.append(statuses[0])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(call, range(requests)))
+    return latencies, time.perf_counter() - started, len(errors)
+
+
+def run_asgi(paths, token, requests, concurrency):
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+    latencies = []
+    errors = 0
+
+    async def call(index):
+        nonlocal errors
+        path, query = paths[index % len(paths)]
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [
+                (b"host", b"localhost"),
+                (b"authorization", f"Bearer {token}".encode()),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("localhost", 80),
+        }
+
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if body_sent:
+                await asyncio.Future()
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            nonlocal errors
+            if message["type"] == "http.response.start" and (
+                    message["status"] != 200
+            ):
+                errors += 1
+
+        started = time.perf_counter()
+        await application(scope, receive, send)
+        latencies.append(time.perf_counter() - started)
+
+    async def worker(indexes):
+        for index in indexes:
+            await call(index)
+
+    async def main():
+        await asyncio.gather(*(
+            worker(range(start, requests, concurrency))
+            for start in range(concurrency)
+        ))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return latencies, time.perf_counter() - started, errors
+
+
+def load(args):
+    setup()
+    from django.conf import settings
+    from rest_framework.settings import api_settings
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ["localhost"]
+    settings.MIDDLEWARE = [
+        middleware for middleware in settings.MIDDLEWARE
+        if not middleware.startswith("debug_toolbar.")
+    ]
+    api_settings.DEFAULT_THROTTLE_RATES.update(
+        anon=None, user=None, reservation=None
+    )
+    assert settings.ASYNC_READ_VIEWS == (args.mode == "asgi")
+
+    paths = request_paths(args.performances, args.plays)
+    run = run_asgi if args.mode == "asgi" else run_wsgi
+    run(paths, args.token, len(paths) * 2, args.concurrency)
+    summary(args.mode, *run(
+        paths, args.token, args.requests, args.concurrency
+    ))
+
+
+def create_data():
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.utils import timezone
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from theatre.models import (
+        Genre, Play, TheatreHall, Performance, Reservation, Ticket
+    )
+
+    stamp = time.time_ns()
+    user = get_user_model().objects.create_user(
+        email=f"async-reads-{stamp}@bench.local"
+    )
+    genre = Genre.objects.create(name=f"Async reads {stamp}")
+    hall = TheatreHall.objects.create(
+        name=f"Async reads {stamp}", rows=20, seats_in_row=20
+    )
+    plays = Play.objects.bulk_create(
+        Play(title=f"Async reads {stamp} {i}", description="Benchmark")
+        for i in range(20)
+    )
+    for play in plays:
+        play.genres.add(genre)
+    start = timezone.now() + timedelta(days=1)
+    performances = Performance.objects.bulk_create(
+        Performance(
+            play=plays[i % len(plays)],
+            theatre_hall=hall,
+            show_time=start + timedelta(hours=i),
+        )
+        for i in range(50)
+    )
+    reservations = Reservation.objects.bulk_create(
+        Reservation(user=user) for _ in range(10)
+    )
+    Ticket.objects.bulk_create(
+        Ticket(
+            performance=performances[i % 4],
+            reservation=reservations[i % len(reservations)],
+            row=i // 20 + 1,
+            seat=i % 20 + 1,
+        )
+        for i in range(100)
+    )
+    call_command("sync_tickets_sold", stdout=io.StringIO())
+    cleanup = [user, genre, hall, *plays]
+    return str(AccessToken.for_user(user)), performances, plays, cleanup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mode", choices=["wsgi", "asgi"])
+    parser.add_argument("--token", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--performances", type=int, nargs="*", help=argparse.SUPPRESS
+    )
+    parser.add_argument("--plays", type=int, nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        load(args)
+        return
+
+    setup()
+    token, performances, plays, cleanup = create_data()
+    try:
+        print(f"{args.requests} reads, concurrency {args.concurrency}")
+        for mode in ("wsgi", "asgi"):
+            subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.async_reads",
+                    "--mode", mode,
+                    "--requests", str(args.requests),
+                    "--concurrency", str(args.concurrency),
+                    "--token", token,
+                    "--performances", *(str(p.id) for p in performances),
+                    "--plays", *(str(p.id) for p in plays),
+                ],
+                env={
+                    **os.environ,
+                    "ASYNC_READ_VIEWS": str(mode == "asgi").lower(),
+                },
+                check=True,
+            )
+    finally:
+        for obj in cleanup:
+            obj.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""
+Latency and query budgets for every API endpoint.
+
+    python -m benchmarks.endpoints
+    python -m benchmarks.endpoints --update-baseline
+
+Seeds a dataset with ``theatre.dataset`` and sends every request of
+``cases()`` ``--repeat`` times through the test client, authenticated
+with real JWTs. Requests run cold: the catalogue cache, the performance
+detail results and the JWT user cache are emptied before each one, so the
+budgets cover the queries a cache miss costs. GET requests are measured
+again with the caches kept, under "<label> (cached)". Each measurement
+gets p50/p95/p99 latency, the SQL queries per request and the SQL time
+per request. Queries are recorded with a
+connection execute wrapper, so DEBUG stays off; it times execute() only,
+not rows fetched later from the server-side cursors of the exports.
+Everything is rolled back at the end.
+
+Results are compared with ``benchmarks/baseline.json``. The run fails
+with exit status 1 when:
+
+- an endpoint issues more queries than its baseline;
+- an endpoint's p95 exceeds its baseline by more than ``--tolerance``
+  (a fraction) and ``--slack`` milliseconds;
+- a route of ``theatre/urls.py`` or ``user/urls.py`` has no case and is
+  not listed in ``SKIPPED``.
+
+Latencies depend on the machine, so regenerate the baseline with
+``--update-baseline`` when moving to a new one. Query counts do not.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from benchmarks.utils import percentiles, rolled_back, setup
+
+setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import caches  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.settings import api_settings  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+from theatre.dataset import DatasetGenerator  # noqa: E402
+from theatre.models import (  # noqa: E402
+    Actor, Genre, Performance, Play, Reservation, Ticket, TheatreHall
+)
+from theatre.views import performance_detail_flight  # noqa: E402
+from user.authentication import user_cache  # noqa: E402
+
+BASELINE = Path(__file__).with_name("baseline.json")
+DATASET = {
+    "seed": 2024,
+    "halls": 10,
+    "plays": 300,
+    "actors": 1000,
+    "users": 2000,
+    "performances": 3000,
+    "tickets": 200_000,
+    "days": 120,
+}
+PASSWORD = "benchmark-password"
+
+# Routes that are deliberately not benchmarked, with the reason.
+SKIPPED = {
+    "theatre:play-upload-image": "writes image files to MEDIA_ROOT",
+    "theatre:performance-seat-events": "an open-ended event stream",
+}
+
+
+class Case(NamedTuple):
+    route: str
+    label: str
+    method: str
+    path: str
+    user: object = None
+    data: Callable[[int], dict] | None = None
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.time += time.perf_counter() - started
+            self.count += 1
+
+
+def routes() -> set[str]:
+    from theatre.urls import urlpatterns as theatre_urls
+    from user.urls import urlpatterns as user_urls
+
+    def names(patterns, namespace):
+        for pattern in patterns:
+            if hasattr(pattern, "url_patterns"):
+                yield from names(pattern.url_patterns, namespace)
+            elif pattern.name:
+                yield f"{namespace}:{pattern.name}"
+
+    return set(names(theatre_urls, "theatre")) | set(names(user_urls, "user"))
+
+
+def create_data():
+    generated = DatasetGenerator(
+        log=lambda message: None, **DATASET
+    ).generate()
+    admin = get_user_model().objects.create_superuser(
+        email="bench-admin@example.com", password=PASSWORD
+    )
+    customer = get_user_model().objects.create_user(
+        email="bench-user@example.com", password=PASSWORD
+    )
+    Reservation.objects.filter(
+        id__in=Reservation.objects.order_by("id").values("id")[:40]
+    ).update(user=customer)
+    busiest = Performance.objects.order_by("-tickets_sold", "id").first()
+    hall = TheatreHall.objects.create(
+        name="Benchmark hall", rows=40, seats_in_row=40
+    )
+    empty = Performance.objects.create(
+        play=busiest.play, theatre_hall=hall, show_time=busiest.show_time
+    )
+    # Fresh statistics keep query plans the same from run to run: the
+    # seeded rows are visible to ANALYZE inside this transaction.
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE " + ", ".join(
+            connection.ops.quote_name(model._meta.db_table)
+            for model in (
+                get_user_model(), Genre, Actor, Play, Play.genres.through,
+                Play.actors.through, TheatreHall, Performance, Reservation,
+                Ticket,
+            )
+        ))
+    return generated, admin, customer, busiest, empty
+
+
+def cases(admin, customer, busiest, empty) -> list[Case]:
+    def url(name, *args, query=""):
+        return reverse(name, args=args) + (f"?{query}" if query else "")
+
+    play = busiest.play
+    genre = play.genres.first()
+    day = busiest.show_time.date().isoformat()
+
+    def seat(i):
+        return {"row": i // 40 + 1, "seat": i % 40 + 1}
+
+    return [
+        Case("theatre:api-root", "api root", "get", url("theatre:api-root"),
+             customer),
+        Case("theatre:genre-list", "genre list", "get",
+             url("theatre:genre-list"), customer),
+        Case("theatre:genre-list", "genre create", "post",
+             url("theatre:genre-list"), admin,
+             lambda i: {"name": f"Benchmark genre {i}"}),
+        Case("theatre:actor-list", "actor list", "get",
+             url("theatre:actor-list"), customer),
+        Case("theatre:actor-list", "actor create", "post",
+             url("theatre:actor-list"), admin,
+             lambda i: {"first_name": "Bench", "last_name": f"Actor {i}"}),
+        Case("theatre:play-list", "play list", "get",
+             url("theatre:play-list"), customer),
+        Case("theatre:play-list", "play list by genre", "get",
+             url("theatre:play-list", query=f"genre={genre.id}"), customer),
+        Case("theatre:play-list", "play search", "get",
+             url("theatre:play-list", query="search=garden"), customer),
+        Case("theatre:play-list", "play create", "post",
+             url("theatre:play-list"), admin,
+             lambda i: {"title": f"Benchmark play {i}", "description": "-"}),
+        Case("theatre:play-detail", "play detail", "get",
+             url("theatre:play-detail", play.id), customer),
+        Case("theatre:theatre_hall-list", "hall list", "get",
+             url("theatre:theatre_hall-list"), customer),
+        Case("theatre:theatre_hall-list", "hall create", "post",
+             url("theatre:theatre_hall-list"), admin,
+             lambda i: {"name": f"Bench hall {i}", "rows": 5,
+                        "seats_in_row": 5}),
+        Case("theatre:performance-list", "performance list", "get",
+             url("theatre:performance-list"), customer),
+        Case("theatre:performance-list", "performance list cursor", "get",
+             url("theatre:performance-list", query="pagination=cursor"),
+             customer),
+        Case("theatre:performance-list", "performance list by day", "get",
+             url("theatre:performance-list", query=f"date={day}"), customer),
+        Case("theatre:performance-list", "performance create", "post",
+             url("theatre:performance-list"), admin,
+             lambda i: {"play": play.id, "theatre_hall": empty.theatre_hall_id,
+                        "show_time": busiest.show_time.isoformat()}),
+        Case("theatre:performance-detail", "performance detail", "get",
+             url("theatre:performance-detail", busiest.id), customer),
+        Case("theatre:performance-detail", "performance detail bitmap",
+             "get",
+             url("theatre:performance-detail", busiest.id,
+                 query="seat_map=bitmap"),
+             customer),
+        Case("theatre:performance-coalescing-stats", "coalescing stats",
+             "get", url("theatre:performance-coalescing-stats"), admin),
+        Case("theatre:reservation-list", "reservation list", "get",
+             url("theatre:reservation-list"), customer),
+        Case("theatre:reservation-list", "reservation list cursor", "get",
+             url("theatre:reservation-list", query="pagination=cursor"),
+             customer),
+        Case("theatre:reservation-list", "reservation create", "post",
+             url("theatre:reservation-list"), customer,
+             lambda i: {"user": customer.id, "tickets": [
+                 {**seat(2 * i), "performance": empty.id},
+                 {**seat(2 * i + 1), "performance": empty.id},
+             ]}),
+        Case("theatre:export-tickets", "ticket export", "get",
+             url("theatre:export-tickets",
+                 query=f"performance={busiest.id}"), admin),
+        Case("theatre:export-reservations", "reservation export", "get",
+             url("theatre:export-reservations",
+                 query=f"performance={busiest.id}&format=ndjson"), admin),
+        Case("user:create", "register", "post", url("user:create"), None,
+             lambda i: {"email": f"bench-{i}@example.com",
+                        "password": PASSWORD}),
+        Case("user:token_obtain_pair", "token obtain", "post",
+             url("user:token_obtain_pair"), None,
+             lambda i: {"email": customer.email, "password": PASSWORD}),
+        Case("user:token_refresh", "token refresh", "post",
+             url("user:token_refresh"), None,
+             lambda i: {"refresh": str(RefreshToken.for_user(customer))}),
+        Case("user:token_verify", "token verify", "post",
+             url("user:token_verify"), None,
+             lambda i: {"token": str(
+                 RefreshToken.for_user(customer).access_token
+             )}),
+        Case("user:manage", "me", "get", url("user:manage"), customer),
+    ]
+
+
+def clear_caches():
+    caches["catalogue"].clear()
+    performance_detail_flight.clear()
+    user_cache.clear()
+
+
+def variants(case: Case):
+    """Yield the label and coldness of each measurement of a case."""
+    yield case.label, True
+    if case.method == "get":
+        yield f"{case.label} (cached)", False
+
+
+def run_case(case: Case, repeat: int, warmup: int, cold: bool) -> dict:
+    client = APIClient()
+    if case.user is not None:
+        token = RefreshToken.for_user(case.user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    latencies, queries, sql_times = [], [], []
+    for i in range(warmup + repeat):
+        data = case.data(i) if case.data else None
+        if cold:
+            clear_caches()
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = getattr(client, case.method)(
+                case.path, data, format="json"
+            )
+            if response.streaming:
+                b"".join(response.streaming_content)
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 300:
+            raise RuntimeError(
+                f"{case.label}: {case.method.upper()} {case.path} returned "
+                f"{response.status_code}: {response.content[:200]!r}"
+            )
+        if i >= warmup:
+            latencies.append(elapsed)
+            queries.append(recorder.count)
+            sql_times.append(recorder.time)
+    stats = percentiles(latencies)
+    return {
+        "p50_ms": round(stats["p50"] * 1000, 2),
+        "p95_ms": round(stats["p95"] * 1000, 2),
+        "p99_ms": round(stats["p99"] * 1000, 2),
+        "queries": max(queries),
+        "sql_ms": round(sum(sql_times) / len(sql_times) * 1000, 2),
+    }
+
+
+def compare(result, baseline, tolerance, slack) -> list[str]:
+    if baseline is None:
+        return ["no baseline"]
+    problems = []
+    if result["queries"] > baseline["queries"]:
+        problems.append(
+            f"queries {baseline['queries']} -> {result['queries']}"
+        )
+    limit = max(
+        baseline["p95_ms"] * (1 + tolerance), baseline["p95_ms"] + slack
+    )
+    if result["p95_ms"] > limit:
+        problems.append(
+            f"p95 {baseline['p95_ms']}ms -> {result['p95_ms']}ms "
+            f"(budget {limit:.2f}ms)"
+        )
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the results as the new baseline instead of comparing. "
+             "With --only, only the budgets of the cases that ran are "
+             "replaced.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed p95 growth over the baseline, as a fraction.",
+    )
+    parser.add_argument(
+        "--slack",
+        type=float,
+        default=5.0,
+        help="Allowed p95 growth in milliseconds, for fast endpoints.",
+    )
+    parser.add_argument(
+        "--only", help="Only run cases whose label contains this text."
+    )
+    args = parser.parse_args()
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ["testserver"]
+    settings.MIDDLEWARE = [
+        middleware for middleware in settings.MIDDLEWARE
+        if not middleware.startswith("debug_toolbar.")
+    ]
+    api_settings.DEFAULT_THROTTLE_RATES.update(
+        anon=None, user=None, reservation=None
+    )
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())["endpoints"]
+
+    failures, results = [], {}
+    with rolled_back():
+        started = time.perf_counter()
+        generated, *users = create_data()
+        print(
+            f"Seeded {generated['tickets']} tickets, "
+            f"{Play.objects.count()} plays in "
+            f"{time.perf_counter() - started:.1f}s\n"
+        )
+        all_cases = cases(*users)
+
+        uncovered = routes() - {case.route for case in all_cases} - set(
+            SKIPPED
+        )
+        failures += [f"{route}: no benchmark case" for route in uncovered]
+
+        print(
+            f"{'endpoint':<36}{'p50':>9}{'p95':>9}{'p99':>9}"
+            f"{'queries':>9}{'sql':>9}"
+        )
+        for case in all_cases:
+            for label, cold in variants(case):
+                if args.only and args.only not in label:
+                    continue
+                result = run_case(case, args.repeat, args.warmup, cold)
+                results[label] = result
+                problems = (
+                    [] if args.update_baseline else compare(
+                        result,
+                        baseline.get(label),
+                        args.tolerance,
+                        args.slack,
+                    )
+                )
+                print(
+                    f"{label:<36}"
+                    f"{result['p50_ms']:>7.1f}ms{result['p95_ms']:>7.1f}ms"
+                    f"{result['p99_ms']:>7.1f}ms{result['queries']:>9}"
+                    f"{result['sql_ms']:>7.1f}ms"
+                    + (f"  ! {'; '.join(problems)}" if problems else "")
+                )
+                failures += [
+                    f"{label}: {problem}" for problem in problems
+                    if problem != "no baseline"
+                ]
+
+    if args.update_baseline:
+        if args.only:
+            results = {**baseline, **results}
+        args.baseline.write_text(json.dumps(
+            {"dataset": DATASET, "repeat": args.repeat, "endpoints": results},
+            indent=2,
+        ) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+    if failures:
+        print("\nBudget exceeded:\n" + "\n".join(
+            f"  {failure}" for failure in sorted(failures)
+        ))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
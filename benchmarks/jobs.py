@@ -0,0 +1,79 @@
+"""
+Throughput of the background job queue.
+
+    python -m benchmarks.jobs
+    python -m benchmarks.jobs --jobs 2000 --concurrency 1,4,16 --sleep 5
+
+Queues ``--jobs`` jobs with ``enqueue()`` in one transaction, then
+drains them with a burst ``Worker`` at each ``--concurrency`` and
+reports jobs per second for both. ``--sleep`` makes every job wait that
+many milliseconds, like one that calls another service; with 0 the
+numbers are the overhead of the queue itself: one claim per batch, one
+DELETE per job.
+
+Workers need committed jobs, so nothing is rolled back; the benchmark's
+jobs are deleted at the end. ``--persistent`` keeps database connections
+open between jobs (CONN_MAX_AGE=None) instead of the configured value.
+"""
+import argparse
+import time
+
+from benchmarks.utils import setup
+
+setup()
+
+from django.db import connections, transaction  # noqa: E402
+
+from theatre.jobs import Worker, enqueue, job, job_name  # noqa: E402
+from theatre.models import Job  # noqa: E402
+
+
+@job
+def pause(milliseconds):
+    if milliseconds:
+        time.sleep(milliseconds / 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--concurrency", default="1,4,8")
+    parser.add_argument("--sleep", type=float, default=0.0)
+    parser.add_argument("--persistent", action="store_true")
+    args = parser.parse_args()
+
+    if args.persistent:
+        connections.settings["default"]["CONN_MAX_AGE"] = None
+    jobs = Job.objects.filter(name=job_name(pause))
+
+    print(f"{'run':<24} {'jobs':>7} {'seconds':>9} {'jobs/s':>9}")
+    try:
+        for concurrency in map(int, args.concurrency.split(",")):
+            jobs.delete()
+            started = time.perf_counter()
+            with transaction.atomic():
+                for _ in range(args.jobs):
+                    enqueue(pause, milliseconds=args.sleep)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{'enqueue':<24} {args.jobs:>7} {elapsed:>9.2f} "
+                f"{args.jobs / elapsed:>9.0f}"
+            )
+
+            worker = Worker(
+                concurrency=concurrency, poll_interval=0.1, burst=True
+            )
+            started = time.perf_counter()
+            worker.run()
+            elapsed = time.perf_counter() - started
+            assert worker.succeeded == args.jobs, worker.succeeded
+            print(
+                f"{f'run, {concurrency} threads':<24} {args.jobs:>7} "
+                f"{elapsed:>9.2f} {args.jobs / elapsed:>9.0f}"
+            )
+    finally:
+        jobs.delete()
+
+
+if __name__ == "__main__":
+    main()
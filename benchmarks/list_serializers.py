@@ -0,0 +1,119 @@
+"""
+Compare the list serializers with their values() projections.
+
+    python -m benchmarks.list_serializers --rows 1000
+
+For plays and performances, times fetching ``--rows`` rows and turning
+them into response data both ways, using the querysets of the viewsets.
+"""
+import argparse
+import random
+from datetime import timedelta
+
+from benchmarks.utils import measure, report, rolled_back, setup
+
+setup()
+
+from django.utils import timezone  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from theatre.models import (  # noqa: E402
+    Actor, Genre, Performance, Play, TheatreHall
+)
+from theatre.serializers import (  # noqa: E402
+    PerformanceListProjectionSerializer,
+    PerformanceListSerializer,
+    PlayListProjectionSerializer,
+    PlayListSerializer,
+)
+from theatre.views import PerformanceViewSet, PlayViewSet  # noqa: E402
+
+
+def create_data(rows, seed=42):
+    rnd = random.Random(seed)
+    genres = Genre.objects.bulk_create(
+        Genre(name=f"Genre {i}") for i in range(20)
+    )
+    actors = Actor.objects.bulk_create(
+        Actor(first_name=f"First{i}", last_name=f"Last{i}") for i in range(200)
+    )
+    plays = Play.objects.bulk_create(
+        Play(
+            title=f"Play {i}",
+            description="Benchmark",
+            image=f"uploads/plays/play-{i}.jpg" if i % 2 else None,
+        )
+        for i in range(rows)
+    )
+    Play.genres.through.objects.bulk_create(
+        Play.genres.through(play=play, genre=genre)
+        for play in plays
+        for genre in rnd.sample(genres, 3)
+    )
+    Play.actors.through.objects.bulk_create(
+        Play.actors.through(play=play, actor=actor)
+        for play in plays
+        for actor in rnd.sample(actors, 6)
+    )
+    halls = TheatreHall.objects.bulk_create(
+        TheatreHall(name=f"Hall {i}", rows=20, seats_in_row=25)
+        for i in range(5)
+    )
+    start = timezone.now() + timedelta(days=1)
+    Performance.objects.bulk_create(
+        Performance(
+            play=plays[i],
+            theatre_hall=halls[i % len(halls)],
+            show_time=start + timedelta(minutes=i),
+        )
+        for i in range(rows)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    context = {"request": APIRequestFactory().get("/", HTTP_HOST="localhost")}
+    cases = [
+        (
+            "plays",
+            PlayViewSet.queryset.filter(title__startswith="Play "),
+            PlayListSerializer,
+            PlayListProjectionSerializer,
+        ),
+        (
+            "performances",
+            PerformanceViewSet.queryset.filter(
+                play__title__startswith="Play "
+            ),
+            PerformanceListSerializer,
+            PerformanceListProjectionSerializer,
+        ),
+    ]
+
+    with rolled_back():
+        create_data(args.rows)
+        print(f"{args.rows} rows, fetch + serialize")
+        for name, queryset, serializer_class, projection_class in cases:
+            def serialize():
+                return serializer_class(
+                    list(queryset.all()), many=True, context=context
+                ).data
+
+            def project():
+                return projection_class(
+                    list(projection_class.project(queryset.all())),
+                    many=True,
+                    context=context,
+                ).data
+
+            assert serialize() == project()
+            report(f"{name} serializer", measure(serialize, args.repeat))
+            report(f"{name} projection", measure(project, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
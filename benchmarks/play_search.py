@@ -0,0 +1,86 @@
+"""
+Compare ``?search=`` with the ``?title=`` icontains filter on plays.
+
+    python -m benchmarks.play_search --plays 100000
+"""
+import argparse
+import random
+import string
+
+from benchmarks.utils import measure, report, rolled_back, setup
+
+setup()
+
+from django.db import connection  # noqa: E402
+
+from theatre.models import Play  # noqa: E402
+from theatre.search import search_plays  # noqa: E402
+
+
+def vocabulary(rnd, size=5000):
+    words = set()
+    while len(words) < size:
+        words.add(
+            "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 9)))
+        )
+    return sorted(words)
+
+
+def create_plays(count, seed=42):
+    """Create plays whose words follow a Zipf-like frequency curve."""
+    rnd = random.Random(seed)
+    words = vocabulary(rnd)
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    Play.objects.bulk_create(
+        (
+            Play(
+                title=f"{' '.join(rnd.choices(words, weights, k=3))} {i}",
+                description=" ".join(rnd.choices(words, weights, k=30)),
+            )
+            for i in range(count)
+        ),
+        batch_size=5000,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE theatre_play")
+    return words
+
+
+def page(queryset):
+    return queryset.count(), list(queryset.values_list("id", flat=True)[:5])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--plays", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with rolled_back():
+        words = create_plays(args.plays)
+        terms = (
+            words[200],
+            f"{words[30]} {words[60]}",
+            words[2000],
+            words[1000][:-1],
+        )
+        print(f"{args.plays} plays")
+        for term in terms:
+            report(
+                f"icontains {term!r}",
+                measure(
+                    lambda: page(Play.objects.filter(title__icontains=term)),
+                    args.repeat,
+                ),
+            )
+            report(
+                f"search    {term!r}",
+                measure(
+                    lambda: page(search_plays(Play.objects.all(), term)),
+                    args.repeat,
+                ),
+            )
+
+
+if __name__ == "__main__":
+    main()
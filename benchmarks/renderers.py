@@ -0,0 +1,75 @@
+"""
+Compare the response renderers on list serializer output.
+
+    python -m benchmarks.renderers --rows 1000
+
+Serializes ``--rows`` plays and performances with the list serializers
+once, then times rendering that data with DRF's JSONRenderer, the orjson
+backed FastJSONRenderer and MessagePackRenderer.
+"""
+import argparse
+
+from benchmarks.list_serializers import create_data
+from benchmarks.utils import measure, report, rolled_back, setup
+
+setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from theatre.renderers import (  # noqa: E402
+    FastJSONRenderer,
+    MessagePackRenderer,
+)
+from theatre.serializers import (  # noqa: E402
+    PerformanceListSerializer,
+    PlayListSerializer,
+)
+from theatre.views import PerformanceViewSet, PlayViewSet  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    context = {"request": APIRequestFactory().get("/", HTTP_HOST="localhost")}
+    renderers = [JSONRenderer(), FastJSONRenderer(), MessagePackRenderer()]
+
+    with rolled_back():
+        create_data(args.rows)
+        cases = [
+            (
+                "plays",
+                PlayListSerializer(
+                    PlayViewSet.queryset.filter(title__startswith="Play "),
+                    many=True,
+                    context=context,
+                ).data,
+            ),
+            (
+                "performances",
+                PerformanceListSerializer(
+                    PerformanceViewSet.queryset.filter(
+                        play__title__startswith="Play "
+                    ),
+                    many=True,
+                    context=context,
+                ).data,
+            ),
+        ]
+
+    print(f"{args.rows} rows, render")
+    for name, data in cases:
+        for renderer in renderers:
+            size = len(renderer.render(data))
+            report(
+                f"{name} {type(renderer).__name__} {size // 1024}KiB",
+                measure(lambda: renderer.render(data), args.repeat),
+                width=44,
+            )
+
+
+if __name__ == "__main__":
+    main()
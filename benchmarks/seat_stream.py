@@ -0,0 +1,149 @@
+"""
+Hold thousands of idle seat event streams open on one ASGI worker.
+
+    python -m benchmarks.seat_stream --subscribers 2000
+
+Reports Python memory per open stream and how long one committed NOTIFY
+takes to reach every subscriber.
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from benchmarks.utils import setup
+
+setup()
+
+from asgiref.sync import sync_to_async  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from theatre.models import Play, TheatreHall, Performance  # noqa: E402
+from theatre.streams import notify_seats, seat_event_hub  # noqa: E402
+
+application = get_asgi_application()
+
+
+async def open_stream(path, token, started, delivered, disconnect):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            started()
+        elif b"event: seat-claimed" in message.get("body", b""):
+            delivered()
+
+    await application(scope, receive, send)
+
+
+async def run(subscribers, performance, token):
+    path = f"/api/theatre/performances/{performance.id}/seat-events/"
+    disconnect = asyncio.Event()
+    all_started, all_delivered = asyncio.Event(), asyncio.Event()
+    counts = {"started": 0, "delivered": 0}
+
+    def started():
+        counts["started"] += 1
+        if counts["started"] == subscribers:
+            all_started.set()
+
+    def delivered():
+        counts["delivered"] += 1
+        if counts["delivered"] == subscribers:
+            all_delivered.set()
+
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    opened_at = time.perf_counter()
+    tasks = [
+        asyncio.create_task(
+            open_stream(path, token, started, delivered, disconnect)
+        )
+        for _ in range(subscribers)
+    ]
+    await all_started.wait()
+    opened_in = time.perf_counter() - opened_at
+    await asyncio.sleep(0.5)
+    held = sum(
+        stat.size_diff
+        for stat in tracemalloc.take_snapshot().compare_to(
+            baseline, "filename"
+        )
+    )
+    tracemalloc.stop()
+
+    await sync_to_async(seat_event_hub.listening.wait)(10)
+    sent_at = time.perf_counter()
+    await sync_to_async(notify_seats)(
+        [(performance.id, "seat-claimed", [(1, 1)])]
+    )
+    await all_delivered.wait()
+    fan_out = time.perf_counter() - sent_at
+
+    disconnect.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    print(f"{subscribers} idle streams opened in {opened_in:.2f}s")
+    print(f"python heap per stream   {held / subscribers / 1024:.1f} KiB")
+    print(f"notify -> all delivered  {fan_out * 1000:.1f}ms")
+    print(f"subscribers after close  {seat_event_hub.subscriber_count()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=2000)
+    args = parser.parse_args()
+
+    user = get_user_model().objects.create_user(
+        email=f"seat-stream-{time.time_ns()}@bench.local"
+    )
+    play = Play.objects.create(
+        title=f"Seat stream {time.time_ns()}", description="Benchmark"
+    )
+    hall = TheatreHall.objects.create(
+        name=f"Seat stream {time.time_ns()}", rows=10, seats_in_row=10
+    )
+    performance = Performance.objects.create(
+        play=play, theatre_hall=hall, show_time=timezone.now()
+    )
+    try:
+        asyncio.run(
+            run(args.subscribers, performance, str(AccessToken.for_user(user)))
+        )
+    finally:
+        seat_event_hub.stop()
+        play.delete()
+        hall.delete()
+        user.delete()
+
+
+if __name__ == "__main__":
+    main()
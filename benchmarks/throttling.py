@@ -0,0 +1,66 @@
+"""
+Per-request cost of the throttle check.
+
+    python -m benchmarks.throttling
+    python -m benchmarks.throttling --history 10,1000,10000 --repeat 2000
+
+Times ``allow_request`` of DRF's ``UserRateThrottle``, which keeps a
+list of request timestamps in the ``default`` cache, and of
+``theatre.throttling.UserRateThrottle``, which keeps two counters in
+the ``throttle`` cache. Before timing, each throttle sees ``--history``
+requests from the same user inside the window, as a busy client would
+have made; the rate is set high enough that every timed request is
+allowed. Point THROTTLE_CACHE_BACKEND at Redis or Memcached to include
+the round trips of a shared cache.
+"""
+import argparse
+from unittest import mock
+
+from benchmarks.utils import measure, report, setup
+
+setup()
+
+from django.core.cache import caches  # noqa: E402
+from rest_framework import throttling  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from theatre import throttling as sliding  # noqa: E402
+
+
+def check(throttle_class, request, history, repeat, warmup):
+    rate = f"{history + repeat + warmup + 1}/hour"
+    with mock.patch.dict(throttle_class.THROTTLE_RATES, user=rate):
+        for _ in range(history):
+            throttle_class().allow_request(request, None)
+
+        def allow():
+            assert throttle_class().allow_request(request, None)
+
+        return measure(allow, repeat=repeat, warmup=warmup)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history", default="10,1000,10000")
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args()
+
+    request = APIRequestFactory().get("/")
+    request.user = mock.Mock(is_authenticated=True, pk=1)
+    for history in map(int, args.history.split(",")):
+        for label, throttle_class, cache in (
+                ("DRF timestamp list", throttling.UserRateThrottle,
+                 "default"),
+                ("sliding window counter", sliding.UserRateThrottle,
+                 sliding.CACHE_ALIAS),
+        ):
+            caches[cache].clear()
+            samples = check(
+                throttle_class, request, history, args.repeat, args.warmup
+            )
+            report(f"{label}, {history} earlier requests", samples, 48)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Helpers shared by the benchmark scripts in this package.
+
+Benchmarks run from the project root against the configured database,
+e.g. ``python -m benchmarks.play_search``. Everything they create lives
+inside a transaction that is rolled back once they finish.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup():
+    os.environ.setdefault(
+        "DJANGO_SETTINGS_MODULE", "theatre_api_service.settings"
+    )
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def rolled_back():
+    from django.db import transaction
+
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def measure(func, repeat=20, warmup=2) -> list[float]:
+    """Call ``func`` repeatedly and return the wall time of each call."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def percentiles(samples) -> dict:
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": cuts[49],
+        "p95": cuts[94],
+        "p99": cuts[98],
+    }
+
+
+def report(name, samples, width=40):
+    stats = percentiles(samples)
+    print(
+        f"{name:<{width}} "
+        + "  ".join(
+            f"{key} {value * 1000:8.2f}ms" for key, value in stats.items()
+        )
+    )
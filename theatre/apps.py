@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class TheaterConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'theatre'
+
+    def ready(self):
+        import theatre.checks  # noqa: F401
+        import theatre.signals  # noqa: F401
+        from theatre import metrics
+
+        metrics.install()
@@ -0,0 +1,107 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+
+from theatre.exceptions import SeatsAlreadyTaken
+from theatre.models import Performance, Ticket
+from theatre.seatmap import SeatMap
+from theatre.streams import notify_seats
+
+
+def seat_key(ticket: Ticket) -> tuple:
+    return ticket.performance_id, ticket.row, ticket.seat
+
+
+def seat_maps(performances) -> dict[int, SeatMap]:
+    """Build seat maps for several performances with a single query."""
+    taken = {performance.id: [] for performance in performances}
+    for performance_id, row, seat in (
+            Ticket.objects
+            .filter(performance_id__in=taken)
+            .values_list("performance_id", "row", "seat")
+    ):
+        taken[performance_id].append((row, seat))
+    return {
+        performance.id: SeatMap(
+            performance.theatre_hall.rows,
+            performance.theatre_hall.seats_in_row,
+            taken[performance.id],
+        )
+        for performance in performances
+    }
+
+
+def _conflicts(tickets, maps) -> list[tuple]:
+    return [
+        seat_key(ticket)
+        for ticket in tickets
+        if maps[ticket.performance_id].is_taken(ticket.row, ticket.seat)
+    ]
+
+
+def claim_seats(reservation, tickets_data) -> list[Ticket]:
+    """
+    Sell the requested seats to ``reservation`` or raise SeatsAlreadyTaken.
+
+    Performances are locked in ascending id order and tickets are inserted
+    in (performance, row, seat) order, so overlapping multi-seat requests
+    always queue up on the same row lock instead of deadlocking. The unique
+    constraint on Ticket is the last line of defence for writes that
+    bypass this function. Performance.tickets_sold is bumped in the same
+    transaction, since bulk_create does not send the signals that keep it
+    in sync for single tickets.
+    """
+    tickets = sorted(
+        (
+            Ticket(reservation=reservation, **ticket_data)
+            for ticket_data in tickets_data
+        ),
+        key=seat_key,
+    )
+    performance_ids = sorted({ticket.performance_id for ticket in tickets})
+
+    with transaction.atomic():
+        performances = list(
+            Performance.objects
+            .select_for_update(of=("self",))
+            .select_related("theatre_hall")
+            .filter(id__in=performance_ids)
+            .order_by("id")
+        )
+
+        conflicts = _conflicts(tickets, seat_maps(performances))
+        if conflicts:
+            raise SeatsAlreadyTaken(conflicts)
+
+        try:
+            with transaction.atomic():
+                Ticket.objects.bulk_create(tickets)
+        except IntegrityError:
+            raise SeatsAlreadyTaken(
+                _conflicts(tickets, seat_maps(performances))
+            )
+
+        sold = Counter(ticket.performance_id for ticket in tickets)
+        notify_seats(
+            (
+                performance_id,
+                "seat-claimed",
+                [
+                    (ticket.row, ticket.seat)
+                    for ticket in tickets
+                    if ticket.performance_id == performance_id
+                ],
+            )
+            for performance_id in sold
+        )
+        Performance.objects.filter(id__in=sold).update(
+            tickets_sold=F("tickets_sold") + Case(
+                *(
+                    When(id=performance_id, then=Value(count))
+                    for performance_id, count in sold.items()
+                )
+            )
+        )
+
+    return tickets
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Backends whose entries another process (or node) cannot see.
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.filebased.FileBasedCache",
+}
+
+
+def _process_local(alias: str, consequence: str, variable: str, id: str):
+    backend = settings.CACHES.get(alias, {}).get("BACKEND")
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            f"The {alias} cache uses {backend}, so {consequence}.",
+            hint=(
+                f"Set {variable}_BACKEND and {variable}_LOCATION to a "
+                "Redis or Memcached server shared by all processes."
+            ),
+            id=id,
+        )
+    ]
+
+
+@register(Tags.caches)
+def check_throttle_cache(app_configs, **kwargs):
+    """
+    Warn when the throttle counters are not shared outside DEBUG.
+
+    Each worker of a production server would keep its own counters, so a
+    client gets the full rate from every worker it reaches.
+    """
+    return _process_local(
+        "throttle",
+        "every process keeps its own request counters",
+        "THROTTLE_CACHE",
+        "theatre.W001",
+    )
+
+
+@register(Tags.caches)
+def check_catalogue_cache(app_configs, **kwargs):
+    """
+    Warn when the catalogue versions are not shared outside DEBUG.
+
+    A write bumps the version only in the worker that handled it; the
+    others keep serving (and confirming ETags of) the old lists until
+    their entries expire.
+    """
+    return _process_local(
+        "catalogue",
+        "a write invalidates the cached lists of one process only",
+        "CATALOGUE_CACHE",
+        "theatre.W002",
+    )
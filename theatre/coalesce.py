@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical calls in this process into one.
+
+    The first caller for a key runs the computation while later callers
+    block on its result. The result is then reused for ``ttl`` seconds, so
+    a burst of polls costs one computation per window instead of one per
+    request. Errors are shared with the waiters but never reused.
+
+    ``ado`` does the same for coroutines: waiters await the leader's
+    future instead of blocking a thread. Fresh results are shared between
+    both paths.
+    """
+
+    def __init__(self, ttl: float = 1.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._async_calls: dict[Hashable, asyncio.Future] = {}
+        self._results: dict[Hashable, tuple[float, Any]] = {}
+        self.requests = 0
+        self.computed = 0
+        self.coalesced = 0
+        self.fresh_hits = 0
+
+    def _fresh(self, key: Hashable) -> tuple[bool, Any]:
+        self.requests += 1
+        cached = self._results.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.fresh_hits += 1
+            return True, cached[1]
+        return False, None
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            fresh, value = self._fresh(key)
+            if fresh:
+                return value
+
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.computed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = func()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and self.ttl > 0:
+                    self._store(key, call.value)
+            call.done.set()
+        return call.value
+
+    async def ado(
+            self, key: Hashable, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        with self._lock:
+            fresh, value = self._fresh(key)
+            if fresh:
+                return value
+
+            call = self._async_calls.get(key)
+            leader = call is None
+            if leader:
+                call = asyncio.get_running_loop().create_future()
+                self._async_calls[key] = call
+                self.computed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return await asyncio.shield(call)
+
+        try:
+            value = await func()
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except BaseException as error:
+            call.set_exception(error)
+            call.exception()
+            raise
+        else:
+            call.set_result(value)
+        finally:
+            with self._lock:
+                del self._async_calls[key]
+                if not call.cancelled() and call.exception() is None and (
+                        self.ttl > 0
+                ):
+                    self._store(key, value)
+        return value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        now = time.monotonic()
+        if len(self._results) >= self.max_entries:
+            self._results = {
+                k: v for k, v in self._results.items() if v[0] > now
+            }
+            if len(self._results) >= self.max_entries:
+                self._results.pop(next(iter(self._results)))
+        self._results[key] = (now + self.ttl, value)
+
+    def clear(self) -> None:
+        """Forget the fresh results; calls in flight are not affected."""
+        with self._lock:
+            self._results.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            shared = self.coalesced + self.fresh_hits
+            return {
+                "requests": self.requests,
+                "computed": self.computed,
+                "coalesced": self.coalesced,
+                "fresh_hits": self.fresh_hits,
+                "coalescing_ratio": (
+                    shared / self.requests if self.requests else 0.0
+                ),
+            }
@@ -0,0 +1,326 @@
+"""
+Reproducible synthetic data for load testing.
+
+Everything is drawn from one ``random.Random(seed)``, so the same options
+and seed always produce the same dataset. Demand follows a Zipf law over
+plays, with weekend and evening performances selling better, so a few
+shows sell out while the long tail stays mostly empty.
+
+Tickets and reservations are written with ``insert_rows`` in chunks of
+``CHUNK_SIZE`` tickets, so memory stays flat however many are generated.
+``tickets_sold`` is computed up front and written with the performances,
+since no ticket signals fire.
+"""
+import random
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate
+from typing import Callable
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.db.models import Max, Model
+from django.utils import timezone
+
+from theatre.cache import bump_version
+from theatre.importer import BATCH_SIZE, insert_rows
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    Ticket,
+    TheatreHall,
+)
+
+CHUNK_SIZE = 200_000
+ZIPF_EXPONENT = 1.1
+RESERVATION_SIZES = (1, 2, 2, 2, 3, 4, 4, 6)
+SHOW_TIMES = (time(12), time(15), time(18), time(19), time(20))
+
+GENRE_NAMES = (
+    "Drama", "Comedy", "Tragedy", "Musical", "Opera", "Ballet", "Farce",
+    "Satire", "Mystery", "Romance", "Historical", "Absurdist", "Children",
+    "Documentary", "Cabaret", "Puppetry", "Experimental", "Melodrama",
+)
+FIRST_NAMES = (
+    "Anna", "Boris", "Clara", "Daniel", "Elena", "Felix", "Grace", "Hugo",
+    "Iris", "Jonas", "Kira", "Leo", "Maria", "Nikolai", "Olga", "Pavel",
+    "Rosa", "Simon", "Tara", "Victor", "Wanda", "Yuri", "Zoe", "Adam",
+)
+LAST_NAMES = (
+    "Abbott", "Bauer", "Chen", "Dvorak", "Evans", "Fischer", "Garcia",
+    "Horvat", "Ivanova", "Jensen", "Kowalski", "Larsen", "Moreau",
+    "Novak", "Olsen", "Petrov", "Quinn", "Rossi", "Schmidt", "Tanaka",
+)
+TITLE_WORDS = (
+    "Night", "Garden", "Winter", "Storm", "Mirror", "House", "Letters",
+    "Crown", "River", "Silence", "Masks", "Journey", "Orchard", "Glass",
+    "Harbour", "Lantern", "Wolves", "Echoes", "Tides", "Feast",
+)
+
+
+def allocate_ids(model: type[Model], count: int) -> int:
+    """
+    Reserve ``count`` consecutive primary keys and return the first one.
+
+    Rows inserted with explicit ids do not advance the sequence, so the
+    block is claimed from it up front.
+    """
+    if not count:
+        return 0
+    if connection.vendor != "postgresql":
+        return (model.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            "nextval(pg_get_serial_sequence(%s, 'id')) + %s - 1)",
+            [table, table, count],
+        )
+        return cursor.fetchone()[0] - count + 1
+
+
+def zipf_weights(count: int, exponent: float = ZIPF_EXPONENT) -> list[float]:
+    return [1 / rank ** exponent for rank in range(1, count + 1)]
+
+
+def fill(demand: list[float], capacity: list[int], total: int) -> list[int]:
+    """
+    Split ``total`` tickets in proportion to ``demand`` without exceeding
+    any ``capacity``; what a sold out performance cannot take is spread
+    over the others.
+    """
+    sold = [0] * len(demand)
+    remaining = min(total, sum(capacity))
+    open_ = [index for index, limit in enumerate(capacity) if limit]
+    while remaining and open_:
+        weight = sum(demand[index] for index in open_)
+        given = 0
+        for index in open_:
+            share = int(remaining * demand[index] / weight)
+            share = min(max(share, 1), capacity[index] - sold[index])
+            share = min(share, remaining - given)
+            sold[index] += share
+            given += share
+        remaining -= given
+        open_ = [index for index in open_ if sold[index] < capacity[index]]
+    return sold
+
+
+class DatasetGenerator:
+    def __init__(
+            self,
+            *,
+            seed: int = 42,
+            halls: int = 10,
+            plays: int = 500,
+            genres: int = 12,
+            actors: int = 2000,
+            users: int = 10_000,
+            performances: int = 5000,
+            tickets: int = 1_000_000,
+            start: date | None = None,
+            days: int = 180,
+            log: Callable[[str], None] = print,
+    ):
+        self.random = random.Random(seed)
+        self.seed = seed
+        self.counts = {
+            "halls": halls,
+            "plays": plays,
+            "genres": genres,
+            "actors": actors,
+            "users": users,
+            "performances": performances,
+            "tickets": tickets if users else 0,
+        }
+        self.start = start or timezone.localdate()
+        self.days = days
+        self.log = log
+
+    def _title(self, index: int) -> str:
+        first, second = self.random.sample(TITLE_WORDS, 2)
+        return f"The {first} of {second} #{self.seed}-{index}"
+
+    def catalogue(self) -> tuple[list, list]:
+        counts = self.counts
+        genres = Genre.objects.bulk_create(
+            Genre(name=f"{GENRE_NAMES[i % len(GENRE_NAMES)]} {self.seed}-{i}")
+            for i in range(counts["genres"])
+        )
+        actors = Actor.objects.bulk_create(
+            (
+                Actor(
+                    first_name=self.random.choice(FIRST_NAMES),
+                    last_name=self.random.choice(LAST_NAMES),
+                )
+                for _ in range(counts["actors"])
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        plays = Play.objects.bulk_create(
+            (
+                Play(
+                    title=self._title(i),
+                    description="Synthetic play for load testing.",
+                    duration=self.random.choice((60, 90, 120, 150, 180)),
+                )
+                for i in range(counts["plays"])
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        genre_weights = list(accumulate(zipf_weights(len(genres))))
+        actor_weights = list(accumulate(zipf_weights(len(actors), 0.8)))
+        insert_rows(Play.genres.through, ("play_id", "genre_id"), list({
+            (play.id, genre.id)
+            for play in plays
+            for genre in self.random.choices(
+                genres, cum_weights=genre_weights, k=self.random.randint(1, 3)
+            )
+        }), ignore_conflicts=True)
+        insert_rows(Play.actors.through, ("play_id", "actor_id"), list({
+            (play.id, actor.id)
+            for play in plays
+            for actor in self.random.choices(
+                actors, cum_weights=actor_weights, k=self.random.randint(3, 12)
+            )
+        }), ignore_conflicts=True)
+        halls = TheatreHall.objects.bulk_create(
+            TheatreHall(
+                name=f"Hall {self.seed}-{i}",
+                rows=self.random.randint(8, 30),
+                seats_in_row=self.random.randint(10, 40),
+            )
+            for i in range(counts["halls"])
+        )
+        for model in (Genre, Actor, TheatreHall, Play):
+            bump_version(model)
+        return plays, halls
+
+    def users(self) -> list[int]:
+        password = make_password(None)
+        users = get_user_model().objects.bulk_create(
+            (
+                get_user_model()(
+                    email=f"loadtest-{self.seed}-{i}@example.com",
+                    password=password,
+                )
+                for i in range(self.counts["users"])
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        return [user.id for user in users]
+
+    def schedule(self, plays: list, halls: list) -> list[tuple]:
+        """Return performance rows with the tickets each one will sell."""
+        popularity = plays[:]
+        self.random.shuffle(popularity)
+        play_weights = dict(zip(
+            (play.id for play in popularity), zipf_weights(len(popularity))
+        ))
+        cumulative = list(accumulate(play_weights.values()))
+        rows = []
+        for _ in range(self.counts["performances"]):
+            play = self.random.choices(popularity, cum_weights=cumulative)[0]
+            hall = self.random.choice(halls)
+            day = self.start + timedelta(days=self.random.randrange(self.days))
+            show_time = timezone.make_aware(
+                datetime.combine(day, self.random.choice(SHOW_TIMES))
+            )
+            demand = play_weights[play.id] * self.random.uniform(0.5, 1.5)
+            if day.weekday() >= 5:
+                demand *= 1.5
+            if show_time.hour >= 18:
+                demand *= 1.3
+            rows.append((play.id, hall, show_time, demand))
+
+        sold = fill(
+            [row[3] for row in rows],
+            [hall.capacity for _, hall, _, _ in rows],
+            self.counts["tickets"],
+        )
+        first_id = allocate_ids(Performance, len(rows))
+        insert_rows(
+            Performance,
+            ("id", "play_id", "theatre_hall_id", "show_time", "tickets_sold"),
+            [
+                (first_id + index, play_id, hall.id, show_time, count)
+                for index, ((play_id, hall, show_time, _), count)
+                in enumerate(zip(rows, sold))
+            ],
+        )
+        return [
+            (first_id + index, hall, show_time, count)
+            for index, ((_, hall, show_time, _), count)
+            in enumerate(zip(rows, sold))
+            if count
+        ]
+
+    def tickets(self, performances: list[tuple], users: list[int]) -> int:
+        now = timezone.now()
+        reservations, tickets, written = [], [], 0
+
+        def flush():
+            first_id = allocate_ids(Reservation, len(reservations))
+            insert_rows(
+                Reservation,
+                ("id", "created_at", "user_id"),
+                [
+                    (first_id + index, created_at, user_id)
+                    for index, (created_at, user_id) in enumerate(reservations)
+                ],
+            )
+            insert_rows(
+                Ticket,
+                ("row", "seat", "performance_id", "reservation_id"),
+                [
+                    (row, seat, performance_id, first_id + index)
+                    for row, seat, performance_id, index in tickets
+                ],
+            )
+            reservations.clear()
+            tickets.clear()
+
+        for performance_id, hall, show_time, sold in performances:
+            seats = self.random.sample(range(hall.capacity), sold)
+            sales_end = min(show_time, now)
+            position = 0
+            while position < sold:
+                size = self.random.choice(RESERVATION_SIZES)
+                group = seats[position:position + size]
+                position += size
+                reservations.append((
+                    sales_end - timedelta(
+                        seconds=self.random.randrange(60 * 24 * 3600)
+                    ),
+                    self.random.choice(users),
+                ))
+                index = len(reservations) - 1
+                tickets.extend(
+                    (
+                        seat // hall.seats_in_row + 1,
+                        seat % hall.seats_in_row + 1,
+                        performance_id,
+                        index,
+                    )
+                    for seat in group
+                )
+            if len(tickets) >= CHUNK_SIZE:
+                written += len(tickets)
+                flush()
+                self.log(f"{written} tickets written")
+        written += len(tickets)
+        flush()
+        return written
+
+    def generate(self) -> dict[str, int]:
+        plays, halls = self.catalogue()
+        self.log(f"{len(plays)} plays in {len(halls)} halls created")
+        users = self.users()
+        self.log(f"{len(users)} users created")
+        performances = self.schedule(plays, halls)
+        self.log(f"{self.counts['performances']} performances created")
+        tickets = self.tickets(performances, users)
+        return {**self.counts, "tickets": tickets}
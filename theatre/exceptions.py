@@ -0,0 +1,18 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class SeatsAlreadyTaken(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Some of the requested seats are already taken."
+    default_code = "seats_taken"
+
+    def __init__(self, seats, detail=None, code=None):
+        super().__init__(detail=detail, code=code)
+        self.detail = {
+            "detail": self.detail,
+            "seats": [
+                {"performance": performance_id, "row": row, "seat": seat}
+                for performance_id, row, seat in seats
+            ],
+        }
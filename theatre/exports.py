@@ -0,0 +1,97 @@
+"""
+Streaming exports of tickets and reservations.
+
+Rows are read with ``iterator(chunk_size=...)``, which uses a server-side
+cursor on PostgreSQL, and each chunk is encoded and sent before the next
+one is fetched, so memory stays flat however many rows are exported.
+"""
+from datetime import datetime
+from itertools import islice
+from typing import AsyncIterator, Iterator
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, QuerySet
+from rest_framework import serializers
+
+from theatre.renderers import RowRenderer
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (column name, lookup) pairs, in output order.
+TICKET_COLUMNS = (
+    ("ticket_id", "id"),
+    ("reservation_id", "reservation_id"),
+    ("reserved_at", "reservation__created_at"),
+    ("user_email", "reservation__user__email"),
+    ("performance_id", "performance_id"),
+    ("show_time", "performance__show_time"),
+    ("play_id", "performance__play_id"),
+    ("play_title", "performance__play__title"),
+    ("theatre_hall", "performance__theatre_hall__name"),
+    ("row", "row"),
+    ("seat", "seat"),
+)
+
+RESERVATION_COLUMNS = (
+    ("reservation_id", "id"),
+    ("created_at", "created_at"),
+    ("user_email", "user__email"),
+    ("tickets", "ticket_count"),
+)
+
+_datetime_field = serializers.DateTimeField()
+
+
+def ticket_rows(queryset: QuerySet) -> QuerySet:
+    return queryset.order_by("id").values_list(
+        *(lookup for _, lookup in TICKET_COLUMNS)
+    )
+
+
+def reservation_rows(queryset: QuerySet) -> QuerySet:
+    return (
+        queryset.annotate(ticket_count=Count("tickets"))
+        .order_by("id")
+        .values_list(*(lookup for _, lookup in RESERVATION_COLUMNS))
+    )
+
+
+def _format(row: tuple) -> list:
+    return [
+        _datetime_field.to_representation(value)
+        if isinstance(value, datetime) else value
+        for value in row
+    ]
+
+
+def _names(columns) -> list[str]:
+    return [name for name, _ in columns]
+
+
+def stream_rows(
+        rows: QuerySet, columns, renderer: RowRenderer
+) -> Iterator[bytes]:
+    names = _names(columns)
+    yield renderer.header(names)
+    rows = rows.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    while chunk := list(islice(rows, EXPORT_CHUNK_SIZE)):
+        yield renderer.render_rows(names, [_format(row) for row in chunk])
+
+
+async def astream_rows(
+        rows: QuerySet, columns, renderer: RowRenderer
+) -> AsyncIterator[bytes]:
+    """
+    ``stream_rows`` for ASGI.
+
+    Django buffers a sync iterator completely before sending it from an
+    ASGI worker, which would defeat streaming. QuerySet.aiterator() cannot
+    be used either: for values_list() it runs the query on the event loop.
+    Each chunk is fetched from the server-side cursor in a thread instead.
+    """
+    names = _names(columns)
+    yield renderer.header(names)
+    rows = await sync_to_async(rows.iterator)(chunk_size=EXPORT_CHUNK_SIZE)
+    fetch = sync_to_async(lambda: list(islice(rows, EXPORT_CHUNK_SIZE)))
+    while chunk := await fetch():
+        yield renderer.render_rows(names, [_format(row) for row in chunk])
@@ -0,0 +1,105 @@
+"""
+Resized WebP variants of play posters.
+
+Each uploaded poster gets one WebP file per width in ``VARIANT_WIDTHS``
+(never wider than the original), stored next to it under a path derived
+from its name only::
+
+    uploads/plays/<sha256>.jpg
+    uploads/plays/variants/<sha256>-320w.webp
+
+so list serializers build the URLs from ``Play.image`` and
+``Play.image_widths`` without touching storage. ``image_widths`` stays
+empty until the variants exist and is reset when a new poster is
+uploaded. Poster names are content hashes (theatre.media), so a variant
+URL never points at a different picture.
+
+Variants are rendered by a background job (``theatre.jobs``) queued in
+the upload transaction, so the upload request only pays for storing the
+original. ``manage.py generate_image_variants`` renders whatever is
+missing, e.g. for posters uploaded before variants existed.
+"""
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from theatre.cache import bump_version
+from theatre.jobs import enqueue, job
+from theatre.models import Play
+
+VARIANT_WIDTHS = (160, 320, 640)
+THUMB_WIDTH = 320
+WEBP_QUALITY = 80
+
+
+def variant_path(name: str, width: int) -> str:
+    directory, filename = os.path.split(name)
+    stem, _ = os.path.splitext(filename)
+    return os.path.join(directory, "variants", f"{stem}-{width}w.webp")
+
+
+def variant_widths(width: int) -> list[int]:
+    """Variant widths for an original ``width`` pixels wide."""
+    return sorted({min(variant, width) for variant in VARIANT_WIDTHS})
+
+
+def thumb_width(widths: list[int]) -> int | None:
+    """The widest variant up to ``THUMB_WIDTH``, else the narrowest."""
+    if not widths:
+        return None
+    fitting = [width for width in widths if width <= THUMB_WIDTH]
+    return max(fitting) if fitting else min(widths)
+
+
+def render_variants(file) -> dict[int, bytes]:
+    """Encode ``file`` as WebP at every variant width."""
+    with Image.open(file) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert(
+            "RGBA" if "transparency" in image.info or "A" in image.mode
+            else "RGB"
+        )
+
+    variants = {}
+    for width in variant_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize(
+            (width, height), Image.Resampling.LANCZOS, reducing_gap=3.0
+        )
+        buffer = BytesIO()
+        resized.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+        variants[width] = buffer.getvalue()
+    return variants
+
+
+@job
+def generate_variants(play_id: int, name: str) -> list[int]:
+    """
+    Store the variants of poster ``name`` and record their widths.
+
+    Widths are only recorded while ``name`` is still the play's poster;
+    the files of a poster replaced in the meantime are still written,
+    since their paths cannot clash with the new one.
+    """
+    storage = Play._meta.get_field("image").storage
+    with storage.open(name) as file:
+        variants = render_variants(file)
+    for width, data in variants.items():
+        storage.save_at(variant_path(name, width), ContentFile(data))
+
+    widths = list(variants)
+    if Play.objects.filter(pk=play_id, image=name).update(
+            image_widths=widths
+    ):
+        bump_version(Play)
+    return widths
+
+
+def schedule_variants(play: Play) -> None:
+    """Queue the rendering of the variants of ``play.image``."""
+    if play.image:
+        enqueue(generate_variants, play_id=play.pk, name=play.image.name)
@@ -0,0 +1,447 @@
+"""
+Bulk import of catalogue and schedule data from CSV or JSON files.
+
+Each file holds one kind of record and is named after it, e.g.
+``genres.csv`` or ``performances.json``:
+
+- genres: name
+- actors: first_name, last_name
+- theatre_halls: name, rows, seats_in_row
+- plays: title, description, duration (optional), genres, actors
+- performances: play, theatre_hall, show_time
+
+Related records are referenced by natural key: genre name, actor full
+name ("First Last"), play title and hall name. In CSV the genres and
+actors of a play are separated by ``|``; in JSON they are lists.
+
+Records whose natural key already exists are left untouched, so running
+the same import twice creates nothing the second time. Play links are
+added with ``ignore_conflicts`` and are therefore additive.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+
+from django.db import connection, transaction
+from django.db.models import Model, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from theatre.cache import bump_version
+from theatre.models import Actor, Genre, Performance, Play, TheatreHall
+
+BATCH_SIZE = 5000
+LIST_SEPARATOR = "|"
+ENTITIES = ("genres", "actors", "theatre_halls", "plays", "performances")
+
+
+# Natural key of each kind of record, used to reject duplicates in a file.
+KEYS = {
+    "genres": lambda row: row["name"],
+    "actors": lambda row: f"{row['first_name']} {row['last_name']}",
+    "theatre_halls": lambda row: row["name"],
+    "plays": lambda row: row["title"],
+    "performances": lambda row: (
+        row["play"], row["theatre_hall"], row["show_time"]
+    ),
+}
+
+
+class ImportFailed(Exception):
+    def __init__(self, errors: list[str]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} invalid records")
+
+
+def _batches(values: list, size: int = BATCH_SIZE) -> Iterable[list]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _as_list(value) -> list:
+    return value if isinstance(value, list) else [value]
+
+
+def resolve(model: type[Model], field: str, values: Iterable) -> dict:
+    """Map natural keys to ids, querying ``BATCH_SIZE`` keys at a time."""
+    queryset = model.objects.all()
+    if model is Actor and field == "full_name":
+        queryset = queryset.annotate(
+            full_name=Concat("first_name", Value(" "), "last_name")
+        )
+    ids = {}
+    for batch in _batches(list(set(values))):
+        ids.update(
+            queryset.filter(**{f"{field}__in": batch})
+            .values_list(field, "id")
+        )
+    return ids
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    text = value.isoformat() if isinstance(value, datetime) else str(value)
+    return (
+        text.replace("\\", "\\\\").replace("\t", "\\t")
+        .replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def insert_rows(
+        model: type[Model],
+        fields: tuple[str, ...],
+        rows: list[tuple],
+        ignore_conflicts: bool = False,
+) -> None:
+    """
+    Insert plain value tuples into ``model``'s table.
+
+    On PostgreSQL the rows are streamed with ``COPY`` into a temporary
+    table and moved over with one INSERT ... SELECT, which skips building
+    and compiling tens of thousands of model instances and placeholders.
+    Other backends fall back to ``bulk_create``.
+    """
+    if not rows:
+        return
+    if connection.vendor != "postgresql":
+        model.objects.bulk_create(
+            (model(**dict(zip(fields, row))) for row in rows),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=ignore_conflicts,
+        )
+        return
+
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    staging = quote(f"import_{model._meta.db_table}")
+    columns = ", ".join(
+        quote(model._meta.get_field(field).column) for field in fields
+    )
+    data = io.StringIO("".join(
+        "\t".join(map(_copy_value, row)) + "\n" for row in rows
+    ))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {staging} AS "
+            f"SELECT {columns} FROM {table} WITH NO DATA"
+        )
+        cursor.cursor.copy_expert(
+            f"COPY {staging} ({columns}) FROM STDIN", data
+        )
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) "
+            f"SELECT {columns} FROM {staging}"
+            + (" ON CONFLICT DO NOTHING" if ignore_conflicts else "")
+        )
+        cursor.execute(f"DROP TABLE {staging}")
+
+
+def read_records(path: Path) -> list[tuple[str, dict]]:
+    """Return ``(location, record)`` pairs from a CSV or JSON file."""
+    if path.suffix == ".json":
+        with path.open(encoding="utf-8") as file:
+            data = json.load(file)
+        if not isinstance(data, list):
+            raise ImportFailed([f"{path.name}: expected a list of objects"])
+        return [
+            (f"{path.name}[{index}]", record)
+            for index, record in enumerate(data)
+        ]
+
+    with path.open(newline="", encoding="utf-8-sig") as file:
+        reader = csv.DictReader(file)
+        return [
+            (f"{path.name}:{reader.line_num}", record) for record in reader
+        ]
+
+
+def find_files(paths: Iterable[Path]) -> dict[str, Path]:
+    """Pick ``<entity>.csv``/``<entity>.json`` files from files or dirs."""
+    files = {}
+    for path in paths:
+        candidates = (
+            sorted(path.iterdir()) if path.is_dir() else [path]
+        )
+        for candidate in candidates:
+            if candidate.stem in ENTITIES and candidate.suffix in (
+                    ".csv", ".json"
+            ):
+                files[candidate.stem] = candidate
+            elif not path.is_dir():
+                raise ImportFailed(
+                    [f"{candidate.name}: not one of {', '.join(ENTITIES)}"]
+                )
+    return files
+
+
+class CatalogueImport:
+    """Validate parsed records, then insert what is missing in bulk."""
+
+    def __init__(self, records: dict[str, list[tuple[str, dict]]]):
+        self.records = records
+        self.errors: list[str] = []
+        self.rows: dict[str, list] = {}
+        self.counts: dict[str, tuple[int, int]] = {}
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[Path]) -> "CatalogueImport":
+        return cls({
+            entity: read_records(path)
+            for entity, path in find_files(paths).items()
+        })
+
+    # Parsing
+
+    def _text(
+            self, location, record, field, model, model_field=None,
+            required=True,
+    ):
+        value = record.get(field)
+        value = "" if value is None else str(value).strip()
+        max_length = model._meta.get_field(model_field or field).max_length
+        if required and not value:
+            self.errors.append(f"{location}: {field} is required")
+        elif max_length and len(value) > max_length:
+            self.errors.append(
+                f"{location}: {field} is longer than {max_length}"
+            )
+        return value
+
+    def _positive_int(self, location, record, field, default=None):
+        value = record.get(field)
+        if value in (None, "") and default is not None:
+            return default
+        try:
+            value = int(value)
+            if value < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            self.errors.append(
+                f"{location}: {field} must be a positive integer"
+            )
+            return None
+        return value
+
+    def _names(self, record, field) -> list[str]:
+        value = record.get(field) or []
+        if isinstance(value, str):
+            value = value.split(LIST_SEPARATOR)
+        return [str(name).strip() for name in value if str(name).strip()]
+
+    def _datetime(self, location, record, field) -> datetime | None:
+        value = str(record.get(field) or "").strip()
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            self.errors.append(
+                f"{location}: {field} must be an ISO 8601 datetime"
+            )
+            return None
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def parse(self) -> None:
+        parsed = {entity: [] for entity in ENTITIES}
+        for location, record in self.records.get("genres", []):
+            parsed["genres"].append((location, {
+                "name": self._text(location, record, "name", Genre),
+            }))
+        for location, record in self.records.get("actors", []):
+            parsed["actors"].append((location, {
+                "first_name": self._text(
+                    location, record, "first_name", Actor
+                ),
+                "last_name": self._text(location, record, "last_name", Actor),
+            }))
+        for location, record in self.records.get("theatre_halls", []):
+            parsed["theatre_halls"].append((location, {
+                "name": self._text(location, record, "name", TheatreHall),
+                "rows": self._positive_int(location, record, "rows"),
+                "seats_in_row": self._positive_int(
+                    location, record, "seats_in_row"
+                ),
+            }))
+        for location, record in self.records.get("plays", []):
+            parsed["plays"].append((location, {
+                "title": self._text(location, record, "title", Play),
+                "description": self._text(
+                    location, record, "description", Play, required=False,
+                ),
+                "duration": self._positive_int(
+                    location, record, "duration", default=60
+                ),
+                "genres": self._names(record, "genres"),
+                "actors": self._names(record, "actors"),
+                "location": location,
+            }))
+        for location, record in self.records.get("performances", []):
+            parsed["performances"].append((location, {
+                "play": self._text(location, record, "play", Play, "title"),
+                "theatre_hall": self._text(
+                    location, record, "theatre_hall", TheatreHall, "name"
+                ),
+                "show_time": self._datetime(location, record, "show_time"),
+                "location": location,
+            }))
+
+        for entity, key in KEYS.items():
+            rows = parsed[entity]
+            seen = {}
+            for location, row in rows:
+                seen_at = seen.setdefault(key(row), location)
+                if seen_at != location:
+                    self.errors.append(f"{location}: duplicate of {seen_at}")
+            self.rows[entity] = [row for _, row in rows]
+
+    def check_references(self) -> None:
+        """Report play and performance references that resolve nowhere."""
+        references = [
+            ("plays", "genres", Genre, "name",
+             {row["name"] for row in self.rows["genres"]}),
+            ("plays", "actors", Actor, "full_name",
+             {f"{row['first_name']} {row['last_name']}"
+              for row in self.rows["actors"]}),
+            ("performances", "play", Play, "title",
+             {row["title"] for row in self.rows["plays"]}),
+            ("performances", "theatre_hall", TheatreHall, "name",
+             {row["name"] for row in self.rows["theatre_halls"]}),
+        ]
+        for entity, field, model, key, known in references:
+            wanted = {
+                name
+                for row in self.rows[entity]
+                for name in _as_list(row[field])
+            } - known
+            missing = wanted - resolve(model, key, wanted).keys()
+            for row in self.rows[entity]:
+                for name in _as_list(row[field]):
+                    if name in missing:
+                        self.errors.append(
+                            f"{row['location']}: unknown "
+                            f"{model._meta.verbose_name} {name!r}"
+                        )
+
+    def validate(self) -> None:
+        self.parse()
+        if not self.errors:
+            self.check_references()
+        if self.errors:
+            raise ImportFailed(self.errors)
+
+    # Writing
+
+    def _insert(self, entity, model, field, rows, build) -> dict:
+        """Create the rows whose key is new; return ids for every key."""
+        ids = resolve(model, field, (row[0] for row in rows))
+        new = [row for row in rows if row[0] not in ids]
+        created = model.objects.bulk_create(
+            (build(row) for row in new), batch_size=BATCH_SIZE
+        )
+        ids.update((row[0], obj.pk) for row, obj in zip(new, created))
+        self.counts[entity] = (len(new), len(rows) - len(new))
+        return ids
+
+    def _link(self, field, play_ids, target_ids) -> None:
+        through = getattr(Play, field).through
+        insert_rows(
+            through,
+            ("play_id", f"{field[:-1]}_id"),
+            list({
+                (play_ids[row["title"]], target_ids[name])
+                for row in self.rows["plays"]
+                for name in row[field]
+            }),
+            ignore_conflicts=True,
+        )
+
+    def run(self) -> dict[str, tuple[int, int]]:
+        """
+        Validate and import everything; return ``(created, existing)`` per
+        entity. Call inside a transaction.
+        """
+        self.validate()
+
+        genre_ids = self._insert(
+            "genres", Genre, "name",
+            [(row["name"],) for row in self.rows["genres"]],
+            lambda row: Genre(name=row[0]),
+        )
+        actor_ids = self._insert(
+            "actors", Actor, "full_name",
+            [
+                (f"{row['first_name']} {row['last_name']}", row)
+                for row in self.rows["actors"]
+            ],
+            lambda row: Actor(
+                first_name=row[1]["first_name"], last_name=row[1]["last_name"]
+            ),
+        )
+        hall_ids = self._insert(
+            "theatre_halls", TheatreHall, "name",
+            [(row["name"], row) for row in self.rows["theatre_halls"]],
+            lambda row: TheatreHall(
+                name=row[0],
+                rows=row[1]["rows"],
+                seats_in_row=row[1]["seats_in_row"],
+            ),
+        )
+        play_ids = self._insert(
+            "plays", Play, "title",
+            [(row["title"], row) for row in self.rows["plays"]],
+            lambda row: Play(
+                title=row[0],
+                description=row[1]["description"],
+                duration=row[1]["duration"],
+            ),
+        )
+
+        genre_ids.update(resolve(Genre, "name", (
+            name for row in self.rows["plays"] for name in row["genres"]
+        )))
+        actor_ids.update(resolve(Actor, "full_name", (
+            name for row in self.rows["plays"] for name in row["actors"]
+        )))
+        self._link("genres", play_ids, genre_ids)
+        self._link("actors", play_ids, actor_ids)
+
+        performances = self.rows["performances"]
+        play_ids.update(
+            resolve(Play, "title", (row["play"] for row in performances))
+        )
+        hall_ids.update(resolve(TheatreHall, "name", (
+            row["theatre_hall"] for row in performances
+        )))
+        keys = [
+            (play_ids[row["play"]], hall_ids[row["theatre_hall"]],
+             row["show_time"])
+            for row in performances
+        ]
+        existing = set()
+        for batch in _batches(keys):
+            existing.update(
+                Performance.objects.filter(
+                    play_id__in={key[0] for key in batch},
+                    show_time__in={key[2] for key in batch},
+                ).values_list("play_id", "theatre_hall_id", "show_time")
+            )
+        new = [key for key in keys if key not in existing]
+        insert_rows(
+            Performance,
+            ("play_id", "theatre_hall_id", "show_time", "tickets_sold"),
+            [key + (0,) for key in new],
+        )
+        self.counts["performances"] = (len(new), len(keys) - len(new))
+
+        # bulk_create() sends no post_save, so cached catalogue reads
+        # have to be invalidated here.
+        for model in (Genre, Actor, TheatreHall, Play):
+            bump_version(model)
+        return self.counts
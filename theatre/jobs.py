@@ -0,0 +1,245 @@
+"""
+Background jobs stored in PostgreSQL.
+
+Functions decorated with ``@job`` are queued with
+``enqueue(func, **kwargs)``; the keyword arguments must be JSON
+serializable. A job is a row of ``Job``, so enqueueing is part of the
+surrounding transaction: the job becomes visible when it commits and is
+gone if it rolls back.
+
+``manage.py run_jobs`` claims due jobs with ``FOR UPDATE SKIP LOCKED``,
+so any number of workers can poll the same table without handing a job
+out twice or waiting on each other's row locks, and runs them on a
+thread pool. A job that returns is deleted. One that raises is queued
+again ``backoff(attempts)`` seconds later, until ``max_attempts`` is
+reached; then it stays in the table as failed, with its traceback.
+Jobs still running after ``JOBS_LOCK_TIMEOUT`` seconds are taken to
+belong to a dead worker and queued again, so jobs must be safe to run
+more than once.
+"""
+import json
+import logging
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Callable, NamedTuple
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from theatre.models import Job
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+# Seconds between checks for jobs abandoned by dead workers.
+RECOVERY_INTERVAL = 60
+
+_CLAIM = """
+    UPDATE {table}
+    SET status = 'running', attempts = attempts + 1,
+        locked_at = statement_timestamp()
+    WHERE id IN (
+        SELECT id FROM {table}
+        WHERE status = 'queued' AND run_at <= statement_timestamp()
+        ORDER BY run_at, id
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, name, payload::text, attempts, max_attempts
+"""
+
+
+class ClaimedJob(NamedTuple):
+    id: int
+    name: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+
+
+def job(func: Callable = None, *, max_attempts: int = MAX_ATTEMPTS):
+    """Allow ``func`` to be queued, with ``@job`` or ``@job(...)``."""
+    def decorate(func):
+        func.job_max_attempts = max_attempts
+        return func
+
+    return decorate if func is None else decorate(func)
+
+
+def job_name(func: Callable) -> str:
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def enqueue(func: Callable, *, run_at: datetime = None, **kwargs) -> Job:
+    """Queue a call of ``func(**kwargs)``, due now or at ``run_at``."""
+    if not hasattr(func, "job_max_attempts"):
+        raise TypeError(f"{job_name(func)} is not a @job function")
+    return Job.objects.create(
+        name=job_name(func),
+        payload=kwargs,
+        max_attempts=func.job_max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+def backoff(attempts: int) -> float:
+    """Seconds to wait before retrying a job that failed ``attempts``."""
+    return min(
+        settings.JOBS_BACKOFF * 2 ** (attempts - 1), settings.JOBS_BACKOFF_MAX
+    )
+
+
+def claim_jobs(limit: int) -> list[ClaimedJob]:
+    """Mark up to ``limit`` due jobs as running and return them."""
+    table = connection.ops.quote_name(Job._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(_CLAIM.format(table=table), [limit])
+        rows = cursor.fetchall()
+    return [
+        ClaimedJob(job_id, name, json.loads(payload), attempts, max_attempts)
+        for job_id, name, payload, attempts, max_attempts in rows
+    ]
+
+
+def run_job(claimed: ClaimedJob) -> bool:
+    """Run a claimed job and record the outcome. False if it failed."""
+    try:
+        func = import_string(claimed.name)
+        if not hasattr(func, "job_max_attempts"):
+            raise TypeError(f"{claimed.name} is not a @job function")
+        func(**claimed.payload)
+    except Exception:
+        error = traceback.format_exc()
+        jobs = Job.objects.filter(pk=claimed.id)
+        if claimed.attempts >= claimed.max_attempts:
+            logger.exception(
+                "Job %s %s failed for good after %d attempts",
+                claimed.id, claimed.name, claimed.attempts,
+            )
+            jobs.update(
+                status=Job.Status.FAILED, locked_at=None, last_error=error
+            )
+        else:
+            delay = backoff(claimed.attempts)
+            logger.warning(
+                "Job %s %s failed (attempt %d of %d), retrying in %ds",
+                claimed.id, claimed.name, claimed.attempts,
+                claimed.max_attempts, delay,
+            )
+            jobs.update(
+                status=Job.Status.QUEUED,
+                locked_at=None,
+                last_error=error,
+                run_at=timezone.now() + timedelta(seconds=delay),
+            )
+        return False
+    Job.objects.filter(pk=claimed.id).delete()
+    return True
+
+
+def requeue_abandoned() -> int:
+    """Queue again the jobs running for longer than the lock timeout."""
+    abandoned = Job.objects.filter(
+        status=Job.Status.RUNNING,
+        locked_at__lt=(
+            timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+        ),
+    )
+    abandoned.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED,
+        locked_at=None,
+        last_error="The worker running the last attempt stopped.",
+    )
+    return abandoned.update(status=Job.Status.QUEUED, locked_at=None)
+
+
+class Worker:
+    """
+    Claim and run jobs on ``concurrency`` threads until ``stop()``.
+
+    The loop only claims as many jobs as there are idle threads, so jobs
+    it cannot start yet stay available to other workers. With ``burst``
+    it returns as soon as nothing is due and nothing is running.
+    """
+
+    def __init__(
+            self,
+            concurrency: int = 4,
+            poll_interval: float = 1.0,
+            burst: bool = False,
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.succeeded = 0
+        self.failed = 0
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self) -> None:
+        running = set()
+        recover_at = 0.0
+        with ThreadPoolExecutor(
+                self.concurrency, thread_name_prefix="jobs"
+        ) as pool:
+            while not self._stop.is_set():
+                idle = self.concurrency - len(running)
+                try:
+                    if time.monotonic() >= recover_at:
+                        requeue_abandoned()
+                        recover_at = time.monotonic() + RECOVERY_INTERVAL
+                    claimed = claim_jobs(idle) if idle else []
+                except DatabaseError:
+                    logger.exception("Could not claim jobs")
+                    connection.close()
+                    self._stop.wait(self.poll_interval)
+                    continue
+                running.update(
+                    pool.submit(self._run, claimed_job)
+                    for claimed_job in claimed
+                )
+                if idle and len(claimed) == idle:
+                    continue
+                if running:
+                    done, running = wait(
+                        running,
+                        timeout=self.poll_interval,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    self._count(done)
+                elif self.burst:
+                    break
+                else:
+                    self._stop.wait(self.poll_interval)
+            self._count(wait(running).done)
+        close_old_connections()
+
+    @staticmethod
+    def _run(claimed: ClaimedJob) -> bool:
+        close_old_connections()
+        try:
+            return run_job(claimed)
+        finally:
+            close_old_connections()
+
+    def _count(self, futures) -> None:
+        for future in futures:
+            try:
+                succeeded = future.result()
+            except Exception:
+                # The outcome could not be recorded; requeue_abandoned()
+                # picks the job up again after the lock timeout.
+                logger.exception("Could not record the outcome of a job")
+                succeeded = False
+            if succeeded:
+                self.succeeded += 1
+            else:
+                self.failed += 1
@@ -0,0 +1,81 @@
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from theatre.models import Play
+
+
+def walk(storage, directory: str):
+    """Names of every file under ``directory`` of ``storage``."""
+    if not storage.exists(directory):
+        return
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield os.path.join(directory, name)
+    for name in directories:
+        yield from walk(storage, os.path.join(directory, name))
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete play images and variants no play refers to, and uploads "
+        "that never finished."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--directory",
+            default="uploads/plays",
+            help="Media directory to clean up (default: uploads/plays).",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=3600,
+            help="Keep files modified less than this many seconds ago, "
+                 "so uploads that are not committed yet survive.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the files that would be deleted.",
+        )
+
+    def handle(self, *args, **options):
+        storage = Play._meta.get_field("image").storage
+        images = set(
+            Play.objects.exclude(image="").exclude(image__isnull=True)
+            .values_list("image", flat=True)
+        )
+        # Variants are kept while their original is referenced.
+        originals = {
+            (directory, os.path.splitext(filename)[0])
+            for directory, filename in map(os.path.split, images)
+        }
+        cutoff = timezone.now() - timedelta(seconds=options["min_age"])
+
+        orphans = []
+        for name in walk(storage, options["directory"]):
+            directory, filename = os.path.split(name)
+            if name in images:
+                continue
+            if os.path.basename(directory) == "variants":
+                stem = filename.rsplit("-", 1)[0]
+                if (os.path.dirname(directory), stem) in originals:
+                    continue
+            if storage.get_modified_time(name) > cutoff:
+                continue
+            orphans.append(name)
+
+        for name in orphans:
+            if options["dry_run"]:
+                self.stdout.write(name)
+            else:
+                storage.delete(name)
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {len(orphans)} orphaned files")
+        )
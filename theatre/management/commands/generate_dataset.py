@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_date
+
+from theatre.dataset import DatasetGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a reproducible synthetic dataset for load testing: halls, "
+        "plays with genres and actors, performances, and tickets skewed "
+        "towards popular shows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--halls", type=int, default=10)
+        parser.add_argument("--plays", type=int, default=500)
+        parser.add_argument("--genres", type=int, default=12)
+        parser.add_argument("--actors", type=int, default=2000)
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--performances", type=int, default=5000)
+        parser.add_argument(
+            "--tickets",
+            type=int,
+            default=1_000_000,
+            help="Tickets to sell, capped by the capacity of all "
+                 "performances.",
+        )
+        parser.add_argument(
+            "--start",
+            help="First day of the schedule (YYYY-MM-DD), today by default. "
+                 "Pass it explicitly for a dataset that is the same on "
+                 "every run.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=180,
+            help="Number of days performances are spread over.",
+        )
+
+    def handle(self, *args, **options):
+        start = None
+        if options["start"]:
+            start = parse_date(options["start"])
+            if start is None:
+                raise CommandError("--start must be a date (YYYY-MM-DD)")
+        counts = ("halls", "plays", "genres", "actors", "performances", "days")
+        for name in counts:
+            if options[name] < 1:
+                raise CommandError(f"--{name} must be at least 1")
+
+        generator = DatasetGenerator(
+            seed=options["seed"],
+            halls=options["halls"],
+            plays=options["plays"],
+            genres=options["genres"],
+            actors=options["actors"],
+            users=options["users"],
+            performances=options["performances"],
+            tickets=options["tickets"],
+            start=start,
+            days=options["days"],
+            log=self.stdout.write,
+        )
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                generated = generator.generate()
+        except IntegrityError as error:
+            raise CommandError(
+                f"Could not generate the dataset ({error}). A dataset with "
+                f"seed {options['seed']} probably exists already."
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {generated['tickets']} tickets for "
+            f"{generated['performances']} performances in "
+            f"{time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from theatre.images import generate_variants
+from theatre.models import Play
+
+
+class Command(BaseCommand):
+    help = "Render the WebP variants of play posters that have none yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Render the variants of every poster again.",
+        )
+
+    def handle(self, *args, **options):
+        plays = Play.objects.exclude(image="").exclude(image__isnull=True)
+        if not options["all"]:
+            plays = plays.filter(image_widths=[])
+
+        rendered = failed = 0
+        for play_id, name in plays.values_list("id", "image").iterator():
+            try:
+                generate_variants(play_id, name)
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stderr.write(f"Play {play_id} ({name}): {error}")
+            else:
+                rendered += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rendered variants of {rendered} posters")
+        )
+        if failed:
+            raise CommandError(f"{failed} posters could not be read")
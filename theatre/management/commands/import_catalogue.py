@@ -0,0 +1,62 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from theatre.importer import ENTITIES, CatalogueImport, ImportFailed
+
+
+class Command(BaseCommand):
+    help = (
+        "Import genres, actors, theatre halls, plays and performances from "
+        "<entity>.csv or <entity>.json files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="+",
+            type=Path,
+            help="Files named after an entity, or directories holding them.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate and report what would change, then roll back.",
+        )
+
+    def handle(self, *args, **options):
+        for path in options["paths"]:
+            if not path.exists():
+                raise CommandError(f"{path} does not exist")
+
+        started = time.perf_counter()
+        try:
+            catalogue = CatalogueImport.from_paths(options["paths"])
+            with transaction.atomic():
+                counts = catalogue.run()
+                if options["dry_run"]:
+                    transaction.set_rollback(True)
+        except ImportFailed as error:
+            for message in error.errors:
+                self.stderr.write(message)
+            raise CommandError(f"Import failed: {error}")
+        except ValueError as error:
+            raise CommandError(f"Import failed: {error}")
+
+        for entity in ENTITIES:
+            if entity in catalogue.records:
+                created, existing = counts[entity]
+                self.stdout.write(
+                    f"{entity}: {created} created, {existing} already present"
+                )
+        elapsed = time.perf_counter() - started
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(
+                f"Dry run: data is valid, nothing was saved ({elapsed:.1f}s)"
+            ))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Import finished in {elapsed:.1f}s")
+            )
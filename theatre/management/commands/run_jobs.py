@@ -0,0 +1,47 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from theatre.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs until stopped with SIGINT or SIGTERM."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Jobs run at the same time, one thread each (default: 4).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds between checks for new jobs when idle.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no job is due and none is running.",
+        )
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1")
+        worker = Worker(
+            concurrency=options["concurrency"],
+            poll_interval=options["poll_interval"],
+            burst=options["burst"],
+        )
+        # Running jobs are finished before the worker exits.
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: worker.stop())
+
+        worker.run()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{worker.succeeded} jobs succeeded, {worker.failed} failed"
+            )
+        )
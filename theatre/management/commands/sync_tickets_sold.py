@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from theatre.models import Performance, Ticket
+
+
+class Command(BaseCommand):
+    help = "Rebuild or verify Performance.tickets_sold from the sold tickets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report performances whose counter has drifted.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = (
+            Performance.objects
+            .annotate(actual=Count("tickets"))
+            .filter(~Q(tickets_sold=F("actual")))
+            .values_list("id", "tickets_sold", "actual")
+        )
+
+        if options["check"]:
+            drifted = list(drifted)
+            for performance_id, tickets_sold, actual in drifted:
+                self.stdout.write(
+                    f"Performance {performance_id}: "
+                    f"tickets_sold={tickets_sold}, actual={actual}"
+                )
+            if drifted:
+                raise CommandError(
+                    f"{len(drifted)} performance counters are out of sync"
+                )
+            self.stdout.write(self.style.SUCCESS("All counters are in sync"))
+            return
+
+        updated = Performance.objects.filter(
+            id__in=drifted.values("id")
+        ).update(
+            tickets_sold=Coalesce(
+                Subquery(
+                    Ticket.objects
+                    .filter(performance=OuterRef("pk"))
+                    .order_by()
+                    .values("performance")
+                    .annotate(count=Count("id"))
+                    .values("count")
+                ),
+                0,
+            )
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {updated} performance counters")
+        )
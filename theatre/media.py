@@ -0,0 +1,226 @@
+"""
+Content-addressed media files.
+
+``ContentAddressedStorage`` names every saved file after the SHA-256 of
+its bytes, in the directory and with the extension ``upload_to`` asked
+for, so ``uploads/plays/hamlet-<uuid>.JPG`` is stored as
+``uploads/plays/<sha256>.jpg``. Uploading the same poster again, for
+the same play or another one, reuses the file that is already there.
+Uploads are streamed chunk by chunk into a temporary file while being
+hashed, then renamed into place, so neither the whole file is held in
+memory nor a half-written file is ever visible under its final name.
+
+Since a name always means the same bytes, ``serve_media`` sends media
+with ``Cache-Control: immutable`` and a year of freshness, answers
+conditional requests with 304 and single byte ranges with 206.
+
+Nothing deletes the file of a replaced poster while requests may still
+reference it; ``manage.py cleanup_media`` removes files no play refers
+to any more.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import uuid
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+CHUNK_SIZE = 64 * 1024
+TEMP_SUFFIX = ".tmp"
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def _save(self, name, content):
+        directory, filename = os.path.split(name)
+        temp_path, digest = self._write_temp(directory, content)
+        _, extension = os.path.splitext(filename)
+        name = os.path.join(directory, f"{digest}{extension.lower()}")
+        try:
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                # Keep a reused file out of reach of cleanup_media until
+                # the row pointing at it is committed.
+                os.utime(full_path)
+            else:
+                os.replace(temp_path, full_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name.replace("\\", "/")
+
+    def save_at(self, name: str, content) -> str:
+        """Store ``content`` under exactly ``name``, replacing any file."""
+        directory, _ = os.path.split(name)
+        temp_path, _ = self._write_temp(directory, content)
+        try:
+            os.replace(temp_path, self.path(name))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
+
+    def _write_temp(self, directory: str, content) -> tuple[str, str]:
+        """Stream ``content`` into a temporary file in ``directory``."""
+        full_directory = self.path(directory)
+        if self.directory_permissions_mode is not None:
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(
+                    full_directory,
+                    self.directory_permissions_mode,
+                    exist_ok=True,
+                )
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(full_directory, exist_ok=True)
+
+        temp_path = os.path.join(
+            full_directory, f".{uuid.uuid4().hex}{TEMP_SUFFIX}"
+        )
+        digest = hashlib.sha256()
+        fd = os.open(
+            temp_path,
+            os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0),
+            0o666,
+        )
+        try:
+            with os.fdopen(fd, "wb") as file:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    file.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return temp_path, digest.hexdigest()
+
+
+def _byte_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    ``(start, end)`` of a single ``Range`` header, end inclusive.
+
+    Returns None for headers to ignore (malformed or several ranges) and
+    raises ValueError for a range that lies outside the file.
+    """
+    match = _RANGE.match(header.strip())
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start:
+        if not end:
+            return None
+        length = int(end)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    end = min(int(end), size - 1) if end else size - 1
+    return start, end
+
+
+def _read_range(path: str, start: int, length: int):
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_safe
+def serve_media(request, path: str):
+    """Serve a file of the default storage with permanent caching."""
+    if any(part.startswith(".") for part in path.split("/")):
+        raise Http404
+    try:
+        full_path = default_storage.path(path)
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    size = stat.st_size
+    # Not the mtime: saving a duplicate touches the file it reuses.
+    name_hash = hashlib.md5(path.encode(), usedforsecurity=False)
+    etag = f'"{size:x}-{name_hash.hexdigest()[:16]}"'
+    headers = {
+        "Cache-Control": CACHE_CONTROL,
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Accept-Ranges": "bytes",
+    }
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None and (
+            if_none_match.strip() == "*"
+            or etag in {tag.strip() for tag in if_none_match.split(",")}
+    ):
+        response = HttpResponseNotModified()
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if "Range" in request.headers and if_range in (None, etag):
+        try:
+            byte_range = _byte_range(request.headers["Range"], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if byte_range is None:
+        start, length, status = 0, size, 200
+    else:
+        start, end = byte_range
+        length, status = end - start + 1, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    if request.method == "HEAD":
+        response = HttpResponse(status=status, content_type=content_type)
+    elif status == 200:
+        response = FileResponse(
+            open(full_path, "rb"), content_type=content_type
+        )
+    else:
+        response = StreamingHttpResponse(
+            _read_range(full_path, start, length),
+            status=status,
+            content_type=content_type,
+        )
+    for header, value in headers.items():
+        response[header] = value
+    response["Content-Length"] = str(length)
+    if encoding:
+        response["Content-Encoding"] = encoding
+    return response
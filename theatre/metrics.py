@@ -0,0 +1,274 @@
+"""
+Per-request timings and per-endpoint histograms in Prometheus format.
+
+``RequestMetricsMiddleware`` opens a ``Timings`` for every request and
+makes it current through a context variable, which also follows the
+request into ``sync_to_async`` threads. Two hooks fill it in:
+
+- ``record_query``, an execute wrapper installed on every database
+  connection, adds up SQL time and the query count, and hands SELECTs
+  to the N+1 detector when the request is checked (``theatre.nplusone``);
+- ``TimedSerializerMixin``, mixed into the API's serializers, times
+  building ``.data``, minus any SQL it triggers (lazy querysets and
+  prefetches), so the parts of a request add up instead of overlapping.
+
+Outside a request both hooks cost one context variable lookup.
+
+The ``Server-Timing`` header exposes these numbers to the client, so
+it is only sent to staff users unless SERVER_TIMING is on. ``/metrics``
+answers only requests bearing METRICS_TOKEN.
+
+Histograms live in the process that served the request. Prometheus
+scrapes each worker and sums the series.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import cache
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from theatre.nplusone import QueryShapes
+
+TIME_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# (metric name, help, buckets, Timings attribute)
+HISTOGRAMS = (
+    ("theatre_request_duration_seconds",
+     "Time spent handling the request.", TIME_BUCKETS, "total"),
+    ("theatre_db_duration_seconds",
+     "Time spent executing SQL.", TIME_BUCKETS, "db"),
+    ("theatre_db_queries",
+     "SQL queries executed.", QUERY_BUCKETS, "queries"),
+    ("theatre_serialize_duration_seconds",
+     "Time spent in serializers, SQL excluded.", TIME_BUCKETS, "serialize"),
+    ("theatre_render_duration_seconds",
+     "Time spent rendering the response body.", TIME_BUCKETS, "render"),
+)
+
+
+class Timings:
+    __slots__ = (
+        "started", "db", "queries", "serialize", "serializing", "render",
+        "render_started", "total", "shapes",
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db = 0.0
+        self.queries = 0
+        self.serialize = 0.0
+        self.serializing = False
+        self.render = 0.0
+        self.render_started = None
+        self.total = 0.0
+        self.shapes: QueryShapes | None = None
+
+    def finish(self) -> None:
+        self.total = time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        return ", ".join([
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"',
+            f"serialize;dur={self.serialize * 1000:.2f}",
+            f"render;dur={self.render * 1000:.2f}",
+            f"total;dur={self.total * 1000:.2f}",
+        ])
+
+
+current_timings: ContextVar[Timings | None] = ContextVar(
+    "current_timings", default=None
+)
+
+
+def record_query(execute, sql, params, many, context):
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    if timings.shapes is not None:
+        timings.shapes.observe(sql)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - started
+        timings.queries += 1
+
+
+def install_query_recorder(sender, connection, **kwargs) -> None:
+    # Sent again on every reconnect of the same wrapper.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def timed_serialization(build):
+    """Call ``build`` and count its time, SQL excluded, as serialization."""
+    timings = current_timings.get()
+    if timings is None or timings.serializing:
+        return build()
+    timings.serializing = True
+    db = timings.db
+    started = time.perf_counter()
+    try:
+        return build()
+    finally:
+        timings.serialize += (
+            time.perf_counter() - started - (timings.db - db)
+        )
+        timings.serializing = False
+
+
+class TimedSerializerMixin:
+    # Counts building ``.data`` as serialization time of the current
+    # request. ``many=True`` instances get a timed subclass of their list
+    # serializer, since DRF only calls ``.data`` on the outer one. (A
+    # comment, not a docstring: drf-spectacular would publish it as the
+    # description of every serializer without one.)
+
+    @property
+    def data(self):
+        return timed_serialization(
+            lambda: super(TimedSerializerMixin, self).data
+        )
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        serializer = super().many_init(*args, **kwargs)
+        serializer.__class__ = _timed_list_class(type(serializer))
+        return serializer
+
+
+@cache
+def _timed_list_class(list_class):
+    if issubclass(list_class, TimedSerializerMixin):
+        return list_class
+    return type(list_class.__name__, (TimedSerializerMixin, list_class), {})
+
+
+def install() -> None:
+    connection_created.connect(
+        install_query_recorder, dispatch_uid="theatre.metrics"
+    )
+
+
+def shows_server_timing(request) -> bool:
+    if settings.SERVER_TIMING:
+        return True
+    # Only a user the view has authenticated: resolving the lazy session
+    # user here could run a query, which async requests must not do.
+    user = request.__dict__.get("user")
+    if user is None or isinstance(user, SimpleLazyObject):
+        return False
+    return user.is_staff
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+def _escape(value) -> str:
+    return (
+        str(value).replace("\\", "\\\\").replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def _labels(**labels) -> str:
+    return ",".join(
+        f'{name}="{_escape(value)}"' for name, value in labels.items()
+    )
+
+
+class Registry:
+    """Histograms per (view, action), plus response counts per status."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, str], list[Histogram]] = {}
+        self._responses: dict[tuple[str, str, int], int] = {}
+
+    def observe(
+            self, view: str, action: str, status: int, timings: Timings
+    ) -> None:
+        values = [getattr(timings, attr) for *_, attr in HISTOGRAMS]
+        with self._lock:
+            series = self._series.get((view, action))
+            if series is None:
+                series = self._series[(view, action)] = [
+                    Histogram(buckets) for _, _, buckets, _ in HISTOGRAMS
+                ]
+            for histogram, value in zip(series, values):
+                histogram.observe(value)
+            key = (view, action, status)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self._responses.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            series = {
+                key: [(list(h.counts), h.sum) for h in histograms]
+                for key, histograms in self._series.items()
+            }
+            responses = dict(self._responses)
+
+        lines = [
+            "# HELP theatre_responses_total Responses sent.",
+            "# TYPE theatre_responses_total counter",
+        ]
+        for (view, action, status), count in sorted(responses.items()):
+            labels = _labels(view=view, action=action, status=status)
+            lines.append(f"theatre_responses_total{{{labels}}} {count}")
+
+        for index, (name, help_text, buckets, _) in enumerate(HISTOGRAMS):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (view, action), histograms in sorted(series.items()):
+                counts, total = histograms[index]
+                labels = _labels(view=view, action=action)
+                cumulative = 0
+                for bound, count in zip((*buckets, "+Inf"), counts):
+                    cumulative += count
+                    lines.append(
+                        f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f"{name}_sum{{{labels}}} {total}")
+                lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def metrics_view(request):
+    """Prometheus text exposition of ``registry``."""
+    token = settings.METRICS_TOKEN
+    if not token:
+        return HttpResponse(status=403)
+    if not constant_time_compare(
+            request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(
+        registry.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,99 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from theatre.metrics import (
+    Timings,
+    current_timings,
+    registry,
+    shows_server_timing,
+)
+from theatre.nplusone import QueryShapes
+
+METHODS = {"get", "head", "options", "post", "put", "patch", "delete"}
+
+
+class RequestMetricsMiddleware:
+    """
+    Time each request, feed the per-endpoint histograms served at
+    ``/metrics`` and, for staff or with SERVER_TIMING on, add a
+    ``Server-Timing`` header. Requests picked by
+    ``QueryShapes.for_request`` are also checked for N+1 queries.
+
+    Requests are labelled with the URL name of the view and, for
+    viewsets, the action (``theatre:performance-list`` / ``list``).
+    Anything that does not resolve is counted under ``<unmatched>`` and
+    unknown methods under ``other``, so scanners cannot blow up the
+    number of series.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = self._start()
+        token = current_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self._finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = self._start()
+        token = current_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self._finish(request, response, timings)
+
+    @staticmethod
+    def _start() -> Timings:
+        timings = Timings()
+        timings.shapes = QueryShapes.for_request()
+        return timings
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        method = request.method.lower()
+        if method not in METHODS:
+            method = "other"
+        actions = getattr(view_func, "actions", None) or {}
+        request.metrics_action = actions.get(method, method)
+
+    def process_template_response(self, request, response):
+        timings = current_timings.get()
+        if timings is not None:
+            timings.render_started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: self._rendered(timings)
+            )
+        return response
+
+    @staticmethod
+    def _rendered(timings: Timings) -> None:
+        timings.render = time.perf_counter() - timings.render_started
+
+    def _finish(self, request, response, timings: Timings):
+        timings.finish()
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "<unmatched>"
+        action = getattr(request, "metrics_action", "-")
+        registry.observe(view, action, response.status_code, timings)
+        if timings.shapes is not None:
+            timings.shapes.report(view)
+
+        if not shows_server_timing(request):
+            return response
+        server_timing = timings.server_timing()
+        if response.has_header("Server-Timing"):
+            server_timing = f"{response['Server-Timing']}, {server_timing}"
+        response["Server-Timing"] = server_timing
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-17 04:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0005_alter_play_duration_alter_reservation_user'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='ticket',
+            constraint=models.UniqueConstraint(fields=('performance', 'row', 'seat'), name='unique_ticket_seat'),
+        ),
+    ]
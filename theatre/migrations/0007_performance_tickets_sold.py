@@ -0,0 +1,39 @@
+# Generated by Django 5.1.2 on 2026-10-17 04:32
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_sold_tickets(apps, schema_editor):
+    Performance = apps.get_model("theatre", "Performance")
+    Ticket = apps.get_model("theatre", "Ticket")
+    Performance.objects.update(
+        tickets_sold=Coalesce(
+            Subquery(
+                Ticket.objects
+                .filter(performance=OuterRef("pk"))
+                .order_by()
+                .values("performance")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0006_ticket_unique_seat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='performance',
+            name='tickets_sold',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_sold_tickets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.2 on 2026-10-17 04:34
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0007_performance_tickets_sold'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='play',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='english', weight='A'), '||', django.contrib.postgres.search.SearchVector('description', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('english')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='play',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='play_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='play',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='play_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
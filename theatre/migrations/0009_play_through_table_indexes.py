@@ -0,0 +1,26 @@
+# Generated by Django 5.1.2 on 2026-10-17 04:41
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0008_play_search'),
+    ]
+
+    # The unique (play_id, <related>_id) constraints already cover EXISTS
+    # probes made per play; these reverse indexes let the planner start
+    # from the requested genres/actors with index-only scans.
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX "theatre_play_genres_genre_play_idx" '
+            'ON "theatre_play_genres" ("genre_id", "play_id");',
+            'DROP INDEX "theatre_play_genres_genre_play_idx";',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX "theatre_play_actors_actor_play_idx" '
+            'ON "theatre_play_actors" ("actor_id", "play_id");',
+            'DROP INDEX "theatre_play_actors_actor_play_idx";',
+        ),
+    ]
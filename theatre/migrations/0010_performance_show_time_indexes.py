@@ -0,0 +1,25 @@
+# Generated by Django 5.1.2 on 2026-10-17 04:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0009_play_through_table_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='performance',
+            index=models.Index(fields=['show_time', 'id'], name='performance_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='performance',
+            index=models.Index(fields=['play', 'show_time'], name='performance_play_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='performance',
+            index=models.Index(fields=['theatre_hall', 'show_time'], name='performance_hall_time_idx'),
+        ),
+    ]
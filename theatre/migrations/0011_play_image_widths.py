@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-17 06:06
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0010_performance_show_time_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='play',
+            name='image_widths',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.PositiveIntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+    ]
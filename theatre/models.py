@@ -3,10 +3,17 @@ import uuid
 from typing import Callable
 
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.utils import timezone
+from django.utils.functional import cached_property
 from rest_framework.exceptions import ValidationError
 from django.utils.text import slugify
 
+from theatre.seatmap import SeatMap
+
 
 class Genre(models.Model):
     name = models.CharField(max_length=150, unique=True)
@@ -41,9 +48,30 @@ class Play(models.Model):
     genres = models.ManyToManyField(Genre, related_name="plays", blank=True)
     actors = models.ManyToManyField(Actor, related_name="plays", blank=True)
     image = models.ImageField(null=True, upload_to=movie_image_file_path)
+    # Widths of the WebP variants of ``image`` (theatre.images).
+    image_widths = ArrayField(
+        models.PositiveIntegerField(), default=list, blank=True,
+        editable=False,
+    )
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("title", weight="A", config="english")
+            + SearchVector("description", weight="B", config="english")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         ordering = ["title"]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="play_search_vector_idx"),
+            GinIndex(
+                fields=["title"],
+                opclasses=["gin_trgm_ops"],
+                name="play_title_trgm_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -74,6 +102,29 @@ class Performance(models.Model):
         on_delete=models.CASCADE
     )
     show_time = models.DateTimeField()
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["show_time", "id"], name="performance_time_idx"
+            ),
+            models.Index(
+                fields=["play", "show_time"], name="performance_play_time_idx"
+            ),
+            models.Index(
+                fields=["theatre_hall", "show_time"],
+                name="performance_hall_time_idx",
+            ),
+        ]
+
+    @cached_property
+    def seat_map(self) -> SeatMap:
+        return SeatMap(
+            self.theatre_hall.rows,
+            self.theatre_hall.seats_in_row,
+            self.tickets.values_list("row", "seat"),
+        )
 
     def __str__(self) -> str:
         return f"{self.play.title} at {self.show_time}"
@@ -110,6 +161,12 @@ class Ticket(models.Model):
 
     class Meta:
         ordering = ["row", "seat"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["performance", "row", "seat"],
+                name="unique_ticket_seat",
+            ),
+        ]
 
     @staticmethod
     def validate_ticket(
@@ -149,3 +206,41 @@ class Ticket(models.Model):
 
     def __str__(self) -> str:
         return f"{self.performance} (Row {self.row}, Seat {self.seat})"
+
+
+class Job(models.Model):
+    """A call of a ``theatre.jobs.job`` function, run by ``run_jobs``."""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        FAILED = "failed"
+
+    name = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.QUEUED
+    )
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["run_at", "id"],
+                condition=models.Q(status="queued"),
+                name="job_queued_idx",
+            ),
+            models.Index(
+                fields=["locked_at"],
+                condition=models.Q(status="running"),
+                name="job_running_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.status})"
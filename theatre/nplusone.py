@@ -0,0 +1,112 @@
+"""
+N+1 query detection.
+
+Every SELECT of a checked request is reduced to its shape: the SQL
+text, which already has %s for every parameter, with ``IN (%s, %s, ...)``
+lists collapsed. When one shape runs ``NPLUSONE_THRESHOLD`` times in the
+same request, that is a lazy load per row. The serializer fields being
+rendered at that moment are read off the stack, outermost first, e.g.
+``ReservationListSerializer.tickets > TicketListSerializer.performance``.
+
+``NPLUSONE_MODE`` picks what happens next:
+
+- ``"raise"`` checks every request and raises ``NPlusOneDetected`` right
+  at the offending query, for tests;
+- ``"log"`` checks a ``NPLUSONE_SAMPLE_RATE`` fraction of requests and
+  logs each finding once the response is ready, for production;
+- ``"off"`` does nothing.
+
+The stack is only walked when a shape crosses the threshold, so a
+checked request costs one regex substitution and a dict update per
+query.
+"""
+import logging
+import random
+import re
+import sys
+
+from django.conf import settings
+from rest_framework.serializers import Serializer
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)")
+_field_loop = Serializer.to_representation.__code__
+
+
+class NPlusOneDetected(Exception):
+    pass
+
+
+class Finding:
+    __slots__ = ("sql", "count", "fields")
+
+    def __init__(self, sql: str, count: int, fields: list[str]):
+        self.sql = sql
+        self.count = count
+        self.fields = fields
+
+    def __str__(self) -> str:
+        source = " > ".join(self.fields) or "outside a serializer"
+        return (
+            f"{self.count} queries of the same shape, from {source}: "
+            f"{self.sql}"
+        )
+
+
+class QueryShapes:
+    """SELECT shapes seen during one request."""
+
+    __slots__ = ("threshold", "strict", "counts", "findings")
+
+    def __init__(self, threshold: int, strict: bool):
+        self.threshold = threshold
+        self.strict = strict
+        self.counts: dict[str, int] = {}
+        self.findings: dict[str, Finding] = {}
+
+    @classmethod
+    def for_request(cls) -> "QueryShapes | None":
+        mode = settings.NPLUSONE_MODE
+        if mode == "raise":
+            return cls(settings.NPLUSONE_THRESHOLD, strict=True)
+        if mode == "log" and random.random() < settings.NPLUSONE_SAMPLE_RATE:
+            return cls(settings.NPLUSONE_THRESHOLD, strict=False)
+        return None
+
+    def observe(self, sql: str) -> None:
+        if not sql.lstrip()[:6].upper() == "SELECT":
+            return
+        shape = _IN_LIST.sub("(%s...)", sql)
+        count = self.counts.get(shape, 0) + 1
+        self.counts[shape] = count
+        finding = self.findings.get(shape)
+        if finding is not None:
+            finding.count = count
+        elif count >= self.threshold:
+            finding = Finding(shape, count, serializer_fields())
+            self.findings[shape] = finding
+            if self.strict:
+                raise NPlusOneDetected(str(finding))
+
+    def report(self, view: str) -> None:
+        if self.strict:
+            return
+        for finding in self.findings.values():
+            logger.warning("N+1 queries in %s: %s", view, finding)
+
+
+def serializer_fields() -> list[str]:
+    """``Serializer.field`` pairs being rendered, outermost first."""
+    fields = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_code is _field_loop:
+            serializer = frame.f_locals.get("self")
+            field = frame.f_locals.get("field")
+            if field is not None:
+                fields.append(
+                    f"{type(serializer).__name__}.{field.field_name}"
+                )
+        frame = frame.f_back
+    return fields[::-1]
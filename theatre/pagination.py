@@ -1,6 +1,229 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework import pagination
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class LimitOffsetPagination(pagination.LimitOffsetPagination):
+    """LimitOffsetPagination that can also fetch a page with the async ORM."""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [
+            obj async for obj in
+            queryset[self.offset:self.offset + self.limit]
+        ]
 
 
 class ReservationPagination(PageNumberPagination):
     page_size = 2
     max_page_size = 50
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        return list(self.page)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a compound ordering key such as (show_time, id).
+
+    Each page is fetched with a row comparison against the last key seen,
+    so it costs the same at any depth: there is no OFFSET and no COUNT(*).
+    The last field of ``ordering`` must be unique to keep the key stable.
+    """
+
+    ordering = ("id",)
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, key, reverse = self._page_queryset(queryset, request)
+        return self._paginate(list(queryset), key, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset, key, reverse = self._page_queryset(queryset, request)
+        return self._paginate([obj async for obj in queryset], key, reverse)
+
+    def _page_queryset(self, queryset, request):
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+
+        key, reverse = self.decode_cursor(request)
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+
+        if key is not None:
+            queryset = queryset.filter(self._after(key, ordering))
+        queryset = queryset.order_by(*ordering)[:self.page_size + 1]
+        return queryset, key, reverse
+
+    def _paginate(self, results, key, reverse):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, key is not None
+
+        self.next_key = (
+            self._key(results[-1]) if has_next and results else None
+        )
+        self.previous_key = (
+            self._key(results[0]) if has_previous and results else None
+        )
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def _fields(self):
+        return [field.lstrip("-") for field in self.ordering]
+
+    def _key(self, obj):
+        if isinstance(obj, dict):
+            return [obj[field] for field in self._fields()]
+        return [getattr(obj, field) for field in self._fields()]
+
+    @staticmethod
+    def _after(key, ordering):
+        condition = Q()
+        equal = Q()
+        for value, field in zip(key, ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            fields = self._fields()
+            if len(data["k"]) != len(fields):
+                raise ValueError
+            key = [
+                self.model._meta.get_field(field).to_python(value)
+                for field, value in zip(fields, data["k"])
+            ]
+        except (
+            TypeError,
+            ValueError,
+            KeyError,
+            binascii.Error,
+            ValidationError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return key, bool(data.get("r"))
+
+    def encode_cursor(self, key, reverse):
+        data = {
+            "k": [
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in key
+            ],
+        }
+        if reverse:
+            data["r"] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(data, separators=(",", ":")).encode()
+        ).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if self.next_key is None:
+            return None
+        return self.encode_cursor(self.next_key, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_key is None:
+            return None
+        return self.encode_cursor(self.previous_key, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {
+                    "type": "string", "nullable": True, "format": "uri"
+                },
+                "results": schema,
+            },
+        }
+
+
+class PerformanceCursorPagination(KeysetPagination):
+    ordering = ("show_time", "id")
+
+
+class ReservationCursorPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+    page_size = ReservationPagination.page_size
+    max_page_size = ReservationPagination.max_page_size
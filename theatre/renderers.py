@@ -0,0 +1,138 @@
+"""
+Faster response renderers and the row formats used by exports.
+
+Both encoders are optional: without ``orjson`` FastJSONRenderer is plain
+JSONRenderer, and MessagePackRenderer is only registered in settings when
+``msgpack`` is installed.
+"""
+import csv
+import io
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it can.
+
+    The output matches JSONRenderer's compact, unicode JSON byte for byte,
+    except that floats in exponent form are spelled ``1e16`` rather than
+    ``1e+16``. Datetimes, dataclasses and other types orjson would encode
+    its own way go through the renderer's encoder. Indented output, and
+    anything orjson rejects, uses the stdlib path.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=(
+                    orjson.OPT_PASSTHROUGH_DATETIME
+                    | orjson.OPT_PASSTHROUGH_DATACLASS
+                    | orjson.OPT_NON_STR_KEYS
+                ),
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # Same escaping as JSONRenderer, for a strict JavaScript subset.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Render responses as MessagePack, for ``Accept: application/msgpack``."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    encoder_class = JSONRenderer.encoder_class
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(
+            data, default=self.encoder_class().default, datetime=False
+        )
+
+
+class RowRenderer(BaseRenderer):
+    """
+    Base for tabular formats that can also be written chunk by chunk.
+
+    ``render`` handles regular response data (a list of objects or a
+    single object such as an error). Streaming exports call ``header``
+    once and then ``render_rows`` for each chunk of value tuples.
+    """
+
+    charset = "utf-8"
+
+    def header(self, names) -> bytes:
+        return b""
+
+    def render_rows(self, names, rows) -> bytes:
+        raise NotImplementedError
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if isinstance(data, dict):
+            data = [data]
+        names = list(data[0]) if data else []
+        return self.header(names) + self.render_rows(
+            names, [[item.get(name) for name in names] for item in data]
+        )
+
+
+class CSVRenderer(RowRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+    def _write(self, rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+    def header(self, names) -> bytes:
+        return self._write([names])
+
+    def render_rows(self, names, rows) -> bytes:
+        return self._write(rows)
+
+
+class NDJSONRenderer(RowRenderer):
+    """One compact JSON object per line."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render_rows(self, names, rows) -> bytes:
+        json = FastJSONRenderer()
+        return b"".join(
+            json.render(dict(zip(names, row))) + b"\n" for row in rows
+        )
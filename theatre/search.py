@@ -0,0 +1,32 @@
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+)
+from django.db.models import F, QuerySet
+
+SEARCH_CONFIG = "english"
+
+
+def search_plays(queryset: QuerySet, text: str) -> QuerySet:
+    """
+    Filter plays by ``text`` and order them by relevance.
+
+    Plays are matched against the stored title/description search vector
+    and ranked by ts_rank. Only when nothing matches does the search fall
+    back to the trigram index on title, so misspelt titles still resolve
+    without paying for a fuzzy scan on every request.
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+    matches = queryset.filter(search_vector=query)
+    if matches.exists():
+        return matches.annotate(
+            rank=SearchRank(F("search_vector"), query)
+        ).order_by("-rank", "title")
+
+    return (
+        queryset
+        .filter(title__trigram_similar=text)
+        .annotate(similarity=TrigramSimilarity("title", text))
+        .order_by("-similarity", "title")
+    )
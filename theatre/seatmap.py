@@ -0,0 +1,85 @@
+import base64
+from typing import Iterable, Iterator
+
+
+class SeatMap:
+    """
+    Occupancy of one performance packed into a rows x seats_in_row bitset.
+
+    Seat (row, seat) is bit ``(row - 1) * seats_in_row + (seat - 1)``,
+    stored most significant bit first, so the base64 form can be decoded
+    by clients without knowing anything about the server side.
+
+    ``taken`` seats outside the hall are skipped: tickets sold before a
+    hall lost rows or seats have no place in its current layout.
+    """
+
+    __slots__ = ("rows", "seats_in_row", "_bits")
+
+    def __init__(
+            self,
+            rows: int,
+            seats_in_row: int,
+            taken: Iterable[tuple[int, int]] = (),
+            bits: bytes = None,
+    ):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        size = (rows * seats_in_row + 7) // 8
+        if bits is not None and len(bits) != size:
+            raise ValueError(f"Expected {size} bytes, got {len(bits)}")
+        self._bits = bytearray(bits) if bits is not None else bytearray(size)
+        for row, seat in taken:
+            if self.fits(row, seat):
+                self.take(row, seat)
+
+    @classmethod
+    def from_base64(cls, rows: int, seats_in_row: int, data: str) -> "SeatMap":
+        return cls(rows, seats_in_row, bits=base64.b64decode(data))
+
+    def fits(self, row: int, seat: int) -> bool:
+        return 1 <= row <= self.rows and 1 <= seat <= self.seats_in_row
+
+    def _index(self, row: int, seat: int) -> int:
+        if not self.fits(row, seat):
+            raise IndexError(f"Seat (row {row}, seat {seat}) is out of range")
+        return (row - 1) * self.seats_in_row + seat - 1
+
+    def take(self, row: int, seat: int) -> None:
+        index = self._index(row, seat)
+        self._bits[index >> 3] |= 0x80 >> (index & 7)
+
+    def release(self, row: int, seat: int) -> None:
+        index = self._index(row, seat)
+        self._bits[index >> 3] &= ~(0x80 >> (index & 7)) & 0xFF
+
+    def is_taken(self, row: int, seat: int) -> bool:
+        index = self._index(row, seat)
+        return bool(self._bits[index >> 3] & (0x80 >> (index & 7)))
+
+    def __contains__(self, place: tuple[int, int]) -> bool:
+        return self.is_taken(*place)
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        """Yield taken (row, seat) pairs ordered by row, then seat."""
+        for byte_index, byte in enumerate(self._bits):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (0x80 >> bit):
+                    row, seat = divmod(byte_index * 8 + bit, self.seats_in_row)
+                    yield row + 1, seat + 1
+
+    def __len__(self) -> int:
+        return sum(bin(byte).count("1") for byte in self._bits)
+
+    def to_base64(self) -> str:
+        return base64.b64encode(self._bits).decode("ascii")
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "seats_in_row": self.seats_in_row,
+            "encoding": "base64",
+            "bitmap": self.to_base64(),
+        }
@@ -1,7 +1,15 @@
+from collections import Counter
+
+from django.contrib.postgres.expressions import ArraySubquery
 from django.db import transaction
+from django.db.models import F, OuterRef, QuerySet, Value
+from django.db.models.functions import Concat
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+from theatre.booking import claim_seats
+from theatre.images import thumb_width, variant_path
+from theatre.metrics import TimedSerializerMixin
 from theatre.models import (
     Genre,
     Actor,
@@ -13,25 +21,54 @@ from theatre.models import (
 )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+def image_url(name: str | None, context: dict) -> str | None:
+    """Render a stored play image name the way ImageField does."""
+    if not name:
+        return None
+    url = Play._meta.get_field("image").storage.url(name)
+    request = context.get("request")
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def image_thumb(name: str | None, widths: list[int], context: dict):
+    """URL of the thumbnail variant of a play image, if rendered yet."""
+    width = thumb_width(widths) if name else None
+    if width is None:
+        return None
+    return image_url(variant_path(name, width), context)
+
+
+def image_srcset(name: str | None, widths: list[int], context: dict):
+    """``srcset`` attribute value listing every variant of a play image."""
+    if not name or not widths:
+        return None
+    return ", ".join(
+        f"{image_url(variant_path(name, width), context)} {width}w"
+        for width in widths
+    )
+
+
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = ("id", "name")
 
 
-class ActorSerializer(serializers.ModelSerializer):
+class ActorSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Actor
         fields = ("id", "first_name", "last_name")
 
 
-class PlayImageSerializer(serializers.ModelSerializer):
+class PlayImageSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Play
         fields = ("id", "image")
 
 
-class PlaySerializer(serializers.ModelSerializer):
+class PlaySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Play
         fields = ("id", "title", "description", "genres", "actors")
@@ -49,10 +86,73 @@ class PlayListSerializer(PlaySerializer):
         slug_field="full_name"
 
     )
+    image_thumb = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Play
-        fields = ("id", "title", "image", "genres", "actors")
+        fields = (
+            "id",
+            "title",
+            "image",
+            "image_thumb",
+            "image_srcset",
+            "genres",
+            "actors",
+        )
+
+    def get_image_thumb(self, obj) -> str | None:
+        return image_thumb(obj.image.name, obj.image_widths, self.context)
+
+    def get_image_srcset(self, obj) -> str | None:
+        return image_srcset(obj.image.name, obj.image_widths, self.context)
+
+
+class PlayListProjectionSerializer(
+    TimedSerializerMixin,
+    serializers.BaseSerializer,
+):
+    """
+    Read-only PlayListSerializer that works on rows from ``project()``.
+
+    Only the listed columns are selected and genre names and actor full
+    names arrive as arrays built in SQL, so no model instances or related
+    fields are created per row. The output matches PlayListSerializer.
+    """
+
+    @staticmethod
+    def project(queryset: QuerySet) -> QuerySet:
+        genres = Genre.objects.filter(plays=OuterRef("pk")).order_by("id")
+        actors = Actor.objects.filter(plays=OuterRef("pk")).order_by("id")
+        return queryset.prefetch_related(None).values(
+            "id",
+            "title",
+            "image",
+            "image_widths",
+            genre_names=ArraySubquery(genres.values("name")),
+            actor_names=ArraySubquery(
+                actors.values(
+                    full_name=Concat(
+                        "first_name", Value(" "), "last_name"
+                    )
+                )
+            ),
+        )
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "title": row["title"],
+            "image": image_url(row["image"], self.context),
+            "image_thumb": image_thumb(
+                row["image"], row["image_widths"], self.context
+            ),
+            "image_srcset": image_srcset(
+                row["image"], row["image_widths"], self.context
+            ),
+            "genres": row["genre_names"],
+            "actors": row["actor_names"],
+        }
 
 
 class PlayDetailSerializer(PlaySerializer):
@@ -72,13 +172,13 @@ class PlayDetailSerializer(PlaySerializer):
         )
 
 
-class TheatreHallSerializer(serializers.ModelSerializer):
+class TheatreHallSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = TheatreHall
         fields = ("id", "name", "rows", "seats_in_row")
 
 
-class PerformanceSerializer(serializers.ModelSerializer):
+class PerformanceSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Performance
         fields = ("id", "play", "theatre_hall", "show_time")
@@ -88,6 +188,8 @@ class PerformanceListSerializer(PerformanceSerializer):
     play_title = serializers.CharField(source="play.title")
     theatre_hall_name = serializers.CharField(source="theatre_hall.name")
     play_image = serializers.ImageField(source="play.image", read_only=True)
+    play_image_thumb = serializers.SerializerMethodField()
+    play_image_srcset = serializers.SerializerMethodField()
     theatre_hall_capacity = serializers.IntegerField(
         source="theatre_hall.capacity", read_only=True
     )
@@ -101,15 +203,68 @@ class PerformanceListSerializer(PerformanceSerializer):
             "theatre_hall_name",
             "show_time",
             "play_image",
+            "play_image_thumb",
+            "play_image_srcset",
             "theatre_hall_capacity",
             "tickets_available"
         )
 
+    def get_play_image_thumb(self, obj) -> str | None:
+        play = obj.play
+        return image_thumb(play.image.name, play.image_widths, self.context)
+
+    def get_play_image_srcset(self, obj) -> str | None:
+        play = obj.play
+        return image_srcset(play.image.name, play.image_widths, self.context)
+
+
+class PerformanceListProjectionSerializer(
+    TimedSerializerMixin,
+    serializers.BaseSerializer,
+):
+    """Read-only PerformanceListSerializer over rows from ``project()``."""
+
+    show_time = serializers.DateTimeField()
+
+    @staticmethod
+    def project(queryset: QuerySet) -> QuerySet:
+        return queryset.values(
+            "id",
+            "show_time",
+            "tickets_available",
+            play_title=F("play__title"),
+            play_image=F("play__image"),
+            play_image_widths=F("play__image_widths"),
+            theatre_hall_name=F("theatre_hall__name"),
+            theatre_hall_capacity=(
+                F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
+            ),
+        )
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "play_title": row["play_title"],
+            "theatre_hall_name": row["theatre_hall_name"],
+            "show_time": self.show_time.to_representation(row["show_time"]),
+            "play_image": image_url(row["play_image"], self.context),
+            "play_image_thumb": image_thumb(
+                row["play_image"], row["play_image_widths"], self.context
+            ),
+            "play_image_srcset": image_srcset(
+                row["play_image"], row["play_image_widths"], self.context
+            ),
+            "theatre_hall_capacity": row["theatre_hall_capacity"],
+            "tickets_available": row["tickets_available"],
+        }
+
 
 class PerformanceDetailSerializer(PerformanceSerializer):
     play = PlayListSerializer(read_only=True)
     theatre_hall = TheatreHallSerializer(read_only=True)
+    tickets_available = serializers.IntegerField(read_only=True)
     taken_places = serializers.SerializerMethodField()
+    seat_map = serializers.SerializerMethodField()
 
     class Meta:
         model = Performance
@@ -118,15 +273,58 @@ class PerformanceDetailSerializer(PerformanceSerializer):
             "show_time",
             "play",
             "theatre_hall",
-            "taken_places"
+            "tickets_available",
+            "taken_places",
+            "seat_map"
         )
 
-    def get_taken_places(self, obj):
-        tickets = Ticket.objects.filter(performance=obj)
-        return TicketSeatsSerializer(tickets, many=True).data
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if request is None or request.query_params.get("seat_map") != "bitmap":
+            fields.pop("seat_map")
+        return fields
 
+    def get_taken_places(self, obj):
+        return [{"row": row, "seat": seat} for row, seat in obj.seat_map]
+
+    def get_seat_map(self, obj):
+        return obj.seat_map.as_dict()
+
+
+class TicketBulkListSerializer(serializers.ListSerializer):
+    """Resolve performances of all incoming tickets with a single query."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            performance_ids = set()
+            for item in data:
+                try:
+                    performance_ids.add(int(item.get("performance")))
+                except (AttributeError, TypeError, ValueError):
+                    continue
+            self.child.performances = (
+                Performance.objects
+                .select_related("theatre_hall")
+                .in_bulk(performance_ids)
+            )
+        return super().to_internal_value(data)
+
+
+class TicketPerformanceField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        performances = getattr(self.parent, "performances", None)
+        try:
+            return performances[int(data)]
+        except (KeyError, TypeError, ValueError):
+            return super().to_internal_value(data)
+
+
+class TicketSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    performance = TicketPerformanceField(
+        queryset=Performance.objects.select_related("theatre_hall")
+    )
 
-class TicketSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
         Ticket.validate_ticket(
@@ -140,32 +338,43 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "performance")
+        list_serializer_class = TicketBulkListSerializer
+        validators = []
 
 
 class TicketListSerializer(TicketSerializer):
     performance = PerformanceListSerializer(read_only=True)
 
 
-class TicketSeatsSerializer(TicketSerializer):
-    class Meta:
-        model = Ticket
-        fields = ("row", "seat")
-
-
-class ReservationSerializer(serializers.ModelSerializer):
+class ReservationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     tickets = TicketSerializer(many=True)
 
     class Meta:
         model = Reservation
         fields = ("id", "created_at", "tickets", "user")
 
+    def validate_tickets(self, tickets):
+        seats = Counter(
+            (ticket["performance"].id, ticket["row"], ticket["seat"])
+            for ticket in tickets
+        )
+        duplicates = sorted(seat for seat, count in seats.items() if count > 1)
+        if duplicates:
+            raise ValidationError(
+                [
+                    f"Seat (row {row}, seat {seat}) of performance "
+                    f"{performance_id} is requested more than once."
+                    for performance_id, row, seat in duplicates
+                ]
+            )
+        return tickets
+
     def create(self, validated_data: dict):
         with transaction.atomic():
 
             tickets_data = validated_data.pop("tickets")
             reservation = Reservation.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(reservation=reservation, **ticket_data)
+            claim_seats(reservation, tickets_data)
         return reservation
 
 
@@ -0,0 +1,58 @@
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from theatre.cache import bump_version
+from theatre.streams import notify_seats_on_commit
+from theatre.models import (
+    Genre,
+    Actor,
+    Play,
+    TheatreHall,
+    Performance,
+    Ticket
+)
+
+
+@receiver(post_save, sender=Ticket)
+def count_sold_ticket(sender, instance, created, **kwargs):
+    if created:
+        Performance.objects.filter(id=instance.performance_id).update(
+            tickets_sold=F("tickets_sold") + 1
+        )
+        notify_seats_on_commit(
+            instance.performance_id,
+            "seat-claimed",
+            [(instance.row, instance.seat)],
+        )
+
+
+@receiver(post_delete, sender=Ticket)
+def count_released_ticket(sender, instance, **kwargs):
+    Performance.objects.filter(id=instance.performance_id).update(
+        tickets_sold=F("tickets_sold") - 1
+    )
+    notify_seats_on_commit(
+        instance.performance_id,
+        "seat-released",
+        [(instance.row, instance.seat)],
+    )
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Actor)
+@receiver(post_save, sender=Play)
+@receiver(post_save, sender=TheatreHall)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Actor)
+@receiver(post_delete, sender=Play)
+@receiver(post_delete, sender=TheatreHall)
+def invalidate_catalogue(sender, **kwargs):
+    bump_version(sender)
+
+
+@receiver(m2m_changed, sender=Play.genres.through)
+@receiver(m2m_changed, sender=Play.actors.through)
+def invalidate_play_links(sender, action, **kwargs):
+    if action.startswith("post_"):
+        bump_version(Play)
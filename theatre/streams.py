@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+
+from django.db import connection, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "theatre_seat_events"
+QUEUE_SIZE = 100
+# pg_notify payloads are limited to 8000 bytes.
+SEATS_PER_NOTIFICATION = 500
+
+
+def notify_seats(events) -> None:
+    """
+    Broadcast (performance_id, event, seats) triples to listening workers.
+
+    All payloads go out in one statement. NOTIFY is transactional, so the
+    events are delivered when the surrounding transaction commits and are
+    dropped if it rolls back.
+    """
+    payloads = []
+    for performance_id, event, seats in events:
+        seats = [list(seat) for seat in seats]
+        for start in range(0, len(seats), SEATS_PER_NOTIFICATION):
+            payloads.append(
+                json.dumps(
+                    {
+                        "performance": performance_id,
+                        "event": event,
+                        "seats": seats[start:start + SEATS_PER_NOTIFICATION],
+                    },
+                    separators=(",", ":"),
+                )
+            )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload",
+            [CHANNEL, payloads],
+        )
+
+
+class SeatEventBatch:
+    """
+    Seat events of one transaction, broadcast together once it commits.
+
+    Consecutive events of the same performance and kind are merged, so
+    the order of claims and releases of a seat is kept.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def add(self, performance_id: int, event: str, seats) -> None:
+        if self.events and self.events[-1][:2] == [performance_id, event]:
+            self.events[-1][2].extend(seats)
+        else:
+            self.events.append([performance_id, event, list(seats)])
+
+    def send(self) -> None:
+        if getattr(_batches, "batch", None) is self:
+            del _batches.batch
+        notify_seats(self.events)
+
+
+_batches = threading.local()
+
+
+def notify_seats_on_commit(performance_id: int, event: str, seats) -> None:
+    """
+    Broadcast seat events once the current transaction commits.
+
+    Per-ticket signals call this, so deleting a reservation with many
+    tickets sends one notify_seats() statement instead of one per ticket.
+    Outside a transaction the events go out right away.
+    """
+    db = transaction.get_connection()
+    if not db.in_atomic_block:
+        notify_seats([(performance_id, event, seats)])
+        return
+    batch = getattr(_batches, "batch", None)
+    # A batch whose callback is gone belongs to a rolled back transaction.
+    if batch is None or not any(
+        func == batch.send for _, func, _ in db.run_on_commit
+    ):
+        batch = _batches.batch = SeatEventBatch()
+        transaction.on_commit(batch.send)
+    batch.add(performance_id, event, seats)
+
+
+class SeatEventHub:
+    """
+    Fan seat events out to the subscribers of this worker.
+
+    A single LISTEN connection per process receives every notification and
+    hands it to the asyncio queues of the performance's subscribers, so
+    one database event reaches any number of open streams.
+    """
+
+    def __init__(self, listen: bool = True):
+        self.listen = listen
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._listener = None
+        self._stopping = threading.Event()
+        self.listening = threading.Event()
+
+    def subscribe(self, performance_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers[performance_id].add(subscriber)
+            if self.listen and self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, name="seat-events", daemon=True
+                )
+                self._listener.start()
+        return queue
+
+    def unsubscribe(self, performance_id: int, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers[performance_id]
+            subscribers.difference_update(
+                {s for s in subscribers if s[1] is queue}
+            )
+            if not subscribers:
+                del self._subscribers[performance_id]
+
+    def stop(self) -> None:
+        """Close the LISTEN connection; the next subscriber reopens it."""
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            self._stopping.set()
+            listener.join()
+            self._stopping.clear()
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(map(len, self._subscribers.values()))
+
+    def publish(self, payload: dict) -> None:
+        with self._lock:
+            subscribers = list(
+                self._subscribers.get(payload["performance"], ())
+            )
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._deliver, queue, payload)
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, payload: dict) -> None:
+        if queue.full():
+            # The client fell behind: drop its backlog and ask it to
+            # refetch the performance instead of replaying stale deltas.
+            while not queue.empty():
+                queue.get_nowait()
+            payload = {
+                "performance": payload["performance"],
+                "event": "resync",
+            }
+        queue.put_nowait(payload)
+
+    def _listen(self) -> None:
+        while not self._stopping.is_set():
+            db = connections.create_connection("default")
+            try:
+                db.ensure_connection()
+                db.connection.autocommit = True
+                with db.connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                self.listening.set()
+                while not self._stopping.is_set():
+                    ready, _, _ = select.select([db.connection], [], [], 1)
+                    if not ready:
+                        continue
+                    db.connection.poll()
+                    while db.connection.notifies:
+                        notification = db.connection.notifies.pop(0)
+                        self.publish(json.loads(notification.payload))
+            except Exception:
+                logger.exception("Seat event listener failed, reconnecting")
+                self._stopping.wait(1)
+            finally:
+                self.listening.clear()
+                db.close()
+
+
+seat_event_hub = SeatEventHub()
@@ -0,0 +1,157 @@
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.cache import caches
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from theatre.models import Ticket
+from theatre.tests.test_view import (
+    sample_actor,
+    sample_genre,
+    sample_performance,
+    sample_play,
+    sample_reservation,
+    sample_theatre_hall,
+    sample_user,
+)
+from theatre.views import (
+    PerformanceViewSet,
+    PlayViewSet,
+    ReservationViewSet,
+    performance_detail_flight,
+)
+
+
+class AsyncReadViewTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = sample_user()
+        genre = sample_genre()
+        actor = sample_actor()
+        self.play = sample_play(title="Hamlet", description="Danish prince")
+        self.play.genres.add(genre)
+        self.play.actors.add(actor)
+        hall = sample_theatre_hall(rows=3, seats_in_row=4)
+        tomorrow = timezone.now() + timedelta(days=1)
+        self.performances = [
+            sample_performance(self.play, hall, tomorrow + timedelta(hours=i))
+            for i in range(3)
+        ]
+        self.reservation = sample_reservation(self.user)
+        Ticket.objects.create(
+            performance=self.performances[0],
+            reservation=self.reservation,
+            row=2,
+            seat=3,
+        )
+        caches["catalogue"].clear()
+
+    async def _get(self, viewset, actions, url, **kwargs):
+        request = self.factory.get(url)
+        force_authenticate(request, user=self.user)
+        return await viewset.as_async_view(actions)(request, **kwargs)
+
+    def _compare(self, viewset, actions, url, **kwargs):
+        """Return the sync and the async response to the same request."""
+        sync_request = self.factory.get(url)
+        force_authenticate(sync_request, user=self.user)
+        sync_response = viewset.as_view(actions)(sync_request, **kwargs)
+
+        caches["catalogue"].clear()
+        async_response = async_to_sync(self._get)(
+            viewset, actions, url, **kwargs
+        )
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.data, sync_response.data)
+        return async_response
+
+    def test_read_actions_are_served_by_a_coroutine_view(self):
+        self.assertTrue(
+            iscoroutinefunction(
+                PerformanceViewSet.as_async_view({"get": "list"})
+            )
+        )
+        self.assertFalse(
+            iscoroutinefunction(
+                ReservationViewSet.as_async_view({"post": "create"})
+            )
+        )
+
+    def test_performance_list_matches_sync(self):
+        response = self._compare(
+            PerformanceViewSet, {"get": "list"}, "/performances/?limit=2"
+        )
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(response.data["results"]), 2)
+
+        self._compare(
+            PerformanceViewSet,
+            {"get": "list"},
+            "/performances/?pagination=cursor&page_size=2",
+        )
+
+    def test_performance_retrieve_matches_sync(self):
+        with mock.patch.object(performance_detail_flight, "ttl", 0):
+            response = self._compare(
+                PerformanceViewSet,
+                {"get": "retrieve"},
+                "/performances/1/?seat_map=bitmap",
+                pk=self.performances[0].pk,
+            )
+        self.assertEqual(
+            response.data["taken_places"], [{"row": 2, "seat": 3}]
+        )
+
+    def test_missing_performance_returns_404(self):
+        response = async_to_sync(self._get)(
+            PerformanceViewSet, {"get": "retrieve"}, "/performances/0/", pk=0
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_play_list_and_retrieve_match_sync(self):
+        self._compare(PlayViewSet, {"get": "list"}, "/plays/?search=hamlet")
+        self._compare(
+            PlayViewSet, {"get": "retrieve"}, "/plays/1/", pk=self.play.pk
+        )
+
+    def test_reservation_list_matches_sync(self):
+        response = self._compare(
+            ReservationViewSet, {"get": "list"}, "/reservations/"
+        )
+        self.assertEqual(response.data["count"], 1)
+
+    def test_reservation_list_requires_authentication(self):
+        view = ReservationViewSet.as_async_view({"get": "list"})
+        response = async_to_sync(view)(self.factory.get("/reservations/"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_writes_fall_back_to_the_sync_viewset(self):
+        view = ReservationViewSet.as_async_view(
+            {"get": "list", "post": "create"}
+        )
+        request = self.factory.post(
+            "/reservations/",
+            {
+                "user": self.user.id,
+                "tickets": [
+                    {
+                        "row": 1,
+                        "seat": 1,
+                        "performance": self.performances[1].pk,
+                    }
+                ]
+            },
+            format="json",
+        )
+        force_authenticate(request, user=self.user)
+        response = async_to_sync(view)(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(
+            Ticket.objects.filter(
+                performance=self.performances[1], row=1, seat=1
+            ).exists()
+        )
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from theatre.coalesce import SingleFlight
+
+
+class SingleFlightTest(SimpleTestCase):
+    def test_concurrent_calls_share_one_computation(self):
+        flight = SingleFlight(ttl=0)
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(1)
+            return "result"
+
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            futures = [
+                pool.submit(flight.do, "key", compute) for _ in range(10)
+            ]
+            while flight.stats()["requests"] < 10:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(results, ["result"] * 10)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats()["coalesced"], 9)
+        self.assertEqual(flight.stats()["coalescing_ratio"], 0.9)
+
+    def test_result_is_reused_within_ttl(self):
+        flight = SingleFlight(ttl=60)
+        values = iter(range(10))
+
+        self.assertEqual(flight.do("a", lambda: next(values)), 0)
+        self.assertEqual(flight.do("a", lambda: next(values)), 0)
+        self.assertEqual(flight.do("b", lambda: next(values)), 1)
+        self.assertEqual(flight.stats()["fresh_hits"], 1)
+
+    def test_errors_are_not_reused(self):
+        flight = SingleFlight(ttl=60)
+
+        def fail():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            flight.do("a", fail)
+        self.assertEqual(flight.do("a", lambda: 1), 1)
+
+    def test_concurrent_coroutines_share_one_computation(self):
+        flight = SingleFlight(ttl=60)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def run():
+            return await asyncio.gather(
+                *(flight.ado("key", compute) for _ in range(10))
+            )
+
+        self.assertEqual(asyncio.run(run()), ["result"] * 10)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats()["coalesced"], 9)
+        self.assertEqual(flight.do("key", lambda: "other"), "result")
+
+    def test_coroutine_errors_are_shared_but_not_reused(self):
+        flight = SingleFlight(ttl=60)
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError
+
+        async def run():
+            return await asyncio.gather(
+                flight.ado("a", fail),
+                flight.ado("a", fail),
+                return_exceptions=True,
+            )
+
+        errors = asyncio.run(run())
+        self.assertTrue(all(isinstance(e, ValueError) for e in errors))
+        self.assertEqual(flight.do("a", lambda: 1), 1)
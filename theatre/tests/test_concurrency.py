@@ -0,0 +1,117 @@
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import Play, TheatreHall, Performance, Ticket
+
+User = get_user_model()
+
+REQUESTS = 300
+WORKERS = 16
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class ConcurrentReservationTest(TransactionTestCase):
+    def setUp(self):
+        hall = TheatreHall.objects.create(
+            name="Hall", rows=10, seats_in_row=10
+        )
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(title="Play", description="Play"),
+            theatre_hall=hall,
+            show_time=timezone.now(),
+        )
+        self.users = User.objects.bulk_create(
+            User(email=f"user{i}@u.com") for i in range(REQUESTS)
+        )
+        self.url = reverse("theatre:reservation-list")
+
+    def _reserve(self, user, seats):
+        client = APIClient()
+        client.force_authenticate(user)
+        try:
+            res = client.post(
+                self.url,
+                {
+                    "user": user.id,
+                    "tickets": [
+                        {
+                            "row": row,
+                            "seat": seat,
+                            "performance": self.performance.id,
+                        }
+                        for row, seat in seats
+                    ],
+                },
+                format="json",
+            )
+            return seats, res.status_code, res.data
+        finally:
+            connection.close()
+
+    def test_no_seat_is_sold_twice(self):
+        rnd = random.Random(42)
+        requests = [
+            (
+                user,
+                rnd.sample(
+                    [
+                        (row, seat)
+                        for row in (1, 2, 3)
+                        for seat in range(1, 11)
+                    ],
+                    rnd.randint(1, 4),
+                ),
+            )
+            for user in self.users
+        ]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            results = list(
+                pool.map(lambda args: self._reserve(*args), requests)
+            )
+        elapsed = time.perf_counter() - started
+
+        codes = Counter(code for _, code, _ in results)
+        self.assertEqual(
+            set(codes), {status.HTTP_201_CREATED, status.HTTP_409_CONFLICT}
+        )
+
+        sold = list(
+            Ticket.objects
+            .filter(performance=self.performance)
+            .values_list("row", "seat")
+        )
+        self.assertEqual(len(sold), len(set(sold)))
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, len(sold))
+        self.assertEqual(
+            sorted(sold),
+            sorted(
+                seat
+                for seats, code, _ in results
+                if code == status.HTTP_201_CREATED
+                for seat in seats
+            ),
+        )
+        for seats, code, data in results:
+            if code == status.HTTP_409_CONFLICT:
+                conflicting = {(s["row"], s["seat"]) for s in data["seats"]}
+                self.assertTrue(conflicting)
+                self.assertTrue(conflicting <= set(seats) & set(sold))
+
+        print(
+            f"\n{REQUESTS} overlapping reservations in {elapsed:.2f}s "
+            f"({REQUESTS / elapsed:.0f} req/s, {codes[201]} created, "
+            f"{codes[409]} conflicts)"
+        )
@@ -0,0 +1,114 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from theatre.dataset import DatasetGenerator, fill
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    Ticket,
+    TheatreHall,
+)
+
+OPTIONS = {
+    "seed": 7,
+    "halls": 3,
+    "plays": 20,
+    "genres": 4,
+    "actors": 30,
+    "users": 25,
+    "performances": 60,
+    "tickets": 3000,
+    "start": "2030-03-01",
+    "days": 14,
+}
+
+
+def snapshot():
+    return sorted(
+        Performance.objects.values_list(
+            "play__title", "theatre_hall__name", "show_time", "tickets_sold"
+        )
+    )
+
+
+class GenerateDatasetTest(TestCase):
+    def generate(self, **options):
+        call_command(
+            "generate_dataset",
+            **{**OPTIONS, **options},
+            stdout=StringIO(),
+        )
+
+    def test_generate(self):
+        self.generate()
+
+        self.assertEqual(Play.objects.count(), 20)
+        self.assertEqual(Performance.objects.count(), 60)
+        self.assertEqual(Ticket.objects.count(), 3000)
+        self.assertEqual(get_user_model().objects.count(), 25)
+        self.assertFalse(
+            Reservation.objects.filter(tickets__isnull=True).exists()
+        )
+        self.assertEqual(
+            Performance.objects.filter(
+                show_time__date__range=(
+                    date(2030, 3, 1), date(2030, 3, 14)
+                )
+            ).count(),
+            60,
+        )
+        call_command("sync_tickets_sold", check=True, stdout=StringIO())
+
+    def test_sales_are_skewed(self):
+        self.generate()
+
+        sold = sorted(
+            Performance.objects.values_list("tickets_sold", flat=True),
+            reverse=True,
+        )
+        self.assertGreater(sum(sold[:6]), sum(sold) / 3)
+
+    def test_same_seed_gives_same_dataset(self):
+        self.generate()
+        first = snapshot()
+        for model in (Play, Genre, Actor, TheatreHall, get_user_model()):
+            model.objects.all().delete()
+
+        self.generate()
+
+        self.assertEqual(snapshot(), first)
+
+    def test_existing_seed_is_reported(self):
+        self.generate(tickets=0)
+        with self.assertRaises(CommandError):
+            self.generate(tickets=0)
+
+    def test_empty_catalogue_is_rejected(self):
+        for name in ("genres", "actors"):
+            with self.subTest(name), self.assertRaises(CommandError):
+                self.generate(**{name: 0})
+
+    def test_progress_goes_to_stdout(self):
+        stdout = StringIO()
+        call_command("generate_dataset", **OPTIONS, stdout=stdout)
+
+        self.assertIn("users created", stdout.getvalue())
+
+    def test_fill_respects_capacity(self):
+        self.assertEqual(fill([10, 1, 1], [5, 50, 50], 40), [5, 18, 17])
+        self.assertEqual(fill([1, 1], [5, 5], 100), [5, 5])
+
+    def test_no_tickets_without_users(self):
+        generated = DatasetGenerator(
+            users=0, plays=2, halls=1, performances=3, actors=2, log=str
+        ).generate()
+
+        self.assertEqual(generated["tickets"], 0)
+        self.assertFalse(Ticket.objects.exists())
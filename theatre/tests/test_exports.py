@@ -0,0 +1,149 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre import exports
+from theatre.exports import TICKET_COLUMNS, astream_rows, ticket_rows
+from theatre.models import Reservation, Ticket
+from theatre.renderers import CSVRenderer, NDJSONRenderer
+from theatre.tests.test_view import (
+    sample_admin_user,
+    sample_performance,
+    sample_play,
+    sample_theatre_hall,
+    sample_user,
+)
+
+TICKETS_URL = reverse("theatre:export-tickets")
+RESERVATIONS_URL = reverse("theatre:export-reservations")
+
+
+def content(response) -> str:
+    return b"".join(response.streaming_content).decode()
+
+
+class ExportViewSetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_admin_user())
+        self.user = sample_user()
+        hall = sample_theatre_hall()
+        tomorrow = timezone.now() + timedelta(days=1)
+        self.hamlet = sample_play(title="Hamlet")
+        self.lear = sample_play(title="Lear")
+        self.performances = [
+            sample_performance(self.hamlet, hall, tomorrow),
+            sample_performance(self.lear, hall, tomorrow),
+        ]
+        self.reservations = []
+        for seat, performance in enumerate(self.performances * 2, start=1):
+            reservation = Reservation.objects.create(user=self.user)
+            Ticket.objects.create(
+                performance=performance,
+                reservation=reservation,
+                row=1,
+                seat=seat,
+            )
+            self.reservations.append(reservation)
+        Reservation.objects.filter(pk=self.reservations[0].pk).update(
+            created_at=timezone.now() - timedelta(days=10)
+        )
+
+    def test_tickets_csv(self):
+        response = self.client.get(TICKETS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            response["Content-Type"], "text/csv; charset=utf-8"
+        )
+        self.assertIn(
+            'filename="tickets.csv"', response["Content-Disposition"]
+        )
+        rows = list(csv.reader(io.StringIO(content(response))))
+        self.assertEqual(rows[0], [name for name, _ in TICKET_COLUMNS])
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[1][7], "Hamlet")
+        self.assertEqual(rows[1][3], self.user.email)
+
+    def test_reservations_ndjson(self):
+        response = self.client.get(RESERVATIONS_URL, {"format": "ndjson"})
+
+        self.assertEqual(response["Content-Type"], (
+            "application/x-ndjson; charset=utf-8"
+        ))
+        lines = [json.loads(line) for line in content(response).splitlines()]
+        self.assertEqual(
+            [line["reservation_id"] for line in lines],
+            sorted(reservation.id for reservation in self.reservations),
+        )
+        self.assertEqual({line["tickets"] for line in lines}, {1})
+
+    def test_filters(self):
+        today = timezone.localdate().isoformat()
+        cases = [
+            (TICKETS_URL, {"play": self.lear.id}, 2),
+            (TICKETS_URL, {"performance": self.performances[0].id}, 2),
+            (TICKETS_URL, {"date_from": today}, 3),
+            (RESERVATIONS_URL, {"play": self.hamlet.id, "date_to": today}, 2),
+            (
+                RESERVATIONS_URL,
+                {"performance": self.performances[0].id, "date_from": today},
+                1,
+            ),
+        ]
+        for url, params, expected in cases:
+            with self.subTest(url=url, params=params):
+                response = self.client.get(url, {**params, "format": "ndjson"})
+                self.assertEqual(
+                    len(content(response).splitlines()), expected
+                )
+
+    def test_invalid_filters(self):
+        for params in ({"play": "x"}, {"date_from": "yesterday"}):
+            response = self.client.get(TICKETS_URL, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_only(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(TICKETS_URL)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_rows_are_sent_in_chunks(self):
+        with mock.patch.object(exports, "EXPORT_CHUNK_SIZE", 3):
+            chunks = list(
+                exports.stream_rows(
+                    ticket_rows(Ticket.objects.all()),
+                    TICKET_COLUMNS,
+                    NDJSONRenderer(),
+                )
+            )
+        self.assertEqual(
+            [chunk.count(b"\n") for chunk in chunks], [0, 3, 1]
+        )
+
+    def test_async_stream_matches_sync_stream(self):
+        async def collect():
+            return [
+                chunk async for chunk in astream_rows(
+                    ticket_rows(Ticket.objects.all()),
+                    TICKET_COLUMNS,
+                    CSVRenderer(),
+                )
+            ]
+
+        sync_chunks = exports.stream_rows(
+            ticket_rows(Ticket.objects.all()), TICKET_COLUMNS, CSVRenderer()
+        )
+        self.assertEqual(
+            b"".join(async_to_sync(collect)()), b"".join(sync_chunks)
+        )
@@ -0,0 +1,121 @@
+import tempfile
+from io import BytesIO, StringIO
+from pathlib import Path
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.images import generate_variants, render_variants, variant_path
+from theatre.models import Job
+from theatre.tests.test_view import sample_admin_user, sample_play
+
+PLAYS_URL = reverse("theatre:play-list")
+
+
+def poster(width=1000, height=1500, fmt="JPEG") -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "crimson").save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class RenderVariantsTest(SimpleTestCase):
+    def test_webp_at_every_width(self):
+        variants = render_variants(BytesIO(poster()))
+
+        self.assertEqual(list(variants), [160, 320, 640])
+        with Image.open(BytesIO(variants[320])) as image:
+            self.assertEqual(image.format, "WEBP")
+            self.assertEqual(image.size, (320, 480))
+        self.assertLess(len(variants[640]), len(poster()))
+
+    def test_never_upscales(self):
+        variants = render_variants(BytesIO(poster(200, 100, "PNG")))
+        self.assertEqual(list(variants), [160, 200])
+
+    def test_variant_path(self):
+        self.assertEqual(
+            variant_path("uploads/plays/hamlet-1a2b.jpg", 320),
+            "uploads/plays/variants/hamlet-1a2b-320w.webp",
+        )
+
+
+class ImageVariantsTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.settings = override_settings(MEDIA_ROOT=self.media.name)
+        self.settings.enable()
+        self.client = APIClient()
+        self.client.force_authenticate(sample_admin_user())
+        self.play = sample_play(title="Hamlet")
+
+    def tearDown(self):
+        self.settings.disable()
+        self.media.cleanup()
+
+    def upload(self, content=None):
+        return self.client.post(
+            reverse("theatre:play-upload-image", args=[self.play.id]),
+            {"image": SimpleUploadedFile("hamlet.jpg", content or poster())},
+            format="multipart",
+        )
+
+    def test_upload_queues_variants(self):
+        response = self.upload()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.play.refresh_from_db()
+        self.assertEqual(self.play.image_widths, [])
+        job = Job.objects.get()
+        self.assertEqual(job.name, "theatre.images.generate_variants")
+        self.assertEqual(
+            job.payload,
+            {"play_id": self.play.id, "name": self.play.image.name},
+        )
+
+    def test_generated_variants_are_listed(self):
+        self.upload()
+        self.play.refresh_from_db()
+        name = self.play.image.name
+
+        widths = generate_variants(self.play.id, name)
+
+        self.assertEqual(widths, [160, 320, 640])
+
+        for width in (160, 320, 640):
+            self.assertTrue(
+                (Path(self.media.name) / variant_path(name, width)).exists()
+            )
+        [play] = self.client.get(PLAYS_URL).data["results"]
+        url = f"http://testserver/media/{variant_path(name, 320)}"
+        self.assertEqual(play["image_thumb"], url)
+        self.assertIn(f"{url} 320w, ", play["image_srcset"])
+
+    def test_replaced_poster_keeps_new_widths(self):
+        self.upload()
+        self.play.refresh_from_db()
+        old = self.play.image.name
+        self.upload(poster(300, 450))
+
+        generate_variants(self.play.id, old)
+
+        self.play.refresh_from_db()
+        self.assertEqual(self.play.image_widths, [])
+        [play] = self.client.get(PLAYS_URL).data["results"]
+        self.assertIsNone(play["image_thumb"])
+        self.assertIsNone(play["image_srcset"])
+
+    def test_command_renders_missing_variants(self):
+        self.upload(poster(300, 450))
+        sample_play(title="No poster")
+
+        out = StringIO()
+        call_command("generate_image_variants", stdout=out)
+
+        self.assertIn("Rendered variants of 1 posters", out.getvalue())
+        self.play.refresh_from_db()
+        self.assertEqual(self.play.image_widths, [160, 300])
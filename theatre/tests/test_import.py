@@ -0,0 +1,167 @@
+import json
+import tempfile
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from theatre.models import Actor, Genre, Performance, Play, TheatreHall
+from theatre.tests.test_view import sample_actor, sample_genre
+
+GENRES = "name\nDrama\nComedy\n"
+ACTORS = "first_name,last_name\nAnna,Smith\nJohn,Doe\n"
+HALLS = "name,rows,seats_in_row\nBlue,10,12\n"
+PLAYS = [
+    {
+        "title": "Hamlet",
+        "description": "Prince of Denmark",
+        "genres": ["Drama", "Tragedy"],
+        "actors": ["Anna Smith", "John Doe"],
+    },
+    {"title": "Tartuffe", "duration": 90, "genres": ["Comedy"]},
+]
+PERFORMANCES = (
+    "play,theatre_hall,show_time\n"
+    "Hamlet,Blue,2030-01-10T19:00:00\n"
+    "Tartuffe,Blue,2030-01-11T19:00:00+00:00\n"
+)
+
+
+class ImportCatalogueTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+        self.write("genres.csv", GENRES)
+        self.write("actors.csv", ACTORS)
+        self.write("theatre_halls.csv", HALLS)
+        self.write("plays.json", json.dumps(PLAYS))
+        self.write("performances.csv", PERFORMANCES)
+        sample_genre("Tragedy")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, text):
+        (self.path / name).write_text(text)
+
+    def run_import(self, *args, **options):
+        out = StringIO()
+        call_command(
+            "import_catalogue",
+            *(args or [self.path]),
+            stdout=out,
+            stderr=StringIO(),
+            **options,
+        )
+        return out.getvalue()
+
+    def test_import(self):
+        out = self.run_import()
+
+        self.assertIn("genres: 2 created, 0 already present", out)
+        hamlet = Play.objects.get(title="Hamlet")
+        self.assertEqual(hamlet.duration, 60)
+        self.assertEqual(
+            sorted(hamlet.genres.values_list("name", flat=True)),
+            ["Drama", "Tragedy"],
+        )
+        self.assertEqual(
+            sorted(actor.full_name for actor in hamlet.actors.all()),
+            ["Anna Smith", "John Doe"],
+        )
+        self.assertEqual(Play.objects.get(title="Tartuffe").duration, 90)
+        self.assertEqual(
+            Performance.objects.get(play=hamlet).show_time,
+            timezone.make_aware(datetime(2030, 1, 10, 19)),
+        )
+
+    def test_import_is_idempotent(self):
+        self.run_import()
+        out = self.run_import()
+
+        self.assertIn("performances: 0 created, 2 already present", out)
+        self.assertEqual(Genre.objects.count(), 3)
+        self.assertEqual(Actor.objects.count(), 2)
+        self.assertEqual(Performance.objects.count(), 2)
+        self.assertEqual(Play.genres.through.objects.count(), 3)
+
+    def test_references_resolve_to_existing_rows(self):
+        actor = sample_actor("Old", "Hand")
+        (self.path / "actors.csv").unlink()
+        self.write(
+            "plays.csv", "title,description,actors\nLear,King,Old Hand\n"
+        )
+        (self.path / "plays.json").unlink()
+        self.write(
+            "performances.csv",
+            "play,theatre_hall,show_time\nLear,Blue,2030-02-01T19:00:00\n",
+        )
+
+        self.run_import()
+
+        self.assertEqual(
+            list(Play.objects.get(title="Lear").actors.all()), [actor]
+        )
+
+    def test_other_backends_use_bulk_create(self):
+        with mock.patch.object(connection, "vendor", "sqlite"):
+            self.run_import()
+
+        self.assertEqual(Play.actors.through.objects.count(), 2)
+        self.assertEqual(Performance.objects.count(), 2)
+
+    def test_dry_run_saves_nothing(self):
+        out = self.run_import(dry_run=True)
+
+        self.assertIn("plays: 2 created", out)
+        self.assertIn("Dry run", out)
+        self.assertFalse(Play.objects.exists())
+        self.assertFalse(TheatreHall.objects.exists())
+
+    def test_invalid_rows_are_reported_and_nothing_is_saved(self):
+        self.write("theatre_halls.csv", "name,rows,seats_in_row\nBlue,0,12\n")
+        self.write(
+            "performances.csv",
+            PERFORMANCES + "Hamlet,Red,2030-01-10T19:00:00\nHamlet,Blue,x\n"
+            "Hamlet,Blue,2030-01-10T19:00:00\n",
+        )
+        err = StringIO()
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "import_catalogue", self.path, stdout=StringIO(), stderr=err
+            )
+
+        self.assertEqual(err.getvalue().splitlines(), [
+            "theatre_halls.csv:2: rows must be a positive integer",
+            "performances.csv:5: show_time must be an ISO 8601 datetime",
+            "performances.csv:6: duplicate of performances.csv:2",
+        ])
+        self.assertFalse(Play.objects.exists())
+
+    def test_unknown_references(self):
+        self.write(
+            "performances.csv",
+            "play,theatre_hall,show_time\nMacbeth,Red,2030-01-10T19:00:00\n",
+        )
+        err = StringIO()
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "import_catalogue", self.path, stdout=StringIO(), stderr=err
+            )
+
+        self.assertEqual(err.getvalue().splitlines(), [
+            "performances.csv:2: unknown play 'Macbeth'",
+            "performances.csv:2: unknown theatre hall 'Red'",
+        ])
+
+    def test_unexpected_file_name(self):
+        self.write("tickets.csv", "row,seat\n")
+        with self.assertRaises(CommandError):
+            self.run_import(self.path / "tickets.csv")
@@ -0,0 +1,174 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from theatre.jobs import (
+    Worker,
+    backoff,
+    claim_jobs,
+    enqueue,
+    job,
+    requeue_abandoned,
+    run_job,
+)
+from theatre.models import Job
+
+calls = []
+calls_lock = threading.Lock()
+
+
+@job
+def record(value):
+    with calls_lock:
+        calls.append(value)
+
+
+@job(max_attempts=2)
+def explode():
+    raise ValueError("boom")
+
+
+def not_a_job():
+    pass
+
+
+@override_settings(JOBS_BACKOFF=10, JOBS_BACKOFF_MAX=60)
+class JobQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_only_job_functions_are_queued(self):
+        with self.assertRaises(TypeError):
+            enqueue(not_a_job)
+
+        queued = enqueue(record, value=1)
+
+        self.assertEqual(queued.name, "theatre.tests.test_jobs.record")
+        self.assertEqual(queued.payload, {"value": 1})
+        self.assertEqual(queued.status, Job.Status.QUEUED)
+
+    def test_claims_due_jobs_once(self):
+        first = enqueue(record, value=1)
+        enqueue(record, value=2, run_at=timezone.now() + timedelta(hours=1))
+
+        [claimed] = claim_jobs(10)
+
+        self.assertEqual(claimed.id, first.id)
+        self.assertEqual(claimed.payload, {"value": 1})
+        self.assertEqual(claimed.attempts, 1)
+        self.assertEqual(claim_jobs(10), [])
+        first.refresh_from_db()
+        self.assertEqual(first.status, Job.Status.RUNNING)
+        self.assertIsNotNone(first.locked_at)
+
+    def test_successful_job_is_deleted(self):
+        enqueue(record, value="done")
+        [claimed] = claim_jobs(1)
+
+        self.assertTrue(run_job(claimed))
+
+        self.assertEqual(calls, ["done"])
+        self.assertFalse(Job.objects.exists())
+
+    def test_failed_job_is_retried_then_kept(self):
+        queued = enqueue(explode)
+
+        with self.assertLogs("theatre.jobs", "WARNING"):
+            self.assertFalse(run_job(claim_jobs(1)[0]))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.Status.QUEUED)
+        self.assertIn("ValueError: boom", queued.last_error)
+        self.assertAlmostEqual(
+            (queued.run_at - timezone.now()).total_seconds(), 10, delta=2
+        )
+
+        Job.objects.update(run_at=timezone.now())
+        with self.assertLogs("theatre.jobs", "ERROR"):
+            run_job(claim_jobs(1)[0])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.Status.FAILED)
+        self.assertEqual(queued.attempts, 2)
+        self.assertEqual(claim_jobs(1), [])
+
+    def test_backoff_doubles_up_to_the_limit(self):
+        self.assertEqual(
+            [backoff(attempts) for attempts in range(1, 6)],
+            [10, 20, 40, 60, 60],
+        )
+
+    @override_settings(JOBS_LOCK_TIMEOUT=60)
+    def test_abandoned_jobs_are_requeued(self):
+        stale, fresh = enqueue(record, value=1), enqueue(record, value=2)
+        last = enqueue(explode)
+        claim_jobs(3)
+        Job.objects.filter(pk=last.pk).update(attempts=2)
+        Job.objects.exclude(pk=fresh.pk).update(
+            locked_at=timezone.now() - timedelta(minutes=5)
+        )
+
+        self.assertEqual(requeue_abandoned(), 1)
+
+        statuses = dict(Job.objects.values_list("id", "status"))
+        self.assertEqual(
+            statuses,
+            {
+                stale.id: Job.Status.QUEUED,
+                fresh.id: Job.Status.RUNNING,
+                last.id: Job.Status.FAILED,
+            },
+        )
+
+
+class WorkerTest(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_locked_jobs_are_skipped(self):
+        first, second = enqueue(record, value=1), enqueue(record, value=2)
+        claimed_by_other = []
+        claimed, release = threading.Event(), threading.Event()
+
+        def other_worker():
+            with transaction.atomic():
+                claimed_by_other.extend(claim_jobs(1))
+                claimed.set()
+                release.wait(5)
+            connection.close()
+
+        thread = threading.Thread(target=other_worker)
+        thread.start()
+        claimed.wait(5)
+        try:
+            mine = claim_jobs(10)
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual([job.id for job in claimed_by_other], [first.id])
+        self.assertEqual([job.id for job in mine], [second.id])
+
+    def test_worker_runs_every_job_once(self):
+        for value in range(20):
+            enqueue(record, value=value)
+        enqueue(explode, run_at=timezone.now() + timedelta(hours=1))
+
+        worker = Worker(concurrency=3, poll_interval=0.05, burst=True)
+        worker.run()
+
+        self.assertEqual(sorted(calls), list(range(20)))
+        self.assertEqual((worker.succeeded, worker.failed), (20, 0))
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_run_jobs_command(self):
+        enqueue(record, value="a")
+        out = StringIO()
+
+        call_command("run_jobs", "--burst", "--concurrency=2", stdout=out)
+
+        self.assertEqual(calls, ["a"])
+        self.assertIn("1 jobs succeeded, 0 failed", out.getvalue())
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.media import CHUNK_SIZE, _byte_range
+from theatre.models import Play
+from theatre.tests.test_images import poster
+from theatre.tests.test_view import sample_admin_user, sample_play
+
+CONTENT = bytes(range(256)) * (CHUNK_SIZE // 128)
+
+
+class TemporaryMediaMixin:
+    def setUp(self):
+        super().setUp()
+        self.media = tempfile.TemporaryDirectory()
+        self.root = Path(self.media.name)
+        self.media_settings = override_settings(MEDIA_ROOT=self.media.name)
+        self.media_settings.enable()
+
+    def tearDown(self):
+        self.media_settings.disable()
+        self.media.cleanup()
+        super().tearDown()
+
+    def age(self, name, seconds=7200):
+        then = time.time() - seconds
+        os.utime(self.root / name, (then, then))
+
+
+class ContentAddressedStorageTest(TemporaryMediaMixin, SimpleTestCase):
+    def test_names_files_by_content(self):
+        first = default_storage.save("posters/a.JPG", ContentFile(CONTENT))
+        second = default_storage.save("posters/b.jpg", ContentFile(CONTENT))
+
+        digest = hashlib.sha256(CONTENT).hexdigest()
+        self.assertEqual(first, f"posters/{digest}.jpg")
+        self.assertEqual(second, first)
+        self.assertEqual(os.listdir(self.root / "posters"), [f"{digest}.jpg"])
+        self.assertEqual((self.root / first).read_bytes(), CONTENT)
+
+    def test_save_at_replaces_in_place(self):
+        default_storage.save_at("a/b.webp", ContentFile(b"old"))
+        name = default_storage.save_at("a/b.webp", ContentFile(b"new"))
+
+        self.assertEqual(name, "a/b.webp")
+        self.assertEqual(os.listdir(self.root / "a"), ["b.webp"])
+        self.assertEqual((self.root / name).read_bytes(), b"new")
+
+    def test_byte_ranges(self):
+        self.assertEqual(_byte_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(_byte_range("bytes=90-", 100), (90, 99))
+        self.assertEqual(_byte_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(_byte_range("bytes=50-500", 100), (50, 99))
+        self.assertIsNone(_byte_range("bytes=0-1,5-6", 100))
+        self.assertIsNone(_byte_range("bytes=9-1", 100))
+        with self.assertRaises(ValueError):
+            _byte_range("bytes=100-", 100)
+
+
+class ServeMediaTest(TemporaryMediaMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.name = default_storage.save("p/x.bin", ContentFile(CONTENT))
+        self.url = reverse("media", args=[self.name])
+
+    def test_full_file_is_cached_forever(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+        self.assertEqual(
+            response["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Length"], str(len(CONTENT)))
+
+        response = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_range(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=10-19")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[10:20])
+        self.assertEqual(
+            response["Content-Range"], f"bytes 10-19/{len(CONTENT)}"
+        )
+        self.assertEqual(response["Content-Length"], "10")
+
+        response = self.client.get(
+            self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(
+            self.url, HTTP_RANGE=f"bytes={len(CONTENT)}-"
+        )
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(CONTENT)}")
+
+    def test_hidden_and_outside_files_are_not_served(self):
+        (self.root / "p" / ".upload.tmp").write_bytes(b"partial")
+        for path in ("p/.upload.tmp", "../etc/passwd", "p", "p/missing"):
+            response = self.client.get(reverse("media", args=[path]))
+            self.assertEqual(response.status_code, 404, path)
+
+
+class PlayImageStorageTest(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(sample_admin_user())
+
+    def upload(self, play, content):
+        response = self.client.post(
+            reverse("theatre:play-upload-image", args=[play.id]),
+            {"image": SimpleUploadedFile("poster.jpg", content)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        play.refresh_from_db()
+        return play.image.name
+
+    def test_same_poster_is_stored_once(self):
+        content = poster()
+        hamlet = self.upload(sample_play(title="Hamlet"), content)
+        lear = self.upload(sample_play(title="King Lear"), content)
+
+        self.assertEqual(hamlet, lear)
+        self.assertEqual(
+            hamlet, f"uploads/plays/{hashlib.sha256(content).hexdigest()}.jpg"
+        )
+        self.assertEqual(len(os.listdir(self.root / "uploads/plays")), 1)
+
+    def test_cleanup_deletes_orphans_only(self):
+        play = sample_play(title="Hamlet")
+        replaced = self.upload(play, poster(300, 450))
+        current = self.upload(play, poster())
+        stem = Path(current).stem
+        for name in (f"{stem}-160w.webp", f"{Path(replaced).stem}-160w.webp"):
+            default_storage.save_at(
+                f"uploads/plays/variants/{name}", ContentFile(b"webp")
+            )
+        (self.root / "uploads/plays/.crashed.tmp").write_bytes(b"partial")
+        recent = default_storage.save(
+            "uploads/plays/new.jpg", ContentFile(b"x")
+        )
+        for name in os.listdir(self.root / "uploads/plays"):
+            if name != Path(recent).name:
+                self.age(f"uploads/plays/{name}")
+        for name in os.listdir(self.root / "uploads/plays/variants"):
+            self.age(f"uploads/plays/variants/{name}")
+
+        out = StringIO()
+        call_command("cleanup_media", "--dry-run", stdout=out)
+        self.assertIn("Would delete 3 orphaned files", out.getvalue())
+        self.assertTrue((self.root / replaced).exists())
+
+        call_command("cleanup_media", stdout=StringIO())
+
+        self.assertEqual(
+            sorted(os.listdir(self.root / "uploads/plays")),
+            sorted([Path(current).name, Path(recent).name, "variants"]),
+        )
+        self.assertEqual(
+            os.listdir(self.root / "uploads/plays/variants"),
+            [f"{stem}-160w.webp"],
+        )
+        self.assertTrue(Play.objects.filter(image=current).exists())
@@ -0,0 +1,179 @@
+import re
+from datetime import timedelta
+
+from django.db import connection
+from django.test import AsyncClient, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.test import APIClient
+
+from theatre.metrics import (
+    Histogram,
+    Registry,
+    Timings,
+    current_timings,
+    registry,
+)
+from theatre.serializers import GenreSerializer
+from theatre.tests.test_view import (
+    sample_admin_user,
+    sample_genre,
+    sample_performance,
+    sample_play,
+    sample_theatre_hall,
+    sample_user,
+)
+
+PERFORMANCES_URL = reverse("theatre:performance-list")
+METRICS_URL = reverse("metrics")
+
+
+def server_timing(response) -> dict:
+    return {
+        name: (float(duration), description)
+        for name, duration, description in re.findall(
+            r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?',
+            response["Server-Timing"],
+        )
+    }
+
+
+class RequestMetricsTest(TestCase):
+    def setUp(self):
+        registry.clear()
+        self.client = APIClient()
+        self.admin = sample_admin_user()
+        self.client.force_authenticate(self.admin)
+        play = sample_play()
+        hall = sample_theatre_hall()
+        for days in (1, 2, 3):
+            sample_performance(
+                play, hall, timezone.now() + timedelta(days=days)
+            )
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(PERFORMANCES_URL)
+
+        timing = server_timing(response)
+        self.assertEqual(
+            set(timing), {"db", "serialize", "render", "total"}
+        )
+        self.assertEqual(timing["db"][1], f"{len(queries)} queries")
+        self.assertGreater(timing["serialize"][0], 0)
+        self.assertGreater(timing["render"][0], 0)
+        self.assertGreaterEqual(
+            timing["total"][0],
+            timing["db"][0] + timing["serialize"][0] + timing["render"][0],
+        )
+
+    def test_server_timing_is_for_staff(self):
+        customer = APIClient()
+        customer.force_authenticate(sample_user())
+
+        response = customer.get(PERFORMANCES_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header("Server-Timing"))
+        with override_settings(SERVER_TIMING=True):
+            response = customer.get(PERFORMANCES_URL)
+        self.assertIn("db", server_timing(response))
+
+    def test_serializers_outside_the_api_are_not_timed(self):
+        class Other(serializers.Serializer):
+            name = serializers.CharField()
+
+        timings = Timings()
+        token = current_timings.set(timings)
+        try:
+            Other({"name": "x"}).data
+            Other([{"name": "x"}], many=True).data
+            self.assertEqual(timings.serialize, 0)
+            GenreSerializer([sample_genre()], many=True).data
+        finally:
+            current_timings.reset(token)
+        self.assertGreater(timings.serialize, 0)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_endpoint(self):
+        self.client.get(PERFORMANCES_URL)
+        self.client.get(PERFORMANCES_URL)
+        self.client.get("/api/theatre/nowhere/")
+
+        response = self.client.get(
+            METRICS_URL, HTTP_AUTHORIZATION="Bearer secret"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        text = response.content.decode()
+        labels = 'view="theatre:performance-list",action="list"'
+        self.assertIn(
+            f"theatre_request_duration_seconds_count{{{labels}}} 2", text
+        )
+        self.assertIn(
+            f'theatre_responses_total{{{labels},status="200"}} 2', text
+        )
+        self.assertIn(
+            'theatre_responses_total{view="<unmatched>",action="-",'
+            'status="404"} 1',
+            text,
+        )
+        self.assertIn("# TYPE theatre_db_queries histogram", text)
+
+    def test_metrics_closed_without_token(self):
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_token(self):
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        response = self.client.get(
+            METRICS_URL, HTTP_AUTHORIZATION="Bearer secret"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(SERVER_TIMING=True)
+    async def test_async_requests_are_measured(self):
+        response = await AsyncClient().get(PERFORMANCES_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("total", server_timing(response))
+        self.assertIn(
+            'theatre_responses_total{view="theatre:performance-list",'
+            'action="list",status="401"} 1',
+            registry.render(),
+        )
+
+
+class RegistryTest(SimpleTestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram((1, 5))
+        for value in (0, 1, 3, 7):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 1, 1])
+
+        metrics = Registry()
+        timings = Timings()
+        timings.queries = 4
+        metrics.observe('a"b', "list", 200, timings)
+        text = metrics.render()
+
+        self.assertIn(
+            'theatre_db_queries_bucket{view="a\\"b",action="list",le="3"} 0',
+            text,
+        )
+        self.assertIn(
+            'theatre_db_queries_bucket{view="a\\"b",action="list",le="5"} 1',
+            text,
+        )
+        self.assertIn(
+            'theatre_db_queries_count{view="a\\"b",action="list"} 1', text
+        )
@@ -1,3 +1,7 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 
 from theatre.models import (
@@ -127,3 +131,29 @@ class TicketTest(TestCase):
             str(self.ticket),
             "TestPlay at 2024-10-10T18:00:00Z (Row 1, Seat 1)"
         )
+
+
+class PerformanceTicketsSoldTest(TestCase):
+    def setUp(self):
+        self.performance = sample_performance()
+        self.reservation = sample_reservation(sample_user())
+
+    def test_counter_follows_ticket_changes(self):
+        sample_ticket(1, 1, self.performance, self.reservation)
+        ticket = sample_ticket(1, 2, self.performance, self.reservation)
+        ticket.delete()
+
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 1)
+
+    def test_sync_tickets_sold_command(self):
+        sample_ticket(1, 1, self.performance, self.reservation)
+        Performance.objects.update(tickets_sold=5)
+
+        with self.assertRaises(CommandError):
+            call_command("sync_tickets_sold", check=True, stdout=StringIO())
+        call_command("sync_tickets_sold", stdout=StringIO())
+        call_command("sync_tickets_sold", check=True, stdout=StringIO())
+
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 1)
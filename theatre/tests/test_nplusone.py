@@ -0,0 +1,106 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import Reservation, Ticket
+from theatre.nplusone import NPlusOneDetected, QueryShapes
+from theatre.tests.test_view import (
+    sample_performance,
+    sample_play,
+    sample_theatre_hall,
+    sample_user,
+)
+from theatre.views import ReservationViewSet
+
+RESERVATIONS_URL = (
+    reverse("theatre:reservation-list") + "?pagination=cursor&page_size=6"
+)
+
+
+def without_prefetch(*lookups):
+    def get_queryset(self):
+        return Reservation.objects.filter(
+            user=self.request.user
+        ).prefetch_related(*lookups)
+
+    return mock.patch.object(ReservationViewSet, "get_queryset", get_queryset)
+
+
+class NPlusOneTest(TestCase):
+    def setUp(self):
+        self.user = sample_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        hall = sample_theatre_hall()
+        tomorrow = timezone.now() + timedelta(days=1)
+        for seat in range(1, 7):
+            performance = sample_performance(
+                sample_play(title=f"Play {seat}"), hall, tomorrow
+            )
+            Ticket.objects.create(
+                performance=performance,
+                reservation=Reservation.objects.create(user=self.user),
+                row=1,
+                seat=seat,
+            )
+
+    def test_prefetched_list_passes_strict_mode(self):
+        response = self.client.get(RESERVATIONS_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_strict_mode_names_the_field(self):
+        with without_prefetch(), self.assertRaisesMessage(
+                NPlusOneDetected, "from ReservationListSerializer.tickets:"
+        ):
+            self.client.get(RESERVATIONS_URL)
+
+    def test_nested_field_path(self):
+        with without_prefetch("tickets"), self.assertRaisesMessage(
+                NPlusOneDetected,
+                "from ReservationListSerializer.tickets > "
+                "TicketListSerializer.performance:",
+        ):
+            self.client.get(RESERVATIONS_URL)
+
+    @override_settings(NPLUSONE_MODE="log", NPLUSONE_SAMPLE_RATE=1.0)
+    def test_log_mode(self):
+        with without_prefetch("tickets"), self.assertLogs(
+                "theatre.nplusone", "WARNING"
+        ) as logs:
+            response = self.client.get(RESERVATIONS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(logs.output), 3)
+        self.assertIn(
+            "N+1 queries in theatre:reservation-list: 6 queries of the same "
+            "shape, from ReservationListSerializer.tickets > "
+            "TicketListSerializer.performance:",
+            logs.output[0],
+        )
+
+    @override_settings(NPLUSONE_MODE="log", NPLUSONE_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_not_checked(self):
+        with without_prefetch(), self.assertNoLogs("theatre.nplusone"):
+            self.client.get(RESERVATIONS_URL)
+
+
+class QueryShapesTest(SimpleTestCase):
+    def test_in_lists_share_a_shape(self):
+        shapes = QueryShapes(threshold=3, strict=False)
+        shapes.observe('SELECT "id" FROM "t" WHERE "id" IN (%s, %s)')
+        shapes.observe('SELECT "id" FROM "t" WHERE "id" IN (%s)')
+        shapes.observe('UPDATE "t" SET "a" = %s WHERE "id" = %s')
+        shapes.observe('UPDATE "t" SET "a" = %s WHERE "id" = %s')
+        self.assertFalse(shapes.findings)
+
+        shapes.observe('SELECT "id" FROM "t" WHERE "id" IN (%s,%s,%s)')
+
+        [finding] = shapes.findings.values()
+        self.assertEqual(finding.count, 3)
+        self.assertEqual(finding.fields, [])
+        self.assertIn("IN (%s...)", str(finding))
@@ -0,0 +1,123 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+import msgpack
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from theatre import renderers
+from theatre.models import Genre
+from theatre.parsers import FastJSONParser, MessagePackParser
+from theatre.renderers import FastJSONRenderer, MessagePackRenderer
+from theatre.tests.test_view import (
+    sample_admin_user,
+    sample_performance,
+    sample_play,
+    sample_theatre_hall,
+)
+
+DATA = {
+    "id": 1,
+    "title": "Ñoño   line   para",
+    "show_time": datetime(2024, 10, 20, 18, 0, 0, 123456, timezone.utc),
+    "day": datetime(2024, 10, 20).date(),
+    "price": Decimal("10.50"),
+    "uuid": uuid.UUID(int=1),
+    "lazy": gettext_lazy("Not found."),
+    "nested": ReturnDict([("b", [1, 2.5, None, True])], serializer=None),
+    1: "int key",
+}
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    def test_output_matches_json_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(DATA), JSONRenderer().render(DATA)
+        )
+
+    def test_indent_and_missing_orjson_use_stdlib(self):
+        self.assertEqual(
+            FastJSONRenderer().render(DATA, "application/json; indent=2"),
+            JSONRenderer().render(DATA, "application/json; indent=2"),
+        )
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(
+                FastJSONRenderer().render(DATA), JSONRenderer().render(DATA)
+            )
+
+    def test_integers_orjson_rejects_fall_back(self):
+        data = {"big": 2 ** 70}
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_parser_rejects_invalid_json(self):
+        parser = FastJSONParser()
+        self.assertEqual(parser.parse(BytesIO(b'{"a": [1]}')), {"a": [1]})
+        with self.assertRaises(ParseError):
+            parser.parse(BytesIO(b'{"a": NaN}'))
+
+
+class MessagePackTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_admin_user())
+        play = sample_play()
+        hall = sample_theatre_hall()
+        sample_performance(
+            play, hall, datetime.now(timezone.utc) + timedelta(days=1)
+        )
+
+    def test_renderer_encodes_like_json(self):
+        data = {key: value for key, value in DATA.items() if key != 1}
+        self.assertEqual(
+            msgpack.unpackb(MessagePackRenderer().render(data)),
+            msgpack.unpackb(msgpack.packb(
+                {
+                    **data,
+                    "show_time": "2024-10-20T18:00:00.123456Z",
+                    "day": "2024-10-20",
+                    "price": 10.5,
+                    "uuid": str(DATA["uuid"]),
+                    "lazy": "Not found.",
+                }
+            )),
+        )
+
+    def test_list_is_negotiated_through_accept(self):
+        url = reverse("theatre:performance-list")
+        json_response = self.client.get(url)
+        response = self.client.get(url, HTTP_ACCEPT="application/msgpack")
+
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(
+            msgpack.unpackb(response.content), json_response.json()
+        )
+
+    def test_request_body_is_parsed(self):
+        response = self.client.post(
+            reverse("theatre:genre-list"),
+            msgpack.packb({"name": "Opera"}),
+            content_type="application/msgpack",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Genre.objects.filter(name="Opera").exists())
+
+    def test_invalid_body_is_a_parse_error(self):
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(BytesIO(b"\xc1"))
+        response = self.client.post(
+            reverse("theatre:genre-list"),
+            b"\x81\x91\x01\x01",
+            content_type="application/msgpack",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase
+
+from theatre.seatmap import SeatMap
+
+
+class SeatMapTest(SimpleTestCase):
+    def setUp(self):
+        self.seat_map = SeatMap(3, 5, [(1, 1), (2, 5), (3, 3)])
+
+    def test_is_taken(self):
+        self.assertTrue(self.seat_map.is_taken(1, 1))
+        self.assertTrue(self.seat_map.is_taken(2, 5))
+        self.assertFalse(self.seat_map.is_taken(2, 4))
+        self.assertIn((3, 3), self.seat_map)
+
+    def test_out_of_range_seat(self):
+        with self.assertRaises(IndexError):
+            self.seat_map.is_taken(4, 1)
+        with self.assertRaises(IndexError):
+            self.seat_map.take(1, 6)
+
+    def test_taken_seats_outside_the_hall_are_skipped(self):
+        seat_map = SeatMap(2, 2, [(1, 1), (3, 1), (2, 3)])
+
+        self.assertEqual(list(seat_map), [(1, 1)])
+
+    def test_iterates_taken_seats_in_order(self):
+        self.seat_map.take(1, 2)
+        self.seat_map.release(2, 5)
+
+        self.assertEqual(list(self.seat_map), [(1, 1), (1, 2), (3, 3)])
+        self.assertEqual(len(self.seat_map), 3)
+
+    def test_base64_round_trip(self):
+        data = self.seat_map.as_dict()
+        restored = SeatMap.from_base64(
+            data["rows"], data["seats_in_row"], data["bitmap"]
+        )
+
+        self.assertEqual(data["bitmap"], "gEg=")
+        self.assertEqual(list(restored), list(self.seat_map))
@@ -1,4 +1,11 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
 
 from theatre.models import (
     Genre,
@@ -198,3 +205,74 @@ class ReservationSerializerTest(TestCase):
         self.serializer.is_valid(raise_exception=True)
         reservation = self.serializer.save()
         self.assertEqual(reservation.tickets.count(), 1)
+
+
+class ProjectedListSerializerTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(email="testu@u.com", password="pass1234")
+        )
+        drama, comedy = sample_genre("Drama"), sample_genre("Comedy")
+        first, second = sample_actor("Ann", "Lee"), sample_actor("Bo", "Kim")
+        hamlet = sample_play(title="Hamlet", description="Danish prince")
+        hamlet.genres.add(comedy, drama)
+        hamlet.actors.add(second, first)
+        Play.objects.filter(pk=hamlet.pk).update(
+            image="uploads/plays/h.jpg", image_widths=[160, 320, 640]
+        )
+        lear = sample_play(title="King Lear", description="Old king")
+        lear.genres.add(drama)
+        sample_play(title="Empty", description="No cast yet")
+
+        hall = sample_theatre_hall(rows=5, seats_in_row=6)
+        start = datetime.now(timezone.utc) + timedelta(days=1)
+        for hours, play in enumerate([hamlet, lear, hamlet, lear]):
+            performance = sample_performance(
+                play, hall, start + timedelta(hours=hours, microseconds=7)
+            )
+        sample_ticket(
+            performance=performance,
+            reservation=sample_reservation(User.objects.get()),
+        )
+
+    def _assert_same_bytes(self, url):
+        responses = []
+        for projected in (False, True):
+            caches["catalogue"].clear()
+            with override_settings(PROJECTED_LIST_SERIALIZERS=projected):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            responses.append(response.content)
+        self.assertEqual(responses[0], responses[1])
+
+    def test_play_list_matches_list_serializer(self):
+        url = reverse("theatre:play-list")
+        self._assert_same_bytes(url)
+        self._assert_same_bytes(f"{url}?search=king")
+        self._assert_same_bytes(f"{url}?title=ham&limit=1&offset=0")
+
+    def test_performance_list_matches_list_serializer(self):
+        url = reverse("theatre:performance-list")
+        self._assert_same_bytes(url)
+        self._assert_same_bytes(f"{url}?limit=2&offset=1")
+        self._assert_same_bytes(f"{url}?pagination=cursor&page_size=3")
+
+    def test_play_projection_aggregates_in_sql(self):
+        url = reverse("theatre:play-list")
+        caches["catalogue"].clear()
+        with self.assertNumQueries(4):
+            self.client.get(url)
+
+        caches["catalogue"].clear()
+        with override_settings(PROJECTED_LIST_SERIALIZERS=True):
+            with self.assertNumQueries(2):
+                self.client.get(url)
+
+    def test_performance_projection_selects_only_listed_columns(self):
+        with override_settings(PROJECTED_LIST_SERIALIZERS=True):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse("theatre:performance-list"))
+        page_sql = queries.captured_queries[-1]["sql"]
+        self.assertIn('AS "theatre_hall_capacity"', page_sql)
+        self.assertNotIn('"theatre_play"."description"', page_sql)
@@ -0,0 +1,185 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from theatre.booking import claim_seats
+from theatre.metrics import Timings, current_timings
+from theatre.models import (
+    Play,
+    TheatreHall,
+    Performance,
+    Reservation,
+    Ticket,
+)
+from theatre.nplusone import QueryShapes
+from theatre.streams import (
+    SeatEventHub,
+    notify_seats_on_commit,
+    seat_event_hub,
+)
+
+User = get_user_model()
+
+
+class SeatEventHubTest(SimpleTestCase):
+    async def test_publish_reaches_every_subscriber(self):
+        hub = SeatEventHub(listen=False)
+        first, second = hub.subscribe(1), hub.subscribe(1)
+        other = hub.subscribe(2)
+
+        hub.publish({"performance": 1, "event": "seat-claimed", "seats": []})
+        await asyncio.sleep(0)
+
+        self.assertEqual((await first.get())["event"], "seat-claimed")
+        self.assertEqual((await second.get())["event"], "seat-claimed")
+        self.assertTrue(other.empty())
+
+        hub.unsubscribe(1, first)
+        hub.unsubscribe(1, second)
+        hub.unsubscribe(2, other)
+        self.assertEqual(hub.subscriber_count(), 0)
+
+
+class SeatEventBatchTest(TestCase):
+    def test_deleting_reservation_notifies_once(self):
+        performance = Performance.objects.create(
+            play=Play.objects.create(title="Play", description="Play"),
+            theatre_hall=TheatreHall.objects.create(
+                name="Hall", rows=5, seats_in_row=5
+            ),
+            show_time=timezone.now(),
+            tickets_sold=6,
+        )
+        reservation = Reservation.objects.create(
+            user=User.objects.create_user(
+                email="testu@u.com", password="password123"
+            )
+        )
+        Ticket.objects.bulk_create(
+            Ticket(
+                performance=performance,
+                reservation=reservation,
+                row=1,
+                seat=seat,
+            )
+            for seat in range(1, 7)
+        )
+        timings = Timings()
+        timings.shapes = QueryShapes(
+            settings.NPLUSONE_THRESHOLD, strict=True
+        )
+        token = current_timings.set(timings)
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                with self.captureOnCommitCallbacks(execute=True):
+                    reservation.delete()
+        finally:
+            current_timings.reset(token)
+
+        notifications = [
+            query for query in queries if "pg_notify" in query["sql"]
+        ]
+        self.assertEqual(len(notifications), 1)
+        self.assertIn('"event":"seat-released"', notifications[0]["sql"])
+        self.assertEqual(notifications[0]["sql"].count("[1,"), 6)
+        performance.refresh_from_db()
+        self.assertEqual(performance.tickets_sold, 0)
+
+    def test_rolled_back_events_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    notify_seats_on_commit(1, "seat-claimed", [(1, 1)])
+                    raise ValueError
+            except ValueError:
+                pass
+            notify_seats_on_commit(1, "seat-released", [(2, 2)])
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(
+            callbacks[0].__self__.events, [[1, "seat-released", [(2, 2)]]]
+        )
+
+
+class SeatEventStreamTest(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="testu@u.com", password="password123"
+        )
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(title="Play", description="Play"),
+            theatre_hall=TheatreHall.objects.create(
+                name="Hall", rows=5, seats_in_row=5
+            ),
+            show_time=timezone.now(),
+        )
+
+    def tearDown(self):
+        seat_event_hub.stop()
+
+    def _reserve(self, seats):
+        with transaction.atomic():
+            reservation = Reservation.objects.create(user=self.user)
+            claim_seats(
+                reservation,
+                [
+                    {"row": row, "seat": seat, "performance": self.performance}
+                    for row, seat in seats
+                ],
+            )
+        return reservation
+
+    async def _next_event(self, queue):
+        return await asyncio.wait_for(queue.get(), timeout=5)
+
+    async def test_committed_changes_are_streamed(self):
+        queue = seat_event_hub.subscribe(self.performance.id)
+        try:
+            await sync_to_async(seat_event_hub.listening.wait)(5)
+
+            reservation = await sync_to_async(self._reserve)([(1, 1), (1, 2)])
+            event = await self._next_event(queue)
+            self.assertEqual(event["event"], "seat-claimed")
+            self.assertEqual(event["seats"], [[1, 1], [1, 2]])
+
+            await reservation.adelete()
+            event = await self._next_event(queue)
+            self.assertEqual(event["event"], "seat-released")
+            self.assertEqual(sorted(event["seats"]), [[1, 1], [1, 2]])
+        finally:
+            seat_event_hub.unsubscribe(self.performance.id, queue)
+
+    async def test_sse_endpoint(self):
+        url = reverse(
+            "theatre:performance-seat-events", args=[self.performance.id]
+        )
+        token = str(AccessToken.for_user(self.user))
+
+        res = await self.async_client.get(url)
+        self.assertEqual(res.status_code, 401)
+
+        res = await self.async_client.get(
+            url, headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        stream = aiter(res.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+
+        seat_event_hub.publish(
+            {
+                "performance": self.performance.id,
+                "event": "seat-claimed",
+                "seats": [[2, 3]],
+            }
+        )
+        chunk = await asyncio.wait_for(anext(stream), timeout=5)
+        self.assertTrue(chunk.startswith(b"event: seat-claimed\ndata: "))
+        await stream.aclose()
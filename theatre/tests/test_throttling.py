@@ -0,0 +1,189 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from theatre.checks import check_throttle_cache
+from theatre.tests.test_view import (
+    sample_performance,
+    sample_play,
+    sample_theatre_hall,
+    sample_user,
+)
+from theatre.throttling import (
+    CACHE_ALIAS,
+    SlidingWindowThrottle,
+    UserRateThrottle,
+)
+
+MINUTE = 1_000_000 * 60
+
+
+class Clock:
+    def __init__(self, now=MINUTE):
+        self.now = now
+
+    def patch(self):
+        return mock.patch.object(
+            SlidingWindowThrottle, "timer", lambda throttle: self.now
+        )
+
+
+def rates(**rates):
+    return mock.patch.dict(SlidingWindowThrottle.THROTTLE_RATES, rates)
+
+
+class SlidingWindowThrottleTest(SimpleTestCase):
+    def setUp(self):
+        caches[CACHE_ALIAS].clear()
+        self.clock = Clock()
+        self.request = APIRequestFactory().get("/")
+        self.request.user = mock.Mock(is_authenticated=True, pk=7)
+        for patcher in (self.clock.patch(), rates(user="3/min")):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def allowed(self) -> list[bool]:
+        results = []
+        for _ in range(4):
+            results.append(
+                UserRateThrottle().allow_request(self.request, None)
+            )
+        return results
+
+    def test_previous_window_is_weighted(self):
+        self.assertEqual(self.allowed(), [True, True, True, False])
+
+        # Half way through the next minute 3 * 0.5 requests still count.
+        self.clock.now += 90
+        self.assertEqual(self.allowed(), [True, False, False, False])
+
+        self.clock.now += 60
+        self.assertEqual(self.allowed(), [True, True, False, False])
+
+        self.clock.now += 120
+        self.assertEqual(self.allowed(), [True, True, True, False])
+
+    def test_rejected_requests_are_not_counted(self):
+        self.allowed()
+        self.allowed()
+
+        self.assertEqual(
+            caches[CACHE_ALIAS].get(f"throttle_user_7:{MINUTE // 60}"), 3
+        )
+
+    def test_wait(self):
+        self.allowed()
+        self.clock.now += 90
+        throttle = UserRateThrottle()
+        throttle.allow_request(self.request, None)
+        self.assertFalse(throttle.allow_request(self.request, None))
+
+        # 3 * weight + 1 + 1 <= 3 needs the weight down to 1/3.
+        self.assertAlmostEqual(throttle.wait(), 10)
+
+    def test_retry_after_wait_is_allowed(self):
+        self.assertEqual(self.allowed(), [True, True, True, False])
+        throttle = UserRateThrottle()
+        self.assertFalse(throttle.allow_request(self.request, None))
+
+        # The 3 requests count 3 * 2/3 + 1 <= 3 only 20s into the next
+        # minute.
+        self.assertAlmostEqual(throttle.wait(), 80)
+        self.clock.now += throttle.wait()
+        self.assertTrue(throttle.allow_request(self.request, None))
+        self.assertFalse(throttle.allow_request(self.request, None))
+
+    def test_concurrent_requests_share_one_budget(self):
+        allowed = []
+        start = threading.Barrier(12)
+
+        def request():
+            start.wait()
+            throttle = UserRateThrottle()
+            allowed.append(throttle.allow_request(self.request, None))
+
+        threads = [threading.Thread(target=request) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(allowed.count(True), 3)
+
+
+class ThrottleCacheCheckTest(SimpleTestCase):
+    def caches(self, backend):
+        return {**settings.CACHES, CACHE_ALIAS: {"BACKEND": backend}}
+
+    def test_process_local_cache_warns_outside_debug(self):
+        locmem = "django.core.cache.backends.locmem.LocMemCache"
+        with override_settings(DEBUG=False, CACHES=self.caches(locmem)):
+            self.assertEqual(
+                [warning.id for warning in check_throttle_cache(None)],
+                ["theatre.W001"],
+            )
+        with override_settings(DEBUG=True, CACHES=self.caches(locmem)):
+            self.assertEqual(check_throttle_cache(None), [])
+
+    def test_shared_cache_passes(self):
+        redis = "django.core.cache.backends.redis.RedisCache"
+        with override_settings(DEBUG=False, CACHES=self.caches(redis)):
+            self.assertEqual(check_throttle_cache(None), [])
+
+
+class ReservationThrottleTest(TestCase):
+    def setUp(self):
+        caches[CACHE_ALIAS].clear()
+        clock = Clock()
+        throttled = rates(user="1/min", reservation="2/min")
+        for patcher in (clock.patch(), throttled):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance(
+            sample_play(),
+            sample_theatre_hall(),
+            timezone.now() + timedelta(days=1),
+        )
+
+    def reserve(self, seat):
+        return self.client.post(
+            reverse("theatre:reservation-list"),
+            {
+                "user": self.user.id,
+                "tickets": [
+                    {
+                        "row": 1,
+                        "seat": seat,
+                        "performance": self.performance.id,
+                    }
+                ],
+            },
+            format="json",
+        )
+
+    def test_reservations_have_their_own_scope(self):
+        url = reverse("theatre:reservation-list")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.client.get(url).status_code,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+
+        self.assertEqual(self.reserve(1).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.reserve(2).status_code, status.HTTP_201_CREATED)
+        response = self.reserve(3)
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertIn("Retry-After", response)
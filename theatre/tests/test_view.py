@@ -1,18 +1,26 @@
-from datetime import datetime
+import tempfile
+from datetime import UTC, datetime, timedelta
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from theatre.checks import check_catalogue_cache
 from theatre.models import (
     Genre,
     Actor,
     Play,
     TheatreHall,
     Performance,
-    Reservation
+    Reservation,
+    Ticket
 )
 from theatre.serializers import (
     GenreSerializer,
@@ -90,6 +98,102 @@ class GenreViewSetTest(TestCase):
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
 
+class CatalogueCacheTest(TestCase):
+    def setUp(self):
+        caches["catalogue"].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(sample_admin_user())
+
+    def test_list_is_served_from_cache_until_write(self):
+        url = reverse("theatre:genre-list")
+        sample_genre(name="Comedy")
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(url)
+        self.assertEqual(res.data["count"], 1)
+
+        self.client.post(url, {"name": "Tragedy"})
+        res = self.client.get(url)
+        self.assertEqual(res.data["count"], 2)
+
+    def test_conditional_get(self):
+        url = reverse("theatre:theatre_hall-list")
+        sample_theatre_hall()
+        res = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(
+                url, HTTP_IF_NONE_MATCH=res["ETag"]
+            )
+        self.assertEqual(
+            not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+        self.assertNotIn("Last-Modified", res)
+
+        sample_theatre_hall(name="Small Hall")
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 2)
+
+    def test_process_local_cache_warns_outside_debug(self):
+        for backend, warnings in (
+            ("django.core.cache.backends.locmem.LocMemCache",
+             ["theatre.W002"]),
+            ("django.core.cache.backends.redis.RedisCache", []),
+        ):
+            with self.subTest(backend), override_settings(
+                    DEBUG=False,
+                    CACHES={**settings.CACHES, "catalogue": {
+                        "BACKEND": backend
+                    }},
+            ):
+                self.assertEqual(
+                    [warning.id for warning in check_catalogue_cache(None)],
+                    warnings,
+                )
+
+    def test_file_based_cache(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(
+                CACHES={
+                    **settings.CACHES,
+                    "catalogue": {
+                        "BACKEND": "django.core.cache.backends.filebased."
+                                   "FileBasedCache",
+                        "LOCATION": location,
+                    },
+                }
+        ):
+            url = reverse("theatre:genre-list")
+            sample_genre(name="Comedy")
+            first = self.client.get(url)
+
+            with self.assertNumQueries(0):
+                res = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+            self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+            with self.assertNumQueries(0):
+                res = self.client.get(url)
+            self.assertEqual(res.data, first.data)
+
+            self.client.post(url, {"name": "Tragedy"})
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res.data["count"], 2)
+
+    def test_play_cache_follows_related_changes(self):
+        play = sample_play(title="Play 1", description="Description")
+        url = reverse("theatre:play-detail", args=[play.id])
+        self.client.get(url)
+
+        play.genres.add(sample_genre())
+        res = self.client.get(url)
+        self.assertEqual(res.data["genres"][0]["name"], "Drama")
+
+        Genre.objects.filter(name="Drama").first().delete()
+        res = self.client.get(url)
+        self.assertEqual(res.data["genres"], [])
+
+
 class ActorViewSetTest(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -141,6 +245,49 @@ class PlayViewSetTest(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_filter_plays_by_genres_and_actors(self):
+        drama = sample_genre(name="Drama")
+        comedy = sample_genre(name="Comedy")
+        actor = sample_actor()
+        both = sample_play(title="Both")
+        both.genres.add(drama, comedy)
+        both.actors.add(actor)
+        sample_play(title="Drama only").genres.add(drama)
+        sample_play(title="Comedy only").genres.add(comedy)
+        sample_play(title="None")
+        url = reverse("theatre:play-list")
+
+        def titles(**params):
+            res = self.client.get(url, params)
+            return [play["title"] for play in res.data["results"]]
+
+        ids = f"{drama.id},{comedy.id}"
+        self.assertEqual(
+            titles(genre=ids), ["Both", "Comedy only", "Drama only"]
+        )
+        self.assertEqual(titles(genre=ids, genre_match="all"), ["Both"])
+        self.assertEqual(
+            titles(genre=ids, actor=str(actor.id)), ["Both"]
+        )
+        self.assertEqual(
+            self.client.get(url, {"genre": "1,a"}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_search_plays(self):
+        sample_play(title="Hamlet", description="Prince of Denmark")
+        sample_play(title="Macbeth", description="A Scottish king")
+        sample_play(title="The Seagull", description="Hamlet is quoted")
+        url = reverse("theatre:play-list")
+
+        def titles(search):
+            res = self.client.get(url, {"search": search})
+            return [play["title"] for play in res.data["results"]]
+
+        self.assertEqual(titles("hamlet"), ["Hamlet", "The Seagull"])
+        self.assertEqual(titles("scottish"), ["Macbeth"])
+        self.assertEqual(titles("Macbth"), ["Macbeth"])
+
     def test_create_play_as_non_admin(self):
         payload = {"title": "New Play", "description": "New Description"}
         res = self.client.post(reverse("theatre:play-list"), payload)
@@ -195,3 +342,322 @@ class PerformanceViewSetTest(TestCase):
 
         res = self.client.post(reverse("theatre:performance-list"), payload)
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_list_performances_with_cursor_pagination(self):
+        play = sample_play(title="Play 1")
+        other_play = sample_play(title="Play 2")
+        theatre_hall = sample_theatre_hall()
+        show_time = datetime(2024, 10, 20, 18)
+        performances = [
+            sample_performance(play, theatre_hall, show_time + timedelta(
+                days=day // 2
+            ))
+            for day in range(7)
+        ]
+        sample_performance(other_play, theatre_hall, show_time)
+
+        pages = []
+        url = reverse("theatre:performance-list")
+        params = {
+            "pagination": "cursor",
+            "play": play.id,
+            "page_size": 3,
+            "upcoming": "false",
+        }
+        while url:
+            res = self.client.get(url, params)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", res.data)
+            pages.append(res.data)
+            url, params = res.data["next"], None
+
+        self.assertEqual(
+            [p["id"] for page in pages for p in page["results"]],
+            [p.id for p in performances]
+        )
+        self.assertIsNone(pages[0]["previous"])
+
+        res = self.client.get(pages[-1]["previous"])
+        self.assertEqual(res.data["results"], pages[-2]["results"])
+
+    def test_list_performances_by_show_time(self):
+        play = sample_play(title="Play 1")
+        theatre_hall = sample_theatre_hall()
+        now = timezone.now()
+        past = sample_performance(play, theatre_hall, now - timedelta(days=1))
+        soon = sample_performance(play, theatre_hall, now + timedelta(hours=1))
+        later = sample_performance(play, theatre_hall, now + timedelta(days=3))
+        # 23:30 UTC on 19 October is already 20 October in Kyiv.
+        late_night = sample_performance(
+            play, theatre_hall, datetime(2024, 10, 19, 23, 30, tzinfo=UTC)
+        )
+        url = reverse("theatre:performance-list")
+
+        def ids(**params):
+            res = self.client.get(url, params)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            return [p["id"] for p in res.data["results"]]
+
+        self.assertEqual(ids(), [soon.id, later.id])
+        self.assertEqual(
+            ids(upcoming="false"), [late_night.id, past.id, soon.id, later.id]
+        )
+        self.assertEqual(
+            ids(
+                show_time_after=(now - timedelta(days=2)).isoformat(),
+                show_time_before=(now + timedelta(days=2)).isoformat(),
+            ),
+            [past.id, soon.id]
+        )
+        self.assertEqual(ids(date="2024-10-20"), [late_night.id])
+        self.assertEqual(ids(date="2024-10-19"), [])
+        self.assertEqual(
+            self.client.get(url, {"date": "20.10.2024"}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_list_performances_uses_show_time_indexes(self):
+        theatre_hall = sample_theatre_hall()
+        play = sample_play(title="Play 1")
+        sample_performance(
+            play, theatre_hall, datetime(2024, 10, 20, 18, tzinfo=UTC)
+        )
+        # Mostly performances of another play and hall on the same day,
+        # with fresh statistics: with a handful of rows the planner may
+        # as well scan any index and filter or sort.
+        other_play = sample_play(title="Play 2")
+        other_hall = sample_theatre_hall(name="Small Hall")
+        Performance.objects.bulk_create(
+            Performance(
+                play=play if i % 20 == 0 else other_play,
+                theatre_hall=theatre_hall if i % 20 == 0 else other_hall,
+                show_time=datetime(2024, 10, 19, 22, tzinfo=UTC)
+                + timedelta(minutes=2 * i),
+            )
+            for i in range(600)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE theatre_performance")
+        url = reverse("theatre:performance-list")
+
+        for params, index in [
+            ({"upcoming": "false"}, "performance_time_idx"),
+            (
+                {"play": play.id, "upcoming": "false"},
+                "performance_play_time_idx",
+            ),
+            (
+                {"theatre_hall": theatre_hall.id, "date": "2024-10-20"},
+                "performance_hall_time_idx",
+            ),
+        ]:
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url, params)
+            sql = next(
+                query["sql"] for query in queries
+                if 'FROM "theatre_performance"' in query["sql"]
+                and "LIMIT" in query["sql"]
+            )
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute(f"EXPLAIN {sql}")
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            self.assertIn(index, plan)
+
+    def test_list_performances_with_invalid_cursor(self):
+        res = self.client.get(
+            reverse("theatre:performance-list"),
+            {"pagination": "cursor", "cursor": "bogus"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_performance_is_coalesced(self):
+        performance = sample_performance(
+            play=sample_play(title="Play 1"),
+            theatre_hall=sample_theatre_hall(),
+            show_time=datetime(2024, 10, 20, 18, tzinfo=UTC)
+        )
+        url = reverse("theatre:performance-detail", args=[performance.id])
+        res = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            cached_res = self.client.get(url)
+        stats = self.client.get(
+            reverse("theatre:performance-coalescing-stats")
+        )
+
+        self.assertEqual(cached_res.data, res.data)
+        self.assertGreaterEqual(stats.data["fresh_hits"], 1)
+
+    def test_retrieve_performance_after_hall_shrank(self):
+        hall = sample_theatre_hall(rows=3, seats_in_row=4)
+        performance = sample_performance(
+            sample_play(title="Play 1"), hall, timezone.now()
+        )
+        reservation = sample_reservation(self.user)
+        for row, seat in [(1, 1), (3, 2), (1, 4)]:
+            Ticket.objects.create(
+                row=row,
+                seat=seat,
+                performance=performance,
+                reservation=reservation
+            )
+        TheatreHall.objects.filter(pk=hall.pk).update(rows=2, seats_in_row=3)
+        url = reverse("theatre:performance-detail", args=[performance.id])
+
+        res = self.client.get(url, {"seat_map": "bitmap"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["taken_places"], [{"row": 1, "seat": 1}])
+
+    def test_retrieve_performance_taken_places(self):
+        performance = sample_performance(
+            play=sample_play(title="Play 1"),
+            theatre_hall=sample_theatre_hall(rows=2, seats_in_row=4),
+            show_time=datetime.now()
+        )
+        reservation = sample_reservation(self.user)
+        for row, seat in [(2, 1), (1, 3)]:
+            Ticket.objects.create(
+                row=row,
+                seat=seat,
+                performance=performance,
+                reservation=reservation
+            )
+        url = reverse("theatre:performance-detail", args=[performance.id])
+
+        res = self.client.get(url)
+        bitmap_res = self.client.get(url, {"seat_map": "bitmap"})
+
+        self.assertEqual(
+            res.data["taken_places"],
+            [{"row": 1, "seat": 3}, {"row": 2, "seat": 1}]
+        )
+        self.assertNotIn("seat_map", res.data)
+        self.assertEqual(
+            bitmap_res.data["seat_map"],
+            {
+                "rows": 2,
+                "seats_in_row": 4,
+                "encoding": "base64",
+                "bitmap": "KA==",
+            }
+        )
+
+
+class ReservationViewSetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("theatre:reservation-list")
+        play = sample_play(title="Play 1")
+        tomorrow = timezone.now() + timedelta(days=1)
+        self.performance = sample_performance(
+            play=play,
+            theatre_hall=sample_theatre_hall(),
+            show_time=tomorrow
+        )
+        self.other_performance = sample_performance(
+            play=play,
+            theatre_hall=sample_theatre_hall(name="Small Hall"),
+            show_time=tomorrow
+        )
+
+    def _reserve(self, seats):
+        payload = {
+            "user": self.user.id,
+            "tickets": [
+                {"row": row, "seat": seat, "performance": performance.id}
+                for performance, row, seat in seats
+            ],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(self.url, payload, format="json")
+        return res, len(queries)
+
+    def test_create_reservation(self):
+        res, _ = self._reserve([(self.performance, 1, 1)])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(t["row"], t["seat"]) for t in res.data["tickets"]],
+            [(1, 1)]
+        )
+
+    def test_create_reservation_query_count_is_constant(self):
+        _, single_ticket_queries = self._reserve([(self.performance, 1, 1)])
+        res, many_tickets_queries = self._reserve(
+            [(self.performance, 2, seat) for seat in range(1, 11)]
+            + [(self.other_performance, 1, seat) for seat in range(1, 6)]
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["tickets"]), 15)
+        self.assertEqual(single_ticket_queries, many_tickets_queries)
+        self.assertEqual(Ticket.objects.count(), 16)
+        self.performance.refresh_from_db()
+        self.other_performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 11)
+        self.assertEqual(self.other_performance.tickets_sold, 5)
+
+    def test_performance_tickets_available(self):
+        self._reserve([(self.performance, 1, seat) for seat in (1, 2, 3)])
+        Reservation.objects.filter(user=self.user).delete()
+        self._reserve([(self.performance, 1, 1)])
+
+        res = self.client.get(reverse("theatre:performance-list"))
+        detail_res = self.client.get(
+            reverse("theatre:performance-detail", args=[self.performance.id])
+        )
+
+        available = {
+            performance["id"]: performance["tickets_available"]
+            for performance in res.data["results"]
+        }
+        self.assertEqual(available[self.performance.id], 99)
+        self.assertEqual(available[self.other_performance.id], 100)
+        self.assertEqual(detail_res.data["tickets_available"], 99)
+
+    def test_create_reservation_with_seat_out_of_range(self):
+        res, _ = self._reserve([(self.performance, 11, 1)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_create_reservation_with_taken_seat(self):
+        self._reserve([(self.performance, 1, 1)])
+        res, _ = self._reserve(
+            [(self.performance, 1, 2), (self.performance, 1, 1)]
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["seats"],
+            [{"performance": self.performance.id, "row": 1, "seat": 1}]
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_create_reservation_with_repeated_seat(self):
+        res, _ = self._reserve(
+            [(self.performance, 1, 1), (self.performance, 1, 1)]
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("tickets", res.data)
+
+    def test_list_reservations_with_cursor_pagination(self):
+        for seat in range(1, 6):
+            self._reserve([(self.performance, 1, seat)])
+
+        res = self.client.get(self.url, {"pagination": "cursor"})
+        next_res = self.client.get(res.data["next"])
+
+        seats = [
+            reservation["tickets"][0]["seat"]
+            for page in (res, next_res)
+            for reservation in page.data["results"]
+        ]
+        self.assertEqual(seats, [5, 4, 3, 2])
@@ -0,0 +1,105 @@
+"""
+Sliding-window-counter throttles on a shared cache.
+
+DRF's throttles keep a list with the timestamp of every request in the
+window, read and rewritten whole on each request, per process. These
+keep two integers per client instead: the number of requests in the
+current fixed window and in the previous one. A request is allowed
+while::
+
+    previous * (1 - elapsed fraction of the current window) + current
+
+stays within the rate, which approximates a true sliding window without
+remembering individual requests.
+
+Counters live in the ``throttle`` cache and are only changed through
+``incr``, which is atomic on Redis and Memcached, so every process and
+node pointed at the same cache shares one budget per client. A request
+costs one ``get_many`` and, when allowed, one ``incr``; rejected
+requests write nothing. Two processes racing for the last slot may both
+pass the read, but only one keeps its increment.
+
+Browsing is limited by the ``anon`` and ``user`` scopes. Creating a
+reservation has its own ``reservation`` scope, so browsing cannot use up
+the budget for booking or the other way round.
+"""
+import math
+
+from django.core.cache import caches
+from rest_framework import throttling
+
+CACHE_ALIAS = "throttle"
+
+
+class SlidingWindowThrottle(throttling.SimpleRateThrottle):
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, elapsed = divmod(self.now, self.duration)
+        window = int(window)
+        self.weight = 1 - elapsed / self.duration
+        current_key = f"{self.key}:{window}"
+        previous_key = f"{self.key}:{window - 1}"
+
+        cache = caches[CACHE_ALIAS]
+        counts = cache.get_many([current_key, previous_key])
+        self.previous = counts.get(previous_key, 0)
+        self.current = counts.get(current_key, 0)
+        if self._estimate(self.current + 1) > self.num_requests:
+            return False
+
+        current = self._increment(cache, current_key)
+        if self._estimate(current) > self.num_requests:
+            try:
+                cache.decr(current_key)
+            except ValueError:
+                pass
+            self.current = current - 1
+            return False
+        self.current = current
+        return True
+
+    def _estimate(self, current: int) -> float:
+        return self.previous * self.weight + current
+
+    def _increment(self, cache, key: str) -> int:
+        # The counter of the current window is still needed as the
+        # previous one during the next window.
+        timeout = math.ceil(self.duration * 2)
+        while True:
+            try:
+                return cache.incr(key)
+            except ValueError:
+                if cache.add(key, 1, timeout):
+                    return 1
+
+    def wait(self):
+        """Seconds until the estimate drops below the rate again."""
+        remaining = self.duration * self.weight
+        if self.current < self.num_requests and self.previous:
+            # The previous window's weight has to fall far enough.
+            needed = (self.num_requests - self.current - 1) / self.previous
+            return max(remaining - self.duration * needed, 0)
+        if self.current >= self.num_requests:
+            # The current count becomes the previous one and has to lose
+            # weight during the next window as well.
+            needed = (self.num_requests - 1) / self.current
+            return remaining + self.duration * (1 - needed)
+        return remaining
+
+
+class AnonRateThrottle(SlidingWindowThrottle, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(SlidingWindowThrottle, throttling.UserRateThrottle):
+    pass
+
+
+class ReservationRateThrottle(UserRateThrottle):
+    scope = "reservation"
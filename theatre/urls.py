@@ -8,6 +8,8 @@ from theatre.views import (
     TheatreHallViewSet,
     PerformanceViewSet,
     ReservationViewSet,
+    ExportViewSet,
+    performance_seat_events,
 )
 
 router = routers.DefaultRouter()
@@ -17,8 +19,16 @@ router.register("plays", PlayViewSet, basename="play")
 router.register("theatre_halls", TheatreHallViewSet, basename="theatre_hall")
 router.register("performances", PerformanceViewSet, basename="performance")
 router.register("reservations", ReservationViewSet, basename="reservation")
+router.register("exports", ExportViewSet, basename="export")
 
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path(
+        "performances/<int:pk>/seat-events/",
+        performance_seat_events,
+        name="performance-seat-events",
+    ),
+    path("", include(router.urls)),
+]
 
 app_name = "theatre"
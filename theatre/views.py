@@ -1,35 +1,276 @@
-from django.db.models import QuerySet, Count, F
+import asyncio
+import json
+from datetime import date, datetime, time, timedelta
+from functools import wraps
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection
+from django.db.models import Exists, F, Model, OuterRef, Prefetch, QuerySet
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from theatre.cache import cache_response
+from theatre.coalesce import SingleFlight
+from theatre.exports import (
+    RESERVATION_COLUMNS,
+    TICKET_COLUMNS,
+    astream_rows,
+    reservation_rows,
+    stream_rows,
+    ticket_rows,
+)
+from theatre.images import schedule_variants
 from theatre.models import (
     Genre,
     Actor,
     Play,
     TheatreHall,
     Performance,
-    Reservation
+    Reservation,
+    Ticket,
+)
+from theatre.pagination import (
+    ReservationPagination,
+    PerformanceCursorPagination,
+    ReservationCursorPagination,
 )
-from theatre.pagination import ReservationPagination
+from theatre.renderers import CSVRenderer, NDJSONRenderer
+from theatre.search import search_plays
+from theatre.seatmap import SeatMap
+from theatre.streams import seat_event_hub
 from theatre.serializers import (
     GenreSerializer,
     ActorSerializer,
     PlaySerializer,
     PlayListSerializer,
+    PlayListProjectionSerializer,
     PlayDetailSerializer,
     TheatreHallSerializer,
     PerformanceSerializer,
     PerformanceListSerializer,
+    PerformanceListProjectionSerializer,
     PerformanceDetailSerializer,
     ReservationListSerializer,
     ReservationSerializer,
     PlayImageSerializer
 )
+from theatre.throttling import ReservationRateThrottle
+from user.authentication import CachedJWTAuthentication
+
+
+performance_detail_flight = SingleFlight(
+    ttl=settings.PERFORMANCE_DETAIL_FRESHNESS
+)
+
+
+class CursorPaginationMixin:
+    """Switch the list to keyset pagination with ?pagination=cursor."""
+
+    cursor_pagination_class = None
+
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, "_paginator")
+            and self.request is not None
+            and self.request.query_params.get("pagination") == "cursor"
+        ):
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+
+def day_bounds(value: str, param: str) -> tuple[datetime, datetime]:
+    """Return the start of ``value`` and of the next day, local time."""
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({param: "Expected a YYYY-MM-DD date."})
+    return (
+        timezone.make_aware(datetime.combine(day, time.min)),
+        timezone.make_aware(
+            datetime.combine(day + timedelta(days=1), time.min)
+        ),
+    )
+
+
+class AsyncReadMixin:
+    """
+    Serve the read actions of a viewset with the async ORM.
+
+    With ``settings.ASYNC_READ_VIEWS`` on, ``as_view`` returns a coroutine
+    view: ``async_actions`` run through their ``a``-prefixed handlers on the
+    event loop, any other method goes to the regular sync viewset in a
+    thread. Authentication, permissions and throttling still run through
+    ``initial`` so both paths enforce the same rules.
+    """
+
+    async_actions = ("list", "retrieve")
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        if settings.ASYNC_READ_VIEWS:
+            return cls.as_async_view(actions, **initkwargs)
+        return super().as_view(actions, **initkwargs)
+
+    @classmethod
+    def as_async_view(cls, actions, **initkwargs):
+        sync_view = super().as_view(actions, **initkwargs)
+        if not any(name in cls.async_actions for name in actions.values()):
+            return sync_view
+
+        actions = dict(actions)
+        if "get" in actions and "head" not in actions:
+            actions["head"] = actions["get"]
+        run_sync_view = sync_to_async(sync_view)
+
+        @wraps(sync_view)
+        async def view(request, *args, **kwargs):
+            if actions.get(request.method.lower()) not in cls.async_actions:
+                return await run_sync_view(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, name in actions.items():
+                setattr(self, method, getattr(self, name))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        return markcoroutinefunction(view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, f"a{self.action}")
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    def _read_queryset(self) -> QuerySet:
+        # get_queryset may validate params or run a query of its own
+        # (search), so it is built in the request's sync thread.
+        return self.filter_queryset(self.get_queryset())
+
+    async def apaginate_queryset(self, queryset: QuerySet):
+        paginator = self.paginator
+        if paginator is None:
+            return None
+        if hasattr(paginator, "apaginate_queryset"):
+            return await paginator.apaginate_queryset(
+                queryset, self.request, view=self
+            )
+        return await sync_to_async(paginator.paginate_queryset)(
+            queryset, self.request, view=self
+        )
+
+    async def aget_object(self):
+        queryset = await sync_to_async(self._read_queryset)()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (
+                queryset.model.DoesNotExist,
+                TypeError,
+                ValueError,
+                DjangoValidationError,
+        ):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def aprefetch(self, objects: list) -> None:
+        """Load whatever the serializer would otherwise query lazily."""
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await sync_to_async(self._read_queryset)()
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            await self.aprefetch(page)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        objects = [obj async for obj in queryset]
+        await self.aprefetch(objects)
+        serializer = self.get_serializer(objects, many=True)
+        return Response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        await self.aprefetch([instance])
+        return Response(self.get_serializer(instance).data)
+
+
+class ProjectedListMixin:
+    """
+    Serialize the list from ``values()`` rows when the setting is on.
+
+    ``list_projection_class`` narrows the filtered queryset with its
+    ``project()`` and renders the rows, producing the same output as the
+    list serializer it stands in for.
+    """
+
+    list_projection_class = None
+
+    def _projected(self) -> bool:
+        return (
+            self.action == "list"
+            and self.list_projection_class is not None
+            and settings.PROJECTED_LIST_SERIALIZERS
+        )
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self._projected():
+            queryset = self.list_projection_class.project(queryset)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        # get_serializer_class is left alone so the schema still documents
+        # the list serializer the projection reproduces.
+        if self._projected():
+            kwargs.setdefault("context", self.get_serializer_context())
+            return self.list_projection_class(*args, **kwargs)
+        return super().get_serializer(*args, **kwargs)
+
+
+PAGINATION_PARAMETERS = [
+    OpenApiParameter(
+        "pagination",
+        type=OpenApiTypes.STR,
+        enum=["cursor"],
+        description="Use cursor pagination without a total count "
+                    "(ex. ?pagination=cursor)",
+    ),
+    OpenApiParameter(
+        "cursor",
+        type=OpenApiTypes.STR,
+        description="Opaque cursor from the next/previous link",
+    ),
+]
 
 
 class GenreViewSet(
@@ -40,6 +281,10 @@ class GenreViewSet(
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
 
+    @cache_response(Genre)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 
 class ActorViewSet(
     mixins.CreateModelMixin,
@@ -49,32 +294,83 @@ class ActorViewSet(
     queryset = Actor.objects.all()
     serializer_class = ActorSerializer
 
+    @cache_response(Actor)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 
 class PlayViewSet(
+    AsyncReadMixin,
+    ProjectedListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     viewsets.GenericViewSet,
 ):
-    queryset = Play.objects.prefetch_related("genres", "actors")
+    queryset = Play.objects.prefetch_related(
+        Prefetch("genres", queryset=Genre.objects.order_by("id")),
+        Prefetch("actors", queryset=Actor.objects.order_by("id")),
+    )
     serializer_class = PlaySerializer
+    list_projection_class = PlayListProjectionSerializer
 
     @staticmethod
     def _params_to_ints(qs):
         return [int(str_id) for str_id in qs.split(",")]
 
+    def _filter_by_related(
+            self,
+            queryset: QuerySet,
+            param: str,
+            through: type[Model],
+            related_field: str,
+    ) -> QuerySet:
+        """
+        Keep plays linked to any (default) or all of the ids in ``param``.
+
+        Each condition is an EXISTS against the through table, which avoids
+        both the duplicate rows and the DISTINCT that a join would need.
+        """
+        try:
+            ids = set(self._params_to_ints(self.request.query_params[param]))
+        except ValueError:
+            raise ValidationError(
+                {param: "Expected a comma separated list of ids."}
+            )
+        links = through.objects.filter(play_id=OuterRef("pk"))
+
+        match = self.request.query_params.get(f"{param}_match", "any")
+        if match == "all":
+            for related_id in ids:
+                queryset = queryset.filter(
+                    Exists(links.filter(**{related_field: related_id}))
+                )
+            return queryset
+        if match == "any":
+            return queryset.filter(
+                Exists(links.filter(**{f"{related_field}__in": ids}))
+            )
+        raise ValidationError({f"{param}_match": "Expected 'any' or 'all'."})
+
     def get_queryset(self):
         queryset = super().get_queryset()
         if self.action == "list":
+            search = self.request.query_params.get("search")
             title = self.request.query_params.get("title")
-            genre_id = self.request.query_params.get("genre")
-            actor_id = self.request.query_params.get("actor")
+            genre_ids = self.request.query_params.get("genre")
+            actor_ids = self.request.query_params.get("actor")
             if title:
                 queryset = queryset.filter(title__icontains=title)
-            if genre_id:
-                queryset = queryset.filter(genres__id=genre_id)
-            if actor_id:
-                queryset = queryset.filter(actors__id=actor_id)
+            if genre_ids:
+                queryset = self._filter_by_related(
+                    queryset, "genre", Play.genres.through, "genre_id"
+                )
+            if actor_ids:
+                queryset = self._filter_by_related(
+                    queryset, "actor", Play.actors.through, "actor_id"
+                )
+            if search:
+                queryset = search_plays(queryset, search)
 
         return queryset
 
@@ -98,13 +394,19 @@ class PlayViewSet(
         serializer = self.get_serializer(movie, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            schedule_variants(serializer.save(image_widths=[]))
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @extend_schema(
         parameters=[
+            OpenApiParameter(
+                "search",
+                type=OpenApiTypes.STR,
+                description="Search plays by title and description, "
+                            "ordered by relevance (ex. ?search=hamlet)",
+            ),
             OpenApiParameter(
                 "title",
                 type=OpenApiTypes.STR,
@@ -115,16 +417,43 @@ class PlayViewSet(
                 type={"type": "list", "items": {"type": "number"}},
                 description="Filter by genre id (ex. ?genre=2,5)",
             ),
+            OpenApiParameter(
+                "genre_match",
+                type=OpenApiTypes.STR,
+                enum=["any", "all"],
+                description="Match plays with any (default) or all of "
+                            "the genres (ex. ?genre_match=all)",
+            ),
             OpenApiParameter(
                 "actor",
                 type={"type": "list", "items": {"type": "number"}},
                 description="Filter by actor id (ex. ?actor=2,5)",
             ),
+            OpenApiParameter(
+                "actor_match",
+                type=OpenApiTypes.STR,
+                enum=["any", "all"],
+                description="Match plays with any (default) or all of "
+                            "the actors (ex. ?actor_match=all)",
+            ),
         ]
     )
+    @cache_response(Play, Genre, Actor)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @cache_response(Play, Genre, Actor)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @cache_response(Play, Genre, Actor)
+    async def alist(self, request, *args, **kwargs):
+        return await super().alist(request, *args, **kwargs)
+
+    @cache_response(Play, Genre, Actor)
+    async def aretrieve(self, request, *args, **kwargs):
+        return await super().aretrieve(request, *args, **kwargs)
+
 
 class TheatreHallViewSet(
     mixins.CreateModelMixin,
@@ -134,8 +463,15 @@ class TheatreHallViewSet(
     queryset = TheatreHall.objects.all()
     serializer_class = TheatreHallSerializer
 
+    @cache_response(TheatreHall)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 
 class PerformanceViewSet(
+    AsyncReadMixin,
+    ProjectedListMixin,
+    CursorPaginationMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -147,16 +483,53 @@ class PerformanceViewSet(
         .annotate(
             tickets_available=(
                     F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
-                    - Count("tickets")
+                    - F("tickets_sold")
             )
         )
+        .order_by("show_time", "id")
     )
     serializer_class = PerformanceSerializer
+    list_projection_class = PerformanceListProjectionSerializer
+    cursor_pagination_class = PerformanceCursorPagination
+    time_filters = ("show_time", "show_time_after", "show_time_before", "date")
+
+    def _datetime_param(self, name: str) -> datetime | None:
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: "Expected an ISO 8601 datetime."})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def _day_bounds(self, value: str) -> tuple[datetime, datetime]:
+        return day_bounds(value, "date")
+
+    def _upcoming(self) -> bool:
+        value = self.request.query_params.get("upcoming")
+        if value is None:
+            return self.action == "list" and not any(
+                self.request.query_params.get(name)
+                for name in self.time_filters
+            )
+        if value.lower() in ("1", "true"):
+            return True
+        if value.lower() in ("0", "false"):
+            return False
+        raise ValidationError({"upcoming": "Expected true or false."})
 
     def get_queryset(self):
         play_id = self.request.query_params.get("play")
         theatre_hall_id = self.request.query_params.get("theatre_hall")
         show_time = self.request.query_params.get("show_time")
+        show_time_after = self._datetime_param("show_time_after")
+        show_time_before = self._datetime_param("show_time_before")
+        day = self.request.query_params.get("date")
 
         queryset = self.queryset
 
@@ -169,6 +542,26 @@ class PerformanceViewSet(
         if show_time:
             queryset = queryset.filter(show_time=show_time)
 
+        if show_time_after:
+            queryset = queryset.filter(show_time__gte=show_time_after)
+
+        if show_time_before:
+            queryset = queryset.filter(show_time__lt=show_time_before)
+
+        if day:
+            day_start, next_day_start = self._day_bounds(day)
+            queryset = queryset.filter(
+                show_time__gte=day_start, show_time__lt=next_day_start
+            )
+
+        if self._upcoming():
+            queryset = queryset.filter(show_time__gte=timezone.now())
+
+        if self.action == "retrieve":
+            queryset = queryset.prefetch_related(
+                "play__genres", "play__actors"
+            )
+
         return queryset
 
     def get_serializer_class(self):
@@ -196,13 +589,94 @@ class PerformanceViewSet(
                 description="Filter by show time "
                             "(ex. ?show_time=2024-10-20T18:00:00)",
             ),
+            OpenApiParameter(
+                "show_time_after",
+                type=OpenApiTypes.DATETIME,
+                description="Shows starting at or after the given time "
+                            "(ex. ?show_time_after=2024-10-20T18:00:00)",
+            ),
+            OpenApiParameter(
+                "show_time_before",
+                type=OpenApiTypes.DATETIME,
+                description="Shows starting before the given time "
+                            "(ex. ?show_time_before=2024-10-21T00:00:00)",
+            ),
+            OpenApiParameter(
+                "date",
+                type=OpenApiTypes.DATE,
+                description="Shows on the given day in the service time "
+                            "zone (ex. ?date=2024-10-20)",
+            ),
+            OpenApiParameter(
+                "upcoming",
+                type=OpenApiTypes.BOOL,
+                description="Only shows that have not started yet. Defaults "
+                            "to true unless a show time filter is given "
+                            "(ex. ?upcoming=false)",
+            ),
+            *PAGINATION_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "seat_map",
+                type=OpenApiTypes.STR,
+                enum=["bitmap"],
+                description="Also return taken seats as a base64 bitset "
+                            "(ex. ?seat_map=bitmap)",
+            ),
+        ]
+    )
+    def retrieve(self, request, *args, **kwargs):
+        compute = super().retrieve
+        data = performance_detail_flight.do(
+            request.get_full_path(),
+            lambda: compute(request, *args, **kwargs).data,
+        )
+        return Response(data)
+
+    async def aprefetch(self, objects: list) -> None:
+        if self.action != "retrieve":
+            return
+        for performance in objects:
+            hall = performance.theatre_hall
+            performance.seat_map = SeatMap(
+                hall.rows,
+                hall.seats_in_row,
+                [
+                    seat async for seat in
+                    performance.tickets.values_list("row", "seat")
+                ],
+            )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        compute = super().aretrieve
+
+        async def data():
+            return (await compute(request, *args, **kwargs)).data
+
+        return Response(
+            await performance_detail_flight.ado(request.get_full_path(), data)
+        )
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="coalescing-stats",
+        permission_classes=[IsAdminUser],
+    )
+    def coalescing_stats(self, request):
+        return Response(performance_detail_flight.stats())
+
 
 class ReservationViewSet(
+    AsyncReadMixin,
+    CursorPaginationMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     GenericViewSet,
@@ -212,6 +686,7 @@ class ReservationViewSet(
         "tickets__performance__theatre_hall"
     )
     pagination_class = ReservationPagination
+    cursor_pagination_class = ReservationCursorPagination
     serializer_class = ReservationSerializer
     permission_classes = [IsAuthenticated]
 
@@ -231,5 +706,195 @@ class ReservationViewSet(
             return ReservationListSerializer
         return self.serializer_class
 
+    def get_throttles(self):
+        if self.action == "create":
+            return [ReservationRateThrottle()]
+        return super().get_throttles()
+
+    @extend_schema(parameters=PAGINATION_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+
+EXPORT_PARAMETERS = [
+    OpenApiParameter(
+        "performance",
+        type=OpenApiTypes.INT,
+        description="Only tickets of the performance (ex. ?performance=3)",
+    ),
+    OpenApiParameter(
+        "play",
+        type=OpenApiTypes.INT,
+        description="Only tickets of the play (ex. ?play=1)",
+    ),
+    OpenApiParameter(
+        "date_from",
+        type=OpenApiTypes.DATE,
+        description="Reserved on or after the day (ex. ?date_from=2024-10-01)",
+    ),
+    OpenApiParameter(
+        "date_to",
+        type=OpenApiTypes.DATE,
+        description="Reserved on or before the day (ex. ?date_to=2024-10-31)",
+    ),
+]
+
+EXPORT_RESPONSES = {
+    (200, CSVRenderer.media_type): OpenApiTypes.STR,
+    (200, NDJSONRenderer.media_type): OpenApiTypes.STR,
+}
+
+
+class ExportViewSet(viewsets.GenericViewSet):
+    """
+    Stream sales data as CSV (default) or NDJSON for admins.
+
+    The format is negotiated like any other renderer: ``?format=ndjson`` or
+    ``Accept: application/x-ndjson``.
+    """
+
+    permission_classes = [IsAdminUser]
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+    pagination_class = None
+
+    def _id_param(self, name: str) -> int | None:
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError({name: "Expected an id."})
+
+    def _created_range(self) -> dict:
+        lookups = {}
+        date_from = self.request.query_params.get("date_from")
+        date_to = self.request.query_params.get("date_to")
+        if date_from:
+            lookups["created_at__gte"] = day_bounds(date_from, "date_from")[0]
+        if date_to:
+            lookups["created_at__lt"] = day_bounds(date_to, "date_to")[1]
+        return lookups
+
+    def _ticket_filters(self) -> dict:
+        lookups = {}
+        performance_id = self._id_param("performance")
+        play_id = self._id_param("play")
+        if performance_id is not None:
+            lookups["performance_id"] = performance_id
+        if play_id is not None:
+            lookups["performance__play_id"] = play_id
+        return lookups
+
+    def _stream(self, name: str, rows: QuerySet, columns):
+        renderer = self.request.accepted_renderer
+        if isinstance(self.request._request, ASGIRequest):
+            content = astream_rows(rows, columns, renderer)
+        else:
+            content = stream_rows(rows, columns, renderer)
+        response = StreamingHttpResponse(
+            content, content_type=f"{renderer.media_type}; charset=utf-8"
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{name}.{renderer.format}"'
+        )
+        return response
+
+    @extend_schema(parameters=EXPORT_PARAMETERS, responses=EXPORT_RESPONSES)
+    @action(methods=["GET"], detail=False)
+    def tickets(self, request):
+        tickets = Ticket.objects.filter(
+            **self._ticket_filters(),
+            **{
+                f"reservation__{lookup}": value
+                for lookup, value in self._created_range().items()
+            },
+        )
+        return self._stream("tickets", ticket_rows(tickets), TICKET_COLUMNS)
+
+    @extend_schema(parameters=EXPORT_PARAMETERS, responses=EXPORT_RESPONSES)
+    @action(methods=["GET"], detail=False)
+    def reservations(self, request):
+        reservations = Reservation.objects.filter(**self._created_range())
+        ticket_filters = self._ticket_filters()
+        if ticket_filters:
+            reservations = reservations.filter(
+                Exists(
+                    Ticket.objects.filter(
+                        reservation=OuterRef("pk"), **ticket_filters
+                    )
+                )
+            )
+        return self._stream(
+            "reservations",
+            reservation_rows(reservations),
+            RESERVATION_COLUMNS,
+        )
+
+
+SEAT_EVENTS_KEEPALIVE = 15
+
+
+def _open_seat_stream(request, pk):
+    """
+    Authenticate the stream request and check the performance exists.
+
+    The connection is closed before returning: otherwise every open stream
+    would pin its own database connection for as long as it stays idle.
+    """
+    try:
+        try:
+            authenticated = CachedJWTAuthentication().authenticate(request)
+        except AuthenticationFailed as error:
+            return JsonResponse({"detail": str(error.detail)}, status=401)
+        if authenticated is None:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided."},
+                status=401,
+            )
+        if not Performance.objects.filter(pk=pk).exists():
+            raise Http404
+        return None
+    finally:
+        connection.close()
+
+
+async def performance_seat_events(request, pk):
+    """
+    Stream seat-claimed/seat-released events of a performance over SSE.
+
+    Meant to be served by the ASGI application: an open stream only holds
+    an asyncio queue on the worker's event loop, not a database connection.
+    """
+    error = await sync_to_async(_open_seat_stream)(request, pk)
+    if error is not None:
+        return error
+
+    async def events():
+        queue = seat_event_hub.subscribe(pk)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), SEAT_EVENTS_KEEPALIVE
+                    )
+                except TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield (
+                    f"event: {event['event']}\n"
+                    f"data: {json.dumps(event, separators=(',', ':'))}\n\n"
+                )
+        finally:
+            seat_event_hub.unsubscribe(pk, queue)
+
+    response = StreamingHttpResponse(
+        events(), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 import os
+import sys
 from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -43,6 +45,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     #3rd apps
     "rest_framework",
     "debug_toolbar",
@@ -56,6 +59,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "theatre.middleware.RequestMetricsMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -109,6 +113,81 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Catalogue responses and the versions that invalidate them
+    # (theatre.cache). Share it between processes like the throttle cache,
+    # or writes only invalidate the process that handled them.
+    "catalogue": {
+        "BACKEND": os.getenv(
+            "CATALOGUE_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv("CATALOGUE_CACHE_LOCATION", "catalogue"),
+        "TIMEOUT": 60 * 60,
+    },
+    # Throttle counters (theatre.throttling). Point every process and node
+    # at the same Redis or Memcached so they share one budget per client.
+    "throttle": {
+        "BACKEND": os.getenv(
+            "THROTTLE_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv("THROTTLE_CACHE_LOCATION", "throttle"),
+    },
+}
+
+# Tests run with DEBUG off and per-process caches on purpose (see
+# theatre.checks).
+SILENCED_SYSTEM_CHECKS = (
+    ["theatre.W001", "theatre.W002"] if sys.argv[1:2] == ["test"] else []
+)
+
+# Seconds a computed performance detail response is shared between
+# identical requests in the same worker.
+PERFORMANCE_DETAIL_FRESHNESS = float(
+    os.getenv("PERFORMANCE_DETAIL_FRESHNESS", 1.0)
+)
+
+# Serve list and detail reads of the catalogue and reservations with the
+# async ORM. asgi.py turns it on; under WSGI the sync viewsets are used.
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "false").lower() == "true"
+
+# Render play and performance lists from values() rows instead of model
+# instances. The output is the same; only the way it is built changes.
+PROJECTED_LIST_SERIALIZERS = (
+    os.getenv("PROJECTED_LIST_SERIALIZERS", "false").lower() == "true"
+)
+
+# Background jobs (theatre.jobs). Seconds before the first retry of a
+# failed job, doubled on every further attempt up to JOBS_BACKOFF_MAX.
+JOBS_BACKOFF = float(os.getenv("JOBS_BACKOFF", 10))
+JOBS_BACKOFF_MAX = float(os.getenv("JOBS_BACKOFF_MAX", 60 * 60))
+# Seconds after which a running job is assumed to have lost its worker.
+JOBS_LOCK_TIMEOUT = int(os.getenv("JOBS_LOCK_TIMEOUT", 10 * 60))
+
+# Bearer token required to scrape /metrics; without one the endpoint
+# refuses every request.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Send Server-Timing (SQL time, query count...) to every client, not
+# only to staff users.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+# N+1 query detection (theatre.nplusone): "off", "log" for a sample of
+# requests, or "raise" on every request. "manage.py test" raises.
+NPLUSONE_MODE = os.getenv(
+    "NPLUSONE_MODE", "raise" if sys.argv[1:2] == ["test"] else "log"
+)
+NPLUSONE_SAMPLE_RATE = float(os.getenv("NPLUSONE_SAMPLE_RATE", 0.01))
+# Repetitions of the same SELECT shape in one request that count as N+1.
+NPLUSONE_THRESHOLD = int(os.getenv("NPLUSONE_THRESHOLD", 4))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -149,23 +228,60 @@ STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploads are named after the hash of their content (theatre.media).
+STORAGES = {
+    "default": {
+        "BACKEND": "theatre.media.ContentAddressedStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+# Serve MEDIA_URL from this app, with permanent caching and byte ranges.
+# Turn off when a web server or CDN serves MEDIA_ROOT instead.
+SERVE_MEDIA = os.getenv("SERVE_MEDIA", "true").lower() == "true"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
+# orjson and msgpack are optional: without orjson the JSON renderer and
+# parser fall back to the stdlib, without msgpack the format is not offered.
+RENDERER_CLASSES = [
+    "theatre.renderers.FastJSONRenderer",
+    "rest_framework.renderers.BrowsableAPIRenderer",
+]
+PARSER_CLASSES = [
+    "theatre.parsers.FastJSONParser",
+    "rest_framework.parsers.FormParser",
+    "rest_framework.parsers.MultiPartParser",
+]
+if find_spec("msgpack") is not None:
+    RENDERER_CLASSES.append("theatre.renderers.MessagePackRenderer")
+    PARSER_CLASSES.append("theatre.parsers.MessagePackParser")
+
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": RENDERER_CLASSES,
+    "DEFAULT_PARSER_CLASSES": PARSER_CLASSES,
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "theatre.throttling.AnonRateThrottle",
+        "theatre.throttling.UserRateThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "10/day", "user": "30/day"},
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    # anon and user limit browsing; creating reservations is limited by
+    # the reservation scope alone.
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": "10/day",
+        "user": "30/day",
+        "reservation": "10/hour",
+    },
+    "DEFAULT_PAGINATION_CLASS": "theatre.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 5,
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "theatre.permissions.IsAdminOrIfAuthenticatedReadOnly",
@@ -190,4 +306,8 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.TokenObtainPairSerializer",
 }
+
+# Users kept per process by user.authentication.CachedJWTAuthentication.
+JWT_USER_CACHE_SIZE = int(os.environ.get("JWT_USER_CACHE_SIZE", 2048))
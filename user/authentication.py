@@ -0,0 +1,126 @@
+"""
+JWT authentication that does not load the user on every request.
+
+simplejwt's ``JWTAuthentication`` selects the user row for each
+authenticated request. ``CachedJWTAuthentication`` keeps the users it
+has loaded in a bounded LRU per process, keyed by user id and the
+``ver`` claim of the token, so a client making many requests with one
+access token costs one query per process instead of one per request.
+
+Tokens are issued with the user's ``token_version``. Saving a change to
+the password, ``is_active``, ``is_staff`` or ``is_superuser`` bumps the
+version (see ``User.save``), so tokens issued before the change miss the
+cache, no longer match the stored version and are rejected. Saving a user
+also drops their entries from the cache of the process that saved it.
+Other processes notice other changes when their entries expire: entries
+live no longer than ACCESS_TOKEN_LIFETIME, the time a token would have
+stayed valid anyway. Views that show or edit the user's own profile
+therefore load it from the database instead of using request.user.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+TOKEN_VERSION_CLAIM = "ver"
+
+
+class UserCache:
+    """Least recently used users, each kept for at most ``ttl`` seconds."""
+
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._users.get(key)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires <= time.monotonic():
+                del self._users[key]
+                return None
+            self._users.move_to_end(key)
+            return user
+
+    def set(self, key, user) -> None:
+        with self._lock:
+            self._users[key] = (user, time.monotonic() + self.ttl)
+            self._users.move_to_end(key)
+            while len(self._users) > self.size:
+                self._users.popitem(last=False)
+
+    def discard(self, user_id) -> None:
+        with self._lock:
+            for key in [key for key in self._users if key[0] == user_id]:
+                del self._users[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+
+    def __len__(self):
+        return len(self._users)
+
+
+user_cache = UserCache(
+    settings.JWT_USER_CACHE_SIZE,
+    api_settings.ACCESS_TOKEN_LIFETIME.total_seconds(),
+)
+
+
+def forget_user(user_id) -> None:
+    """
+    Drop the cached entries of a user, now and again after commit.
+
+    A request racing the saving transaction may cache the old row after
+    the first discard, but not after the second one.
+    """
+    def discard():
+        user_cache.discard(user_id)
+
+    discard()
+    transaction.on_commit(discard)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+        # Tokens issued without the claim count as version 0.
+        version = validated_token.get(TOKEN_VERSION_CLAIM, 0)
+        key = (user_id, version)
+
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            if user.token_version != version:
+                raise AuthenticationFailed(
+                    _("Token has been revoked"), code="token_revoked"
+                )
+            user_cache.set(key, user)
+        # Views may set attributes on request.user; keep the cached one
+        # clean.
+        return copy.copy(user)
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    target_class = "user.authentication.CachedJWTAuthentication"
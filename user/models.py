@@ -6,12 +6,35 @@ from django.utils.translation import gettext as _
 
 from user.usermanager import UserManager
 
+# Changing any of these ends the sessions of the user: tokens issued
+# before the change carry an older token_version and are rejected.
+TOKEN_FIELDS = ("password", "is_active", "is_staff", "is_superuser")
+
 
 class User(AbstractUser):
     username = None
     email = models.EmailField(_("email address"), unique=True)
+    token_version = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if not self._state.adding and (
+            update_fields is None or set(update_fields) & set(TOKEN_FIELDS)
+        ):
+            stored = (
+                User.objects.filter(pk=self.pk)
+                .values("token_version", *TOKEN_FIELDS)
+                .first()
+            )
+            if stored is not None and any(
+                stored[field] != getattr(self, field) for field in TOKEN_FIELDS
+            ):
+                self.token_version = stored["token_version"] + 1
+                if update_fields is not None:
+                    kwargs["update_fields"] = {*update_fields, "token_version"}
+        super().save(*args, **kwargs)
@@ -1,6 +1,16 @@
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import caches
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
+from user.authentication import UserCache, user_cache
 from user.serializers import UserSerializer
 
 User = get_user_model()
@@ -51,3 +61,138 @@ class UserSerializerTests(TestCase):
         user = serializer.save()
         self.assertEqual(user.email, payload["email"])
         self.assertTrue(user.check_password(self.valid_payload["password"]))
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        caches["throttle"].clear()
+        user_cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="cached@u.com", password="password123"
+        )
+
+    def obtain_token(self, password="password123"):
+        response = self.client.post(
+            reverse("user:token_obtain_pair"),
+            {"email": self.user.email, "password": password},
+        )
+        return response.data["access"]
+
+    def get_me(self, token):
+        return self.client.get(
+            reverse("user:manage"), HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+
+    def test_token_carries_user_version(self):
+        self.assertEqual(AccessToken(self.obtain_token())["ver"], 0)
+
+    def test_user_is_loaded_once_per_token_version(self):
+        token = self.obtain_token()
+        with CaptureQueriesContext(connection) as first:
+            self.assertEqual(self.get_me(token).status_code, 200)
+        with CaptureQueriesContext(connection) as second:
+            self.assertEqual(self.get_me(token).status_code, 200)
+
+        self.assertEqual(len(second), len(first) - 1)
+
+    def test_saving_user_drops_cached_entries(self):
+        token = self.obtain_token()
+        self.get_me(token)
+        self.assertEqual(len(user_cache), 1)
+
+        self.user.first_name = "Changed"
+        self.user.save()
+
+        self.assertEqual(len(user_cache), 0)
+        self.assertEqual(self.user.token_version, 0)
+        self.assertEqual(self.get_me(token).status_code, 200)
+
+    def test_password_change_revokes_tokens(self):
+        token = self.obtain_token()
+        self.get_me(token)
+
+        self.user.set_password("new_password123")
+        self.user.save()
+
+        self.assertEqual(self.user.token_version, 1)
+        response = self.get_me(token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data["code"], "token_revoked")
+        new_token = self.obtain_token("new_password123")
+        self.assertEqual(self.get_me(new_token).status_code, 200)
+
+    def test_privilege_changes_revoke_tokens(self):
+        for field, value in (("is_staff", True), ("is_active", False)):
+            token = self.obtain_token()
+            self.get_me(token)
+
+            setattr(self.user, field, value)
+            self.user.save(update_fields=[field])
+
+            self.assertEqual(
+                self.get_me(token).status_code,
+                status.HTTP_401_UNAUTHORIZED,
+            )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 2)
+
+    def test_unrelated_update_fields_skip_version_check(self):
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=["last_login"])
+
+    def test_profile_is_read_from_the_database(self):
+        token = self.obtain_token()
+        # Another worker process, with its own cache.
+        other_process = UserCache(size=8, ttl=60)
+        with mock.patch("user.authentication.user_cache", other_process):
+            self.get_me(token)
+
+        response = self.client.patch(
+            reverse("user:manage"),
+            {"email": "renamed@u.com"},
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(len(other_process), 1)
+        with mock.patch("user.authentication.user_cache", other_process):
+            response = self.get_me(token)
+        self.assertEqual(response.data["email"], "renamed@u.com")
+
+    def test_tokens_without_version_claim(self):
+        token = AccessToken.for_user(self.user)
+        self.assertEqual(self.get_me(token).status_code, 200)
+
+
+class UserCacheTests(SimpleTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = UserCache(size=2, ttl=60)
+        cache.set((1, 0), "first")
+        cache.set((2, 0), "second")
+        cache.get((1, 0))
+        cache.set((3, 0), "third")
+
+        self.assertEqual(cache.get((1, 0)), "first")
+        self.assertIsNone(cache.get((2, 0)))
+        self.assertEqual(len(cache), 2)
+
+    def test_entries_expire(self):
+        cache = UserCache(size=2, ttl=60)
+        with mock.patch("user.authentication.time.monotonic") as monotonic:
+            monotonic.return_value = 100
+            cache.set((1, 0), "user")
+            monotonic.return_value = 159
+            self.assertEqual(cache.get((1, 0)), "user")
+            monotonic.return_value = 160
+            self.assertIsNone(cache.get((1, 0)))
+
+    def test_discard_drops_every_version(self):
+        cache = UserCache(size=4, ttl=60)
+        cache.set((1, 0), "old")
+        cache.set((1, 1), "new")
+        cache.set((2, 0), "other")
+
+        cache.discard(1)
+
+        self.assertEqual(len(cache), 1)